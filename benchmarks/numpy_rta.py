@@ -0,0 +1,194 @@
+"""
+Cross-checks and compares the pyRTA and the NumPy analysis backends.
+
+Usage: uv run --extra numpy python benchmarks/numpy_rta.py [-r REPEAT]
+       [--check-only] [--no-synthetic] [INPUT ...]
+
+Without inputs, all files in test-cases/ are used. Every input is analyzed with
+both backends (see --rta-backend), and the benchmark fails if any L, R, search
+space, or solution differs. Unless --check-only is given, the analyses are
+timed (the minimum over REPEAT runs), also on generated task sets with a high
+utilization and with long busy windows, where the vectorized fixed-point
+iterations pay off most.
+"""
+
+import argparse
+import glob
+import math
+import os
+import random
+import sys
+import time
+from typing import cast
+
+from poet.analysis import AnalysisResults, analyze_task_set, backend_available
+from poet.model import Problem
+
+ROOT = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")
+DEFAULT_INPUTS = os.path.join(ROOT, "test-cases", "*.yaml")
+SEED = 2026
+
+
+def timed_analysis(
+    problem: Problem, backend: str, repeat: int
+) -> tuple[AnalysisResults, float]:
+    best = math.inf
+    results = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = analyze_task_set(problem, backend=backend)
+        best = min(best, time.perf_counter() - start)
+    assert results is not None
+    return results, best
+
+
+def differences(a: AnalysisResults, b: AnalysisResults) -> list[int]:
+    # The ids of the tasks with different results
+    return [
+        t.id
+        for t in a.problem.task_set
+        if a.results[t].to_dict() != b.results[t].to_dict()
+    ]
+
+
+def synthetic_problem(
+    rnd: random.Random,
+    policy: str,
+    preemption: str,
+    n: int,
+    utilization: float,
+    periods: tuple[int, int],
+    rate_monotonic: bool,
+) -> Problem:
+    # Periodic tasks and tasks with bursty arrival curves, with implicit
+    # deadlines and rate-monotonic (or random) priorities. The utilizations are
+    # drawn with UUniFast and the periods log-uniformly.
+    shares: list[float] = []
+    remaining = utilization
+    for i in range(n - 1, 0, -1):
+        next_remaining = remaining * rnd.random() ** (1 / i)
+        shares.append(remaining - next_remaining)
+        remaining = next_remaining
+    shares.append(remaining)
+    low, high = math.log(periods[0]), math.log(periods[1])
+    tasks: list[dict[str, object]] = []
+    for i, share in enumerate(shares):
+        period = int(math.exp(rnd.uniform(low, high)))
+        task: dict[str, object] = {"id": i + 1, "deadline": period}
+        if i % 2 == 0:
+            task["period"] = period
+            task["worst-case execution time"] = max(1, int(share * period))
+        else:
+            # Up to three jobs in a burst, then none for the rest of the horizon
+            burst = rnd.randint(2, 3)
+            gap = max(1, period // (4 * burst))
+            task["arrival curve"] = [
+                burst * period,
+                [[1 + j * gap, j + 1] for j in range(burst)],
+            ]
+            task["worst-case execution time"] = max(1, int(share * period))
+        tasks.append(task)
+    ranks = list(range(n))
+    if rate_monotonic:
+        ranks.sort(key=lambda i: cast(int, tasks[i]["deadline"]))
+    else:
+        rnd.shuffle(ranks)
+    for rank, i in enumerate(ranks):
+        tasks[i]["priority"] = n - rank
+    return Problem.model_validate(
+        {
+            "scheduling policy": policy,
+            "preemption model": preemption,
+            "task set": tasks,
+        }
+    )
+
+
+def synthetic_problems() -> dict[str, list[Problem]]:
+    rnd = random.Random(SEED)
+    groups: dict[str, list[Problem]] = {"high-utilization": [], "long-busy-window": []}
+    for policy in ["FP", "EDF"]:
+        for preemption in ["FP", "NP"]:
+            for _ in range(3):
+                groups["high-utilization"].append(
+                    synthetic_problem(
+                        rnd, policy, preemption, 25, 0.97, (100, 5000), True
+                    )
+                )
+                # Under FP, the busy windows of low-priority tasks with short
+                # periods are long compared to their periods.
+                groups["long-busy-window"].append(
+                    synthetic_problem(
+                        rnd, policy, preemption, 10, 0.9, (10, 20000), False
+                    )
+                )
+    return groups
+
+
+def compare(
+    name: str, problems: list[Problem], repeat: int, check_only: bool
+) -> tuple[float, float, int]:
+    # Returns the total times of both backends and the number of mismatches.
+    total_pyrta = total_numpy = 0.0
+    mismatches = 0
+    for i, problem in enumerate(problems):
+        print(f"\r[{i + 1}/{len(problems)}] {name}", end="", file=sys.stderr)
+        pyrta, pyrta_time = timed_analysis(
+            problem, "pyrta", 1 if check_only else repeat
+        )
+        numpy, numpy_time = timed_analysis(
+            problem, "numpy", 1 if check_only else repeat
+        )
+        different = differences(pyrta, numpy)
+        if different:
+            mismatches += 1
+            print(f"\nMISMATCH in {name} #{i + 1}: tasks {different}", file=sys.stderr)
+        total_pyrta += pyrta_time
+        total_numpy += numpy_time
+    print(file=sys.stderr)
+    return total_pyrta, total_numpy, mismatches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Cross-checks and compares the pyRTA and the NumPy analysis backends."
+    )
+    _ = parser.add_argument("inputs", nargs="*", help="Input files.")
+    _ = parser.add_argument("-r", "--repeat", type=int, default=3)
+    _ = parser.add_argument(
+        "--check-only", action="store_true", help="Only compare the results."
+    )
+    _ = parser.add_argument(
+        "--no-synthetic", action="store_true", help="Skip the generated task sets."
+    )
+    opts = parser.parse_args()
+    if not backend_available("numpy"):
+        sys.exit("NumPy is not installed.")
+
+    inputs: list[str] = opts.inputs or sorted(glob.glob(DEFAULT_INPUTS))
+    groups = {"inputs": [Problem.from_file(path) for path in inputs]}
+    if not opts.no_synthetic:
+        groups.update(synthetic_problems())
+
+    failed = False
+    rows: list[tuple[str, int, float, float, int]] = []
+    for name, problems in groups.items():
+        pyrta, numpy, mismatches = compare(name, problems, opts.repeat, opts.check_only)
+        rows.append((name, len(problems), pyrta, numpy, mismatches))
+        failed = failed or mismatches > 0
+
+    print(
+        f"{'task sets':<18}{'count':>6}{'pyrta':>10}{'numpy':>10}{'speedup':>9}"
+        + f"{'mismatches':>12}"
+    )
+    for name, count, pyrta, numpy, mismatches in rows:
+        print(
+            f"{name:<18}{count:>6}{pyrta:>9.2f}s{numpy:>9.2f}s"
+            + f"{pyrta / numpy:>8.2f}x{mismatches:>12}"
+        )
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
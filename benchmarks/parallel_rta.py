@@ -0,0 +1,78 @@
+"""
+Compares serial and parallel per-task response-time analysis.
+
+Usage: uv run python benchmarks/parallel_rta.py [-j JOBS] [INPUT ...]
+
+Without inputs, the bundled test cases with the most expensive analyses are
+used. For each input, the serial and the parallel analysis are timed, and
+their results are checked to be identical.
+"""
+
+import argparse
+import os
+import time
+
+from poet.analysis import AnalysisResults, analyze_task_set
+from poet.model import Problem
+
+ROOT = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")
+DEFAULT_INPUTS = [
+    os.path.join(ROOT, "test-cases", f"{name}.yaml")
+    for name in [
+        "NP-EDF-120",
+        "NP-EDF-020",
+        "NP-FP-007",
+        "NP-EDF-053",
+        "FP-EDF-008",
+        "FP-FP-105",
+    ]
+]
+
+
+def timed_analysis(problem: Problem, jobs: int) -> tuple[AnalysisResults, float]:
+    start = time.perf_counter()
+    results = analyze_task_set(problem, jobs)
+    return results, time.perf_counter() - start
+
+
+def same_results(a: AnalysisResults, b: AnalysisResults) -> bool:
+    return all(
+        (a.results[t].L, a.results[t].R, a.results[t].SS, a.results[t].Fs)
+        == (b.results[t].L, b.results[t].R, b.results[t].SS, b.results[t].Fs)
+        for t in a.problem.task_set
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compares serial and parallel per-task response-time analysis."
+    )
+    _ = parser.add_argument("inputs", nargs="*", help="Input files.")
+    _ = parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1)
+    opts = parser.parse_args()
+
+    inputs: list[str] = opts.inputs or DEFAULT_INPUTS
+    total_serial = total_parallel = 0.0
+    print(
+        f"{'workload':<20} {'tasks':>5} {'serial':>9} {'-j ' + str(opts.jobs):>9} {'speedup':>8}"
+    )
+    for path in inputs:
+        problem = Problem.from_yaml_file(path)
+        serial, serial_time = timed_analysis(problem, 1)
+        parallel, parallel_time = timed_analysis(problem, opts.jobs)
+        assert same_results(serial, parallel), f"results differ for {path}"
+        total_serial += serial_time
+        total_parallel += parallel_time
+        name = os.path.basename(path)
+        print(
+            f"{name:<20} {len(problem.task_set):>5} {serial_time:>8.3f}s"
+            + f" {parallel_time:>8.3f}s {serial_time / parallel_time:>7.2f}x"
+        )
+    print(
+        f"{'total':<20} {'':>5} {total_serial:>8.3f}s {total_parallel:>8.3f}s"
+        + f" {total_serial / total_parallel:>7.2f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
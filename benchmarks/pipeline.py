@@ -0,0 +1,181 @@
+"""
+Times the Python stages of POET on the bundled test cases.
+
+Usage: uv run python benchmarks/pipeline.py [-r REPEAT] [--save FILE]
+       [--baseline FILE] [--tolerance FRACTION] [INPUT ...]
+
+Without inputs, all files in test-cases/ are used. For each input, the stages
+  parse     Problem.from_file()
+  model     to_rta_model().with_arrival_curves()
+  analyze   task_analysis.analyze() of every task
+  generate  coq_generator.generate_proof() of every task (if all are bounded)
+are timed separately (the minimum over REPEAT runs). Percentiles per stage and
+the slowest inputs are reported. No Rocq toolchain is needed.
+
+With --save, the timings are stored in a baseline file. With --baseline, the
+timings are compared against a stored baseline (recorded on the same machine,
+e.g., on the main branch), and the benchmark fails if the total or the 90th
+percentile of any stage exceeds the baseline by more than the tolerance.
+"""
+
+import argparse
+import glob
+import math
+import os
+import sys
+import time
+from collections.abc import Callable
+from typing import Any, TypeVar, cast
+
+import yaml
+
+from poet.certificates import coq_generator
+from poet.model import Problem
+from poet.task_analysis import TaskAnalysisResults, analyze
+
+ROOT = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")
+DEFAULT_INPUTS = os.path.join(ROOT, "test-cases", "*.yaml")
+STAGES = ["parse", "model", "analyze", "generate"]
+PERCENTILES = [50, 90, 99]
+SLOWEST = 5
+
+T = TypeVar("T")
+
+
+def timed(run: Callable[[], T], repeat: int) -> tuple[T, float]:
+    # Returns the result of the last run and the minimum time of all runs.
+    best = math.inf
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - start)
+    return cast(T, result), best
+
+
+def time_stages(path: str, repeat: int) -> dict[str, float]:
+    times: dict[str, float] = {}
+    problem, times["parse"] = timed(lambda: Problem.from_file(path), repeat)
+    task_set, times["model"] = timed(
+        lambda: problem.to_rta_model().with_arrival_curves(), repeat
+    )
+    results: list[TaskAnalysisResults] = []
+    times["analyze"] = 0.0
+    for tsk in task_set:
+        result, seconds = timed(
+            lambda tsk=tsk: analyze(problem.scheduling_policy, task_set, tsk), repeat
+        )
+        results.append(result)
+        times["analyze"] += seconds
+    if all(r.R > 0 for r in results):
+        task_set_values = coq_generator.get_task_set_values(problem)
+
+        def generate() -> None:
+            for t, r in zip(problem.task_set, results):
+                _ = coq_generator.generate_proof(
+                    problem, t, r, True, True, task_set_values
+                )
+
+        _, times["generate"] = timed(generate, repeat)
+    return times
+
+
+def percentile(values: list[float], p: float) -> float:
+    # Nearest-rank percentile
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def summarize(timings: dict[str, dict[str, float]]) -> dict[str, dict[str, float]]:
+    summary: dict[str, dict[str, float]] = {}
+    for stage in STAGES:
+        values = [t[stage] for t in timings.values() if stage in t]
+        if not values:
+            continue
+        summary[stage] = {"total": sum(values)}
+        for p in PERCENTILES:
+            summary[stage][f"p{p}"] = percentile(values, p)
+        summary[stage]["max"] = max(values)
+    return summary
+
+
+def print_report(timings: dict[str, dict[str, float]]) -> None:
+    summary = summarize(timings)
+    columns = ["total"] + [f"p{p}" for p in PERCENTILES] + ["max"]
+    print(f"{len(timings)} inputs; times in ms")
+    print(f"{'stage':<10}" + "".join(f"{c:>12}" for c in columns))
+    for stage, values in summary.items():
+        print(f"{stage:<10}" + "".join(f"{values[c] * 1000:>12.2f}" for c in columns))
+    for stage in summary:
+        slowest = sorted(
+            (name for name in timings if stage in timings[name]),
+            key=lambda name: -timings[name][stage],
+        )[:SLOWEST]
+        print(f"\nSlowest inputs ({stage}):")
+        for name in slowest:
+            print(f"  {name:<24} {timings[name][stage] * 1000:>12.2f}")
+
+
+def compare(
+    timings: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float,
+) -> bool:
+    # Compares the inputs timed in both runs; returns False on a regression.
+    common = sorted(set(timings) & set(baseline))
+    if not common:
+        print("\nNo inputs in common with the baseline.")
+        return True
+    current = summarize({name: timings[name] for name in common})
+    previous = summarize({name: baseline[name] for name in common})
+    ok = True
+    print(f"\nComparison with the baseline ({len(common)} inputs, ms)")
+    print(f"{'stage':<10}{'metric':>8}{'baseline':>12}{'current':>12}{'change':>9}")
+    for stage in STAGES:
+        if stage not in current or stage not in previous:
+            continue
+        for metric in ["total", "p90"]:
+            before, after = previous[stage][metric], current[stage][metric]
+            change = after / before - 1 if before > 0 else 0.0
+            regression = change > tolerance
+            ok = ok and not regression
+            print(
+                f"{stage:<10}{metric:>8}{before * 1000:>12.2f}{after * 1000:>12.2f}"
+                + f"{change:>+9.1%}"
+                + ("  REGRESSION" if regression else "")
+            )
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Times the Python stages of POET on the bundled test cases."
+    )
+    _ = parser.add_argument("inputs", nargs="*", help="Input files.")
+    _ = parser.add_argument("-r", "--repeat", type=int, default=3)
+    _ = parser.add_argument("--save", metavar="FILE", help="Save a baseline.")
+    _ = parser.add_argument("--baseline", metavar="FILE", help="Compare to a baseline.")
+    _ = parser.add_argument("--tolerance", type=float, default=0.25)
+    opts = parser.parse_args()
+
+    inputs: list[str] = opts.inputs or sorted(glob.glob(DEFAULT_INPUTS))
+    timings: dict[str, dict[str, float]] = {}
+    for i, path in enumerate(inputs):
+        print(f"\r[{i + 1}/{len(inputs)}] {path}", end="", file=sys.stderr)
+        timings[os.path.basename(path)] = time_stages(path, opts.repeat)
+    print(file=sys.stderr)
+    print_report(timings)
+
+    if opts.save is not None:
+        with open(opts.save, "w") as f:
+            _ = f.write(yaml.safe_dump({"timings": timings}))
+        print(f"\nBaseline saved to {opts.save}")
+    if opts.baseline is not None:
+        with open(opts.baseline, "r") as f:
+            data = cast(dict[str, Any], yaml.safe_load(f.read()))
+        if not compare(timings, data["timings"], opts.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Compares the reduction strategies of the certificates (see --reduction) by the
+per-task times of Rocq.
+
+Usage: uv run python benchmarks/reduction.py [-n COUNT] [-s STRATEGY ...]
+       [-p PROSA_PATH] [-j JOBS] [--keep FOLDER] [INPUT ...]
+
+Without inputs, the COUNT test cases (default: 5) with the largest search spaces
+(summed over all tasks) among those with bounded response times are used. Each
+input is certified once per strategy (default: vm and native; any value of
+--reduction, e.g., "vm,R-is-maximum=native") by running `poet -s -b`, and the
+coq_time and coqchk_time of each task are read from the statistics. They are
+reported side by side, with the fastest strategy (by total coq_time) per input.
+
+A Rocq toolchain with Prosa is required. native_compute only pays off if Prosa
+was compiled to native code; otherwise, Rocq either falls back to vm_compute or
+compiles the dependencies on the fly.
+"""
+
+import argparse
+import glob
+import os
+import subprocess
+import sys
+import tempfile
+
+from poet.analysis import analyze_task_set
+from poet.model import Problem
+from poet.utils import statistics
+
+ROOT = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")
+DEFAULT_INPUTS = os.path.join(ROOT, "test-cases", "*.yaml")
+DEFAULT_STRATEGIES = ["vm", "native"]
+
+Times = dict[str, tuple[float | None, float | None]]
+
+
+def largest_inputs(count: int) -> list[str]:
+    sizes: list[tuple[int, str]] = []
+    paths = sorted(glob.glob(DEFAULT_INPUTS))
+    for i, path in enumerate(paths):
+        print(f"\r[{i + 1}/{len(paths)}] selecting inputs", end="", file=sys.stderr)
+        results = analyze_task_set(Problem.from_file(path))
+        if results.respose_time_is_bounded():
+            sizes.append((sum(len(r.SS) for r in results.results.values()), path))
+    print(file=sys.stderr)
+    return [path for _, path in sorted(sizes, reverse=True)[:count]]
+
+
+def certify(
+    input_path: str, strategy: str, folder: str, opts: argparse.Namespace
+) -> Times | None:
+    # Returns the (coq, coqchk) times per task name, or None if POET failed.
+    command = [sys.executable, "-m", "poet", "-c", "-s", "-b", "-o", folder]
+    command += ["--reduction", strategy, "-j", str(opts.jobs)]
+    if opts.prosa_path is not None:
+        command += ["-p", opts.prosa_path]
+    env = dict(os.environ, PYTHONPATH=os.path.join(ROOT, "src"))
+    result = subprocess.run(
+        [*command, input_path], check=False, capture_output=True, text=True, env=env
+    )
+    if result.returncode != 0:
+        print(f"\nPOET failed on {input_path} ({strategy}):", file=sys.stderr)
+        print(result.stdout + result.stderr, file=sys.stderr)
+        return None
+    return statistics.past_task_times(folder)
+
+
+def seconds(time: float | None) -> str:
+    return f"{time:>9.2f}s" if time is not None else f"{'-':>10}"
+
+
+def report(name: str, strategies: list[str], times: dict[str, Times | None]) -> str:
+    # Prints the times of each task and returns the fastest strategy.
+    width = max(len(s) for s in strategies) + 9
+    print(f"\n{name}")
+    print(
+        f"{'task':<8}"
+        + "".join(f"{s + ' coq':>{width}}" for s in strategies)
+        + "".join(f"{s + ' coqchk':>{width}}" for s in strategies)
+    )
+    names = sorted({t for ts in times.values() if ts is not None for t in ts})
+    for t in names:
+        row = [
+            ts.get(t, (None, None)) if (ts := times[s]) is not None else (None, None)
+            for s in strategies
+        ]
+        print(
+            f"{t:<8}"
+            + "".join(f"{seconds(coq):>{width}}" for coq, _ in row)
+            + "".join(f"{seconds(coqchk):>{width}}" for _, coqchk in row)
+        )
+    totals = {
+        s: sum(coq or 0 for coq, _ in ts.values())
+        for s in strategies
+        if (ts := times[s]) is not None
+    }
+    print(
+        f"{'total':<8}"
+        + "".join(f"{seconds(totals.get(s)):>{width}}" for s in strategies)
+    )
+    return min(totals, key=lambda s: totals[s]) if totals else "-"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compares the reduction strategies of the certificates "
+        + "(see --reduction) by the per-task times of Rocq."
+    )
+    _ = parser.add_argument("inputs", nargs="*", help="Input files.")
+    _ = parser.add_argument("-n", "--count", type=int, default=5)
+    _ = parser.add_argument(
+        "-s",
+        "--strategy",
+        dest="strategies",
+        action="append",
+        help="Reduction strategy to compare (repeatable).",
+    )
+    _ = parser.add_argument("-p", "--prosa", dest="prosa_path", default=None)
+    _ = parser.add_argument("-j", "--jobs", type=int, default=1)
+    _ = parser.add_argument(
+        "--keep", default=None, help="Keep the certificates in this folder."
+    )
+    opts = parser.parse_args()
+    strategies: list[str] = opts.strategies or DEFAULT_STRATEGIES
+
+    inputs: list[str] = opts.inputs or largest_inputs(opts.count)
+    fastest: list[tuple[str, str]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        base = opts.keep if opts.keep is not None else tmp
+        for path in inputs:
+            name = os.path.splitext(os.path.basename(path))[0]
+            times: dict[str, Times | None] = {}
+            for i, strategy in enumerate(strategies):
+                print(f"\r{name}: {strategy:<40}", end="", file=sys.stderr)
+                folder = os.path.join(base, name, f"strategy-{i}")
+                times[strategy] = certify(path, strategy, folder, opts)
+            print(file=sys.stderr)
+            fastest.append((name, report(name, strategies, times)))
+
+    print(f"\n{'input':<18}fastest")
+    for name, strategy in fastest:
+        print(f"{name:<18}{strategy}")
+
+
+if __name__ == "__main__":
+    main()
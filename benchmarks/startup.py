@@ -0,0 +1,111 @@
+"""
+Measures the start-up time of a schedulability test (`poet -t`).
+
+Usage: uv run python benchmarks/startup.py [-n RUNS] [--budget MS] [INPUT]
+
+The test is run RUNS times with Python's import-time tracing (-X importtime).
+The median wall-clock time, the median time spent importing modules, and the
+most expensive imports are reported. The benchmark fails if the median import
+time exceeds the budget, or if a module that a schedulability test does not
+need (see DEFERRED_MODULES) is imported.
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")
+DEFAULT_INPUT = os.path.join(ROOT, "examples", "paper.yaml")
+DEFAULT_BUDGET_MS = 300.0
+DEFERRED_MODULES = [
+    "joblib",
+    "numpy",
+    "poet.analysis_numpy",
+    "poet.batch",
+    "poet.server",
+    "poet.certificates.coq_generator",
+    "poet.certificates.pipeline",
+    "poet.certificates.cache",
+]
+IMPORT_TIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def traced_run(input_path: str) -> tuple[float, dict[str, float], set[str]]:
+    # Returns the wall-clock time, the cumulative import time (in seconds) of
+    # each top-level import, and the names of all imported modules.
+    env = dict(os.environ, PYTHONPATH=os.path.join(ROOT, "src"))
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "poet", "-t", input_path],
+        check=False,
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=ROOT,
+    )
+    wall_time = time.perf_counter() - start
+    if result.returncode != 0:
+        sys.exit(f"poet -t failed:\n{result.stdout}{result.stderr}")
+
+    imports: dict[str, float] = {}
+    modules: set[str] = set()
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_RE.match(line)
+        if match is None:
+            continue
+        modules.add(match.group(4))
+        if match.group(3) == " ":
+            imports[match.group(4)] = int(match.group(2)) / 1e6
+    return wall_time, imports, modules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measures the start-up time of a schedulability test (poet -t)."
+    )
+    _ = parser.add_argument("input", nargs="?", default=DEFAULT_INPUT)
+    _ = parser.add_argument("-n", "--runs", type=int, default=10)
+    _ = parser.add_argument(
+        "--budget",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help=f"Maximum median import time in ms (default: {DEFAULT_BUDGET_MS}).",
+    )
+    opts = parser.parse_args()
+
+    runs = [traced_run(opts.input) for _ in range(opts.runs)]
+    wall_time = statistics.median(wall for wall, _, _ in runs)
+    import_time = statistics.median(sum(imports.values()) for _, imports, _ in runs)
+    modules = {name for _, _, names in runs for name in names}
+
+    def median_time(name: str) -> float:
+        return statistics.median(imports.get(name, 0.0) for _, imports, _ in runs)
+
+    top = sorted({name for _, imports, _ in runs for name in imports}, key=median_time)
+
+    print(f"Runs              : {opts.runs}")
+    print(f"Wall-clock time   : {wall_time * 1000:.1f} ms (median)")
+    print(f"Import time       : {import_time * 1000:.1f} ms (median)")
+    print("Top-level imports :")
+    for name in reversed(top[-10:]):
+        print(f"  {name:<40} {median_time(name) * 1000:8.1f} ms")
+
+    failed = False
+    deferred = sorted(set(DEFERRED_MODULES) & modules)
+    if deferred:
+        print(f"FAIL: imported although not needed: {', '.join(deferred)}")
+        failed = True
+    if import_time * 1000 > opts.budget:
+        print(f"FAIL: import time exceeds the budget of {opts.budget:.0f} ms")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print(f"OK (budget: {opts.budget:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,56 +2,77 @@
 This is the main module of the project.
 """
 
+from __future__ import annotations
+
 import argparse
 import os
-import shutil
-import subprocess
 import sys
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
-from joblib import Parallel, delayed
 from pydantic import ValidationError
 
-from poet.analysis import AnalysisResults, analyze_task_set
-from poet.certificates import coq_generator, templates
+from poet import incremental
+from poet.analysis import BACKENDS, AnalysisResults, backend_available
+from poet.analysis_cache import analyze_task_set_cached
+from poet.cli import (
+    POETArgs,
+    add_async_proofs_argument,
+    add_coqchk_shards_argument,
+    add_memory_budget_argument,
+    add_reduction_argument,
+    add_time_limit_arguments,
+    add_trace_argument,
+    clean_certificates_folder,
+    generate_certificates,
+    open_analysis_cache,
+    open_certificate_cache,
+    prepare_certificates_folder,
+    start_trace,
+    update_failure_report,
+)
 from poet.model import Problem, Task
-from poet.utils import statistics, timing
+from poet.utils import timing, trace
+from poet.utils.cache import default_cache_folder
+
+# The modules needed to generate and check certificates are imported by the
+# functions using them, so that schedulability tests (-t) start faster.
+if TYPE_CHECKING:
+    from poet.certificates.cache import CertificateCache
+    from poet.utils import statistics
+    from poet.utils.processes import Resources
 
 DOCKERFILE_TEMPLATE_PATH = "templates/docker_certificates/Dockerfile"
 CERTIFICATE_CHECKER_PATH = "templates/docker_certificates/check_certificates.sh"
-GENERATED_FILE_TYPES = [
-    ".sh",
-    ".v",
-    ".vo",
-    ".vok",
-    ".vos",
-    ".glob",
-    ".aux",
-]  # Used to delete old results on each run
+SCALED_INPUT_FILE_NAME = "scaled_input.yaml"
+PRIORITIZED_INPUT_FILE_NAME = "prioritized_input.yaml"
 
 
 @dataclass(frozen=True)
-class CoqCompileResult:
-    success: bool
+class CertificateCheckResult:
+    coq_success: bool
+    coqchk_success: bool
     task_to_verify: Task | None
     expected_v_files: list[str]
     declaration_v_name: str
+    resources: dict[str, Resources]
+
 
+def main() -> None:
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        from poet.batch import run_batch
 
-class POETArgs(argparse.Namespace):
-    input_path: str = ""
-    verify_only_id: int | None = None
-    output_path: str | None = None
-    prosa_path: str | None = None
-    clean_output_folder: bool = False
-    delete_certificates: bool = False
-    save_stats: bool = False
-    bounded_tardiness_allowed: bool = False
-    test_schedulability: bool = False
-    repeat_declaration: bool = False
-    no_check: bool = False
-    jobs: int = 1
-    verify_without_dependencies: bool = False
+        run_batch(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == "convert":
+        from poet.convert import run_convert
+
+        run_convert(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == "serve":
+        from poet.server import run_server
+
+        run_server(sys.argv[2:])
+    else:
+        run_poet()
 
 
 def run_poet() -> None:
@@ -63,6 +84,7 @@ def run_poet() -> None:
     # Reading input, basic checks
     ######################################
     opts = parse_args()
+    start_trace(opts.trace)
     certificates_path, stats_folder = resolve_paths(opts)
 
     validate_input_path(opts)
@@ -71,66 +93,143 @@ def run_poet() -> None:
     # Parsing input file, performing RTA
     ######################################
 
-    problem_instance = load_problem(opts)
-    analysis_results = analyze_task_set(problem_instance)
+    with trace.span("parsing"):
+        problem_instance = load_problem(opts)
+    searched_results = None
+    if opts.sensitivity is not None:
+        # The scaled task set is certified instead of the given one.
+        with trace.span("sensitivity analysis"):
+            searched_results = run_sensitivity(problem_instance, stats_folder, opts)
+        problem_instance = searched_results.problem
+    elif opts.assign_priorities:
+        # Likewise, the task set with the assigned priorities
+        with trace.span("priority assignment"):
+            searched_results = run_priority_assignment(
+                problem_instance, stats_folder, opts
+            )
+        problem_instance = searched_results.problem
+    manifest = load_manifest(certificates_path, opts)
+    affected = incremental.affected_tasks(manifest, problem_instance)
+    rta_cache = open_analysis_cache(opts)
+    with trace.span("response-time analysis"):
+        analysis_results = analyze_task_set_cached(
+            problem_instance,
+            rta_cache,
+            opts.jobs,
+            searched_results.results
+            if searched_results is not None
+            else incremental.reusable_results(manifest, problem_instance, affected),
+            opts.rta_backend,
+        )
+    if rta_cache is not None and rta_cache.misses > 0:
+        rta_cache.evict()
     check_schedulability(problem_instance, analysis_results, opts)
 
     ######################################
     # Certificates generation
     ######################################
 
+    from poet.certificates import pipeline
+    from poet.utils import statistics
+
     prepare_certificates_folder(certificates_path, opts)
-    declaration_v_name = generate_certificates(
-        problem_instance,
-        analysis_results,
-        certificates_path,
-        opts,
+    incremental.remove_stale_certificates(manifest, problem_instance, certificates_path)
+    with trace.span("certificate generation"):
+        declaration_v_name = generate_certificates(
+            problem_instance,
+            analysis_results,
+            certificates_path,
+            opts,
+            incremental.reusable_certificates(
+                manifest,
+                problem_instance,
+                certificates_path,
+                affected,
+                manifest_options(opts),
+            ),
+        )
+    up_to_date, verified = up_to_date_certificates(
+        manifest, problem_instance, certificates_path, declaration_v_name, opts
     )
 
     _ = stopwatch.pause_timer("total_poet_time")
 
     if opts.no_check:
+        save_manifest(
+            problem_instance,
+            analysis_results,
+            certificates_path,
+            declaration_v_name,
+            up_to_date,
+            {vo[:-1] for vo in verified},
+            opts,
+        )
         sys.exit(0)
 
+    cache = open_certificate_cache(opts)
+
     ######################################
-    # Coq compilation
+    # Coq compilation and coqchk verification
     ######################################
 
-    stopwatch.start_timer("total_coq_time")
-
-    compile_result = compile_certificates(
+    check_result = check_certificates(
         problem_instance,
         certificates_path,
         opts,
         stopwatch,
         declaration_v_name,
-    )
-
-    _ = stopwatch.pause_timer("total_coq_time")
-
-    ######################################
-    # Coqchk verification
-    ######################################
-
-    coqchk_success = False
-    if compile_result.success:
-        stopwatch.start_timer("total_coqchk_time")
-        coqchk_success = verify_certificates(
+        cache,
+        up_to_date,
+        verified,
+        pipeline.estimate_costs(problem_instance, analysis_results, stats_folder),
+        pipeline.estimate_memory(
             problem_instance,
-            certificates_path,
-            compile_result.task_to_verify,
-            opts,
-            stopwatch,
+            stats_folder,
+            None if opts.repeat_declaration else declaration_v_name,
+        ),
+    )
+    _ = stopwatch.pause_timer("total_time")
+    coq_success = check_result.coq_success
+    coqchk_success = coq_success and check_result.coqchk_success
+    # With --async-proofs, the proofs are checked by coqc -vok instead of coqchk.
+    success = coq_success if opts.async_proofs else coqchk_success
+
+    if cache is not None:
+        cache.evict()
+
+    compiled_v_files = set(check_result.expected_v_files)
+    verified_v_files = set(check_result.expected_v_files)
+    if check_result.task_to_verify is not None:
+        verified_v_files = {check_result.task_to_verify.v_name()}
+        compiled_v_files = verified_v_files | (
+            set() if opts.repeat_declaration else {declaration_v_name}
         )
-
-        _ = stopwatch.pause_timer("total_coqchk_time")
-        _ = stopwatch.pause_timer("total_time")
+    # coqc -vos/-vok do not produce .vo files, hence nothing is recorded as
+    # compiled (a .vo file on disk may stem from an earlier run).
+    save_manifest(
+        problem_instance,
+        analysis_results,
+        certificates_path,
+        declaration_v_name,
+        up_to_date
+        | (compiled_v_files if coq_success and not opts.async_proofs else set()),
+        {vo[:-1] for vo in verified} | (verified_v_files if coqchk_success else set()),
+        opts,
+    )
 
     ######################################
     # Statistics
     ######################################
 
-    stats = statistics.Statistics(problem_instance, analysis_results, stopwatch)
+    stats = statistics.Statistics(
+        problem_instance,
+        analysis_results,
+        stopwatch,
+        cache,
+        opts.minimal_search_space,
+        rta_cache,
+        check_result.resources,
+    )
 
     ######################################
     # Saving stats and closing actions
@@ -140,8 +239,8 @@ def run_poet() -> None:
         certificates_path,
         stats_folder,
         stats,
-        compile_result.success,
-        compile_result.success and coqchk_success,
+        coq_success,
+        success,
         opts,
     )
 
@@ -166,11 +265,15 @@ def validate_input_path(opts: POETArgs) -> None:
         os.path.exists(opts.input_path) and os.path.isfile(opts.input_path),
         f"File not found: {opts.input_path}",
     )
+    ensure(
+        backend_available(opts.rta_backend),
+        f"The {opts.rta_backend} analysis backend requires NumPy, which is not installed.",
+    )
 
 
 def load_problem(opts: POETArgs) -> Problem:
     try:
-        problem_instance = Problem.from_yaml_file(opts.input_path)
+        problem_instance = Problem.from_file(opts.input_path)
     except ValidationError as err:
         print("Failed to parse input:")
         for e in err.errors(include_url=False, include_input=True):
@@ -221,144 +324,187 @@ def check_schedulability(
         sys.exit(1)
 
 
-def prepare_certificates_folder(certificates_path: str, opts: POETArgs) -> None:
-    if opts.clean_output_folder:
-        clean_certificates_folder(certificates_path)
-    if not os.path.exists(certificates_path):
-        os.makedirs(certificates_path)
+def run_sensitivity(
+    problem_instance: Problem, stats_folder: str, opts: POETArgs
+) -> AnalysisResults:
+    # Reports the largest schedulable WCET scaling factor(s). Exits unless the
+    # scaled task set (for a uniform factor) is to be certified.
+    from poet import sensitivity
+    from poet.convert import dump_problem
 
+    if opts.sensitivity == "per-task":
+        print("Largest WCET scaling factors per task:")
+        for t in problem_instance.task_set:
+            result = sensitivity.max_sensitivity(
+                problem_instance,
+                opts.bounded_tardiness_allowed,
+                {t.id},
+                opts.jobs,
+                opts.rta_backend,
+            )
+            [scaled] = [u for u in result.problem.task_set if u.id == t.id]
+            print(
+                f"- Task {t.id}: {sensitivity.format_factor(result.factor)}",
+                f"(WCET {t.wcet} -> {scaled.wcet}, {result.steps} steps)",
+            )
+        sys.exit(0)
 
-def generate_certificates(
-    problem_instance: Problem,
-    analysis_results: AnalysisResults,
-    certificates_path: str,
-    opts: POETArgs,
-) -> str:
-    external_declaration: str | None = None
-    for task in problem_instance.task_set:
-        results = analysis_results.results[task]
-        proof, proof_declaration = coq_generator.generate_proof(
-            problem_instance,
-            task,
-            results,
-            opts.bounded_tardiness_allowed,
-            not opts.repeat_declaration,
-        )
-        if external_declaration is None:
-            external_declaration = proof_declaration
-        else:
-            assert proof_declaration == external_declaration
+    result = sensitivity.max_sensitivity(
+        problem_instance,
+        opts.bounded_tardiness_allowed,
+        None,
+        opts.jobs,
+        opts.rta_backend,
+    )
+    print(
+        f"Largest WCET scaling factor: {sensitivity.format_factor(result.factor)}",
+        f"({result.steps} steps)",
+    )
+    if result.analysis_results is None:
+        print("The task set is not schedulable with any scaling factor.")
+        sys.exit(0 if opts.test_schedulability else 1)
+    for t, scaled in zip(problem_instance.task_set, result.problem.task_set):
+        print(f"- Task {t.id}: WCET {t.wcet} -> {scaled.wcet}")
+    if opts.test_schedulability:
+        sys.exit(0)
+
+    scaled_input_path = os.path.join(stats_folder, SCALED_INPUT_FILE_NAME)
+    with open(scaled_input_path, "w") as f:
+        _ = f.write(dump_problem(result.problem, "yaml"))
+    print(f"Certifying the scaled task set (saved to {scaled_input_path}).")
+    return result.analysis_results
+
+
+def run_priority_assignment(
+    problem_instance: Problem, stats_folder: str, opts: POETArgs
+) -> AnalysisResults:
+    # Reports the priorities found by Audsley's algorithm. With -t, exits;
+    # otherwise, saves the task set with these priorities to be certified.
+    from poet import priority_assignment
+    from poet.convert import dump_problem
 
-        certificate_path = os.path.join(certificates_path, task.name() + ".v")
-        save_certificate(certificate_path, proof)
+    ensure(
+        problem_instance.scheduling_policy.is_fp(),
+        "Priorities can only be assigned under FP scheduling.",
+    )
+    result = priority_assignment.assign_priorities(
+        problem_instance, opts.bounded_tardiness_allowed, opts.jobs, opts.rta_backend
+    )
+    if result.problem is None or result.analysis_results is None:
+        print(
+            "No priority assignment is schedulable",
+            f"({result.analyses} per-task analyses).",
+        )
+        sys.exit(0 if opts.test_schedulability else 1)
+    print(f"Assigned priorities ({result.analyses} per-task analyses):")
+    for t in result.problem.task_set:
+        print(f"- Task {t.id}: {t.priority}")
 
-    declaration_v_name = f"{templates.TASK_SET_DECLARATION_FILE_NAME}.v"
-    if not opts.repeat_declaration:  # Save declaration
-        assert external_declaration is not None
-        certificate_path = os.path.join(certificates_path, declaration_v_name)
-        save_certificate(certificate_path, external_declaration)
-    return declaration_v_name
+    if opts.test_schedulability:
+        sys.exit(0)
+    prioritized_input_path = os.path.join(stats_folder, PRIORITIZED_INPUT_FILE_NAME)
+    with open(prioritized_input_path, "w") as f:
+        _ = f.write(dump_problem(result.problem, "yaml"))
+    print(f"Saved the task set with these priorities to {prioritized_input_path}.")
+    return result.analysis_results
 
 
-def compile_certificates(
+def check_certificates(
     problem_instance: Problem,
     certificates_path: str,
     opts: POETArgs,
     stopwatch: timing.Stopwatch,
     declaration_v_name: str,
-) -> CoqCompileResult:
+    cache: CertificateCache | None = None,
+    up_to_date: set[str] | None = None,
+    verified: set[str] | None = None,
+    costs: dict[str, tuple[float, float]] | None = None,
+    memory_estimates: dict[str, tuple[float, float]] | None = None,
+) -> CertificateCheckResult:
+    # Compiles and verifies the certificates in one pipeline: each certificate
+    # is verified as soon as it (and the declaration it imports) is compiled.
+    # Certificates in `up_to_date` (by .v name) and `verified` (by .vo name)
+    # were already compiled or checked by a previous run and are skipped.
+    # The most expensive certificates (according to `costs`) are started first.
+    # With a memory budget, `memory_estimates` hold back jobs that do not fit.
+    from poet.certificates import pipeline, templates
+
+    up_to_date = up_to_date if up_to_date is not None else set()
+    verified = verified if verified is not None else set()
     expected_v_files = [t.v_name() for t in problem_instance.task_set]
     if not opts.repeat_declaration:
         expected_v_files = [declaration_v_name] + expected_v_files
     v_files = [f.name for f in os.scandir(certificates_path) if f.name.endswith(".v")]
     assert sorted(expected_v_files) == sorted(v_files)
 
-    coq_results: list[float] = []
     task_to_verify: Task | None = None
-    if not opts.repeat_declaration:  # declaration should be compiled first
-        dec_time = compile_certificate(
-            opts.prosa_path, certificates_path, declaration_v_name, False
-        )
-        coq_results.append(dec_time)
-
-    if opts.verify_only_id is None:
-        parallel_results = Parallel(n_jobs=opts.jobs)(
-            delayed(compile_certificate)(
-                opts.prosa_path, certificates_path, v, not opts.repeat_declaration
-            )
-            for v in expected_v_files
-            if v != declaration_v_name
-        )
-        coq_results.extend(parallel_results)
-        coq_success = all(r > 0 for r in coq_results)
-
-        for i in range(len(coq_results)):
-            stopwatch.set_time(f"{expected_v_files[i]}_coq_time", coq_results[i])
-    else:
+    if opts.verify_only_id is not None:
         task_to_verify_vec = [
             t for t in problem_instance.task_set if t.id == opts.verify_only_id
         ]
         assert task_to_verify_vec and len(task_to_verify_vec) == 1
         task_to_verify = task_to_verify_vec[0]
-        v = task_to_verify.v_name()
-        time = compile_certificate(
-            opts.prosa_path, certificates_path, v, not opts.repeat_declaration
-        )
-        coq_success = time > 0
-        stopwatch.set_time(f"{v}_coq_time", time)
 
-    return CoqCompileResult(
-        success=coq_success,
-        task_to_verify=task_to_verify,
-        expected_v_files=expected_v_files,
-        declaration_v_name=declaration_v_name,
+    jobs = pipeline.certificate_jobs(
+        certificates_path,
+        expected_v_files
+        if task_to_verify is None
+        else [
+            v
+            for v in expected_v_files
+            if v in [declaration_v_name, task_to_verify.v_name()]
+        ],
+        None if opts.repeat_declaration else declaration_v_name,
+        templates.get_main_certificate_path(problem_instance),
+        opts.prosa_path,
+        opts.verify_without_dependencies,
+        cache,
+        up_to_date,
+        verified
+        if task_to_verify is None or opts.repeat_declaration
+        # only the task's certificate is verified
+        else verified | {f"{declaration_v_name}o"},
+        costs,
+        coqchk_shards=opts.coqchk_shards,
+        async_proofs=opts.async_proofs,
+        memory_estimates=memory_estimates,
     )
 
-
-def verify_certificates(
-    problem_instance: Problem,
-    certificates_path: str,
-    task_to_verify: Task | None,
-    opts: POETArgs,
-    stopwatch: timing.Stopwatch,
-) -> bool:
-    declaration_vo_name = f"{templates.TASK_SET_DECLARATION_FILE_NAME}.vo"
-
-    if opts.verify_only_id is None:
-        expected_vo_files = [t.vo_name() for t in problem_instance.task_set]
-        if not opts.repeat_declaration:
-            expected_vo_files = [declaration_vo_name] + expected_vo_files
-        vo_files = [
-            f.name for f in os.scandir(certificates_path) if f.name.endswith(".vo")
-        ]
-        assert sorted(expected_vo_files) == sorted(vo_files)
-
-        parallel_results = Parallel(n_jobs=opts.jobs)(
-            delayed(verify_certificate)(
-                opts.prosa_path,
-                certificates_path,
-                vo,
-                opts.verify_without_dependencies,
-            )
-            for vo in expected_vo_files
+    stopwatch.start_timer("total_pipeline_time")
+    with trace.span("compilation and verification"):
+        success = pipeline.run_pipeline(
+            jobs,
+            opts.jobs,
+            opts.memory_budget,
+            opts.job_timeout,
+            opts.timeout,
+            opts.fail_fast,
         )
-        coqchk_results = parallel_results
-        coqchk_success = all(r > 0 for r in coqchk_results)
+    _ = stopwatch.pause_timer("total_pipeline_time")
+    pipeline.trace_jobs(jobs)
+    update_failure_report(certificates_path, jobs, success, opts)
 
-        for i in range(len(coqchk_results)):
-            stopwatch.set_time(f"{expected_vo_files[i]}_coqchk_time", coqchk_results[i])
-        return coqchk_success
-
-    assert task_to_verify is not None
-    vo = task_to_verify.vo_name()
-    time = verify_certificate(
-        opts.prosa_path,
-        certificates_path,
-        vo,
-        opts.verify_without_dependencies,
+    stopwatch.set_time("total_coq_time", pipeline.stage_span(jobs, pipeline.COQ_STAGE))
+    stopwatch.set_time(
+        "total_coqchk_time", pipeline.stage_span(jobs, pipeline.COQCHK_STAGE)
+    )
+    checked = [j for j in jobs if j.stage == pipeline.COQCHK_STAGE]
+    for name, time in pipeline.job_times(jobs).items():
+        stopwatch.set_time(name, time)
+    for v in up_to_date:
+        stopwatch.set_time(f"{v}_coq_time", 0.0)
+    for vo in verified:
+        stopwatch.set_time(f"{vo}_coqchk_time", 0.0)
+
+    return CertificateCheckResult(
+        coq_success=all(j.succeeded() for j in jobs if j.stage == pipeline.COQ_STAGE),
+        # With --async-proofs, coqchk does not run, hence verifies nothing.
+        coqchk_success=not opts.async_proofs and all(j.succeeded() for j in checked),
+        task_to_verify=task_to_verify,
+        expected_v_files=expected_v_files,
+        declaration_v_name=declaration_v_name,
+        resources=pipeline.job_resources(jobs),
     )
-    stopwatch.set_time(f"{vo}_coqchk_time", time)
-    return time > 0
 
 
 def finalize_run(
@@ -386,13 +532,20 @@ def finalize_run(
         stats_path = os.path.join(stats_folder, name)
         stats.save(stats_path)
 
+    if not success:
+        sys.exit(1)
+
 
 def parse_args() -> POETArgs:
     parser = argparse.ArgumentParser(
-        prog="poet", description="POET: A foundational response-time analysis tool"
+        prog="poet",
+        description="POET: A foundational response-time analysis tool",
+        epilog="Run `poet batch -h` to see how to process many workloads at once, "
+        + "`poet serve -h` to see how to answer analysis requests over HTTP, "
+        + "and `poet convert -h` to see how to convert input files to JSON.",
     )
 
-    _ = parser.add_argument("input_path", help="Input file.")
+    _ = parser.add_argument("input_path", help="Input file (YAML or JSON).")
 
     _ = parser.add_argument(
         "-c",
@@ -428,9 +581,15 @@ def parse_args() -> POETArgs:
         default=1,
         type=int,
         action="store",
-        help="Maximum number of jobs while compiling and verifying.",
+        help="Maximum number of jobs while analyzing, compiling, and verifying.",
     )
 
+    add_coqchk_shards_argument(parser)
+    add_async_proofs_argument(parser)
+    add_memory_budget_argument(parser)
+    add_time_limit_arguments(parser)
+    add_trace_argument(parser)
+
     _ = parser.add_argument(
         "-i",
         "--id",
@@ -486,6 +645,16 @@ def parse_args() -> POETArgs:
         help="Repeat the task set declaration in every certificate.",
     )
 
+    _ = parser.add_argument(
+        "--minimal-search-space",
+        dest="minimal_search_space",
+        default=False,
+        action="store_true",
+        help="Check only the points of the search space below L in the certificates.",
+    )
+
+    add_reduction_argument(parser)
+
     _ = parser.add_argument(
         "-v",
         "--verify-without-dependencies",
@@ -495,6 +664,73 @@ def parse_args() -> POETArgs:
         help="Ignore the dependencies (Prosa, ssreflect, ...) while verifying.",
     )
 
+    _ = parser.add_argument(
+        "--rta-backend",
+        dest="rta_backend",
+        default="pyrta",
+        choices=BACKENDS,
+        action="store",
+        help="Implementation of the response-time analysis: pyRTA (default) or "
+        + "the vectorized one (requires NumPy); both yield the same results.",
+    )
+
+    search = parser.add_mutually_exclusive_group()
+
+    _ = search.add_argument(
+        "--sensitivity",
+        dest="sensitivity",
+        default=None,
+        choices=["uniform", "per-task"],
+        action="store",
+        help="Search the largest factor (in steps of 0.001) by which all WCETs "
+        + "(uniform) or each task's WCET (per-task) can be scaled "
+        + "such that the task set remains schedulable (with -b: has bounded "
+        + "response times). A uniformly scaled task set is then certified, "
+        + "unless -t is given.",
+    )
+
+    _ = search.add_argument(
+        "--assign-priorities",
+        dest="assign_priorities",
+        default=False,
+        action="store_true",
+        help="Ignore the given priorities and search a schedulable assignment "
+        + "(with -b: one with bounded response times) with Audsley's algorithm "
+        + f"(FP scheduling only). It is saved to {PRIORITIZED_INPUT_FILE_NAME} "
+        + "and certified, unless -t is given.",
+    )
+
+    _ = parser.add_argument(
+        "--cache",
+        dest="cache_path",
+        default=None,
+        nargs="?",
+        const=default_cache_folder(),
+        action="store",
+        metavar="FOLDER",
+        help="Reuse analysis results, compiled certificates, and coqchk verdicts of earlier runs "
+        + f"(default folder: {default_cache_folder()}).",
+    )
+
+    _ = parser.add_argument(
+        "--cache-size",
+        dest="cache_size",
+        default=1024,
+        type=int,
+        action="store",
+        metavar="MB",
+        help="Maximum size of the cache; least recently used entries are evicted.",
+    )
+
+    _ = parser.add_argument(
+        "--incremental",
+        dest="incremental",
+        default=False,
+        action="store_true",
+        help="Reuse the analysis results, certificates, and checks of the previous "
+        + "run in the same output folder for the tasks that did not change.",
+    )
+
     _ = parser.add_argument(
         "-n",
         "--no-check",
@@ -513,87 +749,70 @@ def ensure(condition: bool, error_message: str) -> None:
         sys.exit(1)
 
 
-def clean_certificates_folder(certificates_path: str, delete_all: bool = False) -> None:
-    if not os.path.exists(certificates_path):
-        return
-
-    if delete_all:
-        shutil.rmtree(certificates_path)
-    else:
-        for file in os.scandir(certificates_path):
-            ext = os.path.splitext(file)[1]
-            if ext in GENERATED_FILE_TYPES:
-                os.unlink(file.path)
-
-        remainining_files = len(os.listdir(certificates_path))
-        if remainining_files > 0:
-            print(
-                f"Certificates path is not empty: {remainining_files} files detected. Continuing anyway..."
-            )
+def manifest_options(opts: POETArgs) -> dict[str, object]:
+    return incremental.manifest_options(
+        opts.bounded_tardiness_allowed,
+        opts.repeat_declaration,
+        opts.minimal_search_space,
+        opts.prosa_path,
+        opts.reduction,
+        opts.async_proofs,
+    )
 
 
-def save_certificate(path: str, certificate: str) -> None:
-    try:
-        with open(path, "w") as f:
-            _ = f.write(certificate)
-    except Exception as e:
-        print(f"Error while saving certificate to '{path}'")
-        print(e)
+def load_manifest(
+    certificates_path: str, opts: POETArgs
+) -> incremental.Manifest | None:
+    if not opts.incremental or opts.clean_output_folder:
+        return None
+    return incremental.Manifest.load(certificates_path)
 
 
-def compile_certificate(
-    prosa_path: str | None,
+def up_to_date_certificates(
+    manifest: incremental.Manifest | None,
+    problem_instance: Problem,
     certificates_path: str,
-    certificate: str,
-    _external_dec: bool,
-) -> float:
-    stopwatch = timing.Stopwatch()
-    stopwatch.start_timer("coq_time")
-    print(f"Compiling {certificate}...")
-    cmd = [
-        "coqc",
-        "-w",
-        "-notation-overriden,-parsing,-projection-no-head-constant",
-        certificate,
-    ]
-    if prosa_path:
-        cmd += ["-Q", prosa_path, "prosa"]
-
-    return_code = subprocess.call(cmd, cwd=certificates_path)
-    success = return_code == 0
-    if not success:
-        print(f"Compilation of {certificate} ended with return code {return_code}")
-        sys.exit(return_code)
-
-    time = stopwatch.stop_timer("coq_time")
-    return time if success else -1
+    declaration_v_name: str,
+    opts: POETArgs,
+) -> tuple[set[str], set[str]]:
+    v_files = [t.v_name() for t in problem_instance.task_set]
+    if not opts.repeat_declaration:
+        v_files = [declaration_v_name] + v_files
+    return incremental.up_to_date_files(
+        manifest,
+        certificates_path,
+        v_files,
+        None if opts.repeat_declaration else declaration_v_name,
+        manifest_options(opts),
+        opts.verify_without_dependencies,
+    )
 
 
-def verify_certificate(
-    prosa_path: str | None,
+def save_manifest(
+    problem_instance: Problem,
+    analysis_results: AnalysisResults,
     certificates_path: str,
-    certificate: str,
-    verify_without_dependencies: bool,
-) -> float:
-    stopwatch = timing.Stopwatch()
-    stopwatch.start_timer("coqchk_time")
-    print(f"Verifying {certificate}...")
-    cmd = ["coqchk", "-o", "-silent"]
-    if prosa_path:
-        cmd += ["-R", prosa_path, "prosa"]
-    if verify_without_dependencies:
-        cmd += ["-norec"]
-    cmd += [certificate]
-
-    return_code = subprocess.call(cmd, cwd=certificates_path)
-    success = return_code == 0
-    if not success:
-        print(f"Verifying of {certificate} ended with return code {return_code}")
-        sys.exit(return_code)
-
-    time = stopwatch.stop_timer("coqchk_time")
-    return time if success else -1
+    declaration_v_name: str,
+    compiled: set[str],
+    verified: set[str],
+    opts: POETArgs,
+) -> None:
+    if not opts.incremental or opts.delete_certificates:
+        return
+    v_files = [t.v_name() for t in problem_instance.task_set]
+    if not opts.repeat_declaration:
+        v_files = [declaration_v_name] + v_files
+    incremental.build_manifest(
+        problem_instance,
+        analysis_results,
+        certificates_path,
+        v_files,
+        manifest_options(opts),
+        compiled,
+        verified,
+        opts.verify_without_dependencies,
+    ).save(certificates_path)
 
 
 if __name__ == "__main__":
-    run_poet()
+    main()
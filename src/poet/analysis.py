@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import functools
+import os
+from collections.abc import Callable
 from dataclasses import dataclass
-from typing import override
+from importlib.util import find_spec
+from typing import cast
 
-from response_time_analysis import edf, fp
 from response_time_analysis import model as rta_model
-from response_time_analysis.analysis import Solution as RTASolution
 
-from .model import Problem, SchedulingPolicy, Task
+from .model import Problem, SchedulingPolicy, Task, indexed_arrival_curves
+from .task_analysis import TaskAnalysisResults, analyze
+from .utils import trace
 
 
 @dataclass
@@ -25,69 +29,84 @@ class AnalysisResults:
         )
 
 
-@dataclass
-class TaskAnalysisResults:
-    rta_solution: RTASolution
-    L: int
-    SS: list[int]
-    Fs: list[int]
-    R: int
-
-    @override
-    def __str__(self) -> str:
-        exact_search_space = set((point for point in self.SS if point < self.L))
-        return f"L: {self.L} | R: {self.R} | SS size: {len(self.SS)} | exact size: {len(exact_search_space)}"
-
-
-def analyze_task_set(problem: Problem) -> AnalysisResults:
-    task_set_for_rta = problem.to_rta_model().with_arrival_curves()
+# "pyrta" uses the fixed-point iterations of pyRTA, "numpy" the vectorized
+# implementation in analysis_numpy.py (if NumPy is installed).
+BACKENDS = ["pyrta", "numpy"]
+
+
+def analyze_task_set(
+    problem: Problem,
+    jobs: int = 1,
+    known: dict[Task, TaskAnalysisResults] | None = None,
+    backend: str = "pyrta",
+    warm_start: dict[int, TaskAnalysisResults] | None = None,
+) -> AnalysisResults:
+    # Analyzes all tasks, using up to `jobs` worker processes. The per-task
+    # analyses are independent, so the results do not depend on `jobs`.
+    # Tasks with `known` results (e.g., from a previous run) are not analyzed again.
+    # `warm_start` holds results (by task id) for the same tasks with WCETs that
+    # are not larger, which are lower bounds on the new ones; the fixed-point
+    # iterations of the NumPy backend start from them.
+    known = known if known is not None else {}
+    warm_start = warm_start if warm_start is not None else {}
+    task_set_for_rta = indexed_arrival_curves(
+        problem.to_rta_model().with_arrival_curves()
+    )
+    pending = [
+        (t, tsk) for tsk, t in zip(task_set_for_rta, problem.task_set) if t not in known
+    ]
+    analyze_task = task_analyzer(problem.scheduling_policy, task_set_for_rta, backend)
+    # Each analysis also returns when and in which process it ran (see --trace).
+    run = functools.partial(trace.timed, analyze_task)
+    if jobs == 1 or len(pending) < 2:
+        timed_results = [run(tsk, warm_start.get(t.id)) for t, tsk in pending]
+    else:
+        # joblib is only imported when needed, as it takes long to load.
+        from joblib import Parallel, delayed
+
+        timed_results = cast(
+            list[tuple[TaskAnalysisResults, float, float, int]],
+            Parallel(n_jobs=jobs)(
+                delayed(run)(tsk, warm_start.get(t.id)) for t, tsk in pending
+            ),
+        )
+    computed: dict[Task, TaskAnalysisResults] = {}
+    for (t, _), (result, start, end, pid) in zip(pending, timed_results):
+        lane = trace.MAIN_LANE if pid == os.getpid() else f"analysis worker {pid}"
+        trace.add_span(f"RTA {t.name()}", "analysis", start, end, lane)
+        computed[t] = result
     return AnalysisResults(
-        problem,
-        {
-            t: analyze(problem.scheduling_policy, task_set_for_rta, tsk)
-            for tsk, t in zip(task_set_for_rta, problem.task_set)
-        },
+        problem, {t: known[t] if t in known else computed[t] for t in problem.task_set}
     )
 
 
-THREE_YEARS_IN_NANOSECONDS = 10**17
+def task_analyzer(
+    scheduling_policy: SchedulingPolicy,
+    all_tasks: rta_model.TaskSet,
+    backend: str,
+) -> Callable[[rta_model.Task, TaskAnalysisResults | None], TaskAnalysisResults]:
+    if backend == "numpy":
+        # NumPy is an optional dependency, hence imported only when used.
+        from . import analysis_numpy
+
+        return functools.partial(
+            analysis_numpy.analyze,
+            scheduling_policy,
+            analysis_numpy.TaskSetArrays(all_tasks),
+        )
+    assert backend == "pyrta", f"unknown analysis backend '{backend}'"
+    return functools.partial(analyze_from_scratch, scheduling_policy, all_tasks)
 
 
-def analyze(
+def analyze_from_scratch(
     scheduling_policy: SchedulingPolicy,
     all_tasks: rta_model.TaskSet,
     task_under_analysis: rta_model.Task,
-    horizon: int = THREE_YEARS_IN_NANOSECONDS,
-):
-    # Computes R for the given task.
-    # L and R are -1 if they cannot be bounded.
-
-    # run the RTA
-    if scheduling_policy.is_fp():
-        sol = fp.rta(
-            all_tasks,
-            task_under_analysis,
-            rta_model.IdealProcessor(),
-            use_poet_search_space=True,
-            horizon=horizon,
-        )
-    elif scheduling_policy.is_edf():
-        sol = edf.rta(
-            all_tasks,
-            task_under_analysis,
-            rta_model.IdealProcessor(),
-            use_poet_search_space=True,
-            horizon=THREE_YEARS_IN_NANOSECONDS,
-        )
-    else:
-        assert False, "support for policies other than FP and EDF not yet implemented"
-
-    if sol.busy_window_bound is None or sol.search_space is None:
-        # Infinite busy-interval, not schedulable
-        return TaskAnalysisResults(sol, -1, [], [], -1)
+    _warm_start: TaskAnalysisResults | None,
+) -> TaskAnalysisResults:
+    # pyRTA's fixed-point iterations cannot be warm-started.
+    return analyze(scheduling_policy, all_tasks, task_under_analysis)
 
-    SS = [A for (A, _F, _R) in sol.search_space]
-    Fs: list[int] = [max(0, (F or 0) - A) for (A, F, _R) in sol.search_space]
-    R = sol.response_time_bound if sol.response_time_bound is not None else -1
 
-    return TaskAnalysisResults(sol, sol.busy_window_bound, SS, Fs, R)
+def backend_available(backend: str) -> bool:
+    return backend != "numpy" or find_spec("numpy") is not None
@@ -0,0 +1,123 @@
+"""
+This module caches the results of the response-time analysis across runs.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+
+from pydantic import TypeAdapter, ValidationError
+
+from .analysis import AnalysisResults, analyze_task_set
+from .model import Problem, Task
+from .task_analysis import TaskAnalysisResults, TaskResultsDict
+from .utils.cache import DiskCache, content_hash
+
+RESULTS_FILE_NAME = "rta_results.json"
+
+# Part of the cache key besides the version of POET, so that results are not
+# reused across changes to how analyze() derives L, R, SS, and Fs from pyRTA's
+# solution (e.g., in a development version). Increment it with such changes.
+RESULTS_FORMAT_VERSION = 1
+
+# The results of all tasks of a cache entry, by task id
+RESULTS_BY_ID: TypeAdapter[dict[int, TaskResultsDict]] = TypeAdapter(
+    dict[int, TaskResultsDict]
+)
+
+
+class AnalysisCache:
+    # Cache entries are keyed by a canonical form of the problem instance
+    # (scheduling policy, preemption model, and all tasks ordered by id) and the
+    # versions of pyRTA and POET, and hold L, R, SS, and Fs of every task.
+    # Entries share the folder (and the size bound) of the certificate cache.
+
+    def __init__(self, cache_folder: str, max_size: int) -> None:
+        self.store: DiskCache = DiskCache(cache_folder, max_size)
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def lookup(self, problem: Problem) -> AnalysisResults | None:
+        text = self.store.read_text(problem_key(problem), RESULTS_FILE_NAME)
+        try:
+            by_id = RESULTS_BY_ID.validate_json(text) if text is not None else None
+        except ValidationError:
+            by_id = None  # a corrupted entry is overwritten by save()
+        if by_id is None or any(t.id not in by_id for t in problem.task_set):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return AnalysisResults(
+            problem,
+            {t: TaskAnalysisResults.from_dict(by_id[t.id]) for t in problem.task_set},
+        )
+
+    def save(self, problem: Problem, analysis_results: AnalysisResults) -> None:
+        by_id = {t.id: analysis_results.results[t].to_dict() for t in problem.task_set}
+        self.store.write_text(
+            problem_key(problem), RESULTS_FILE_NAME, json.dumps(by_id)
+        )
+
+    def evict(self) -> None:
+        _ = self.store.evict()
+
+
+def problem_key(problem: Problem) -> str:
+    tasks = sorted(problem.task_set, key=lambda t: t.id)
+    canonical = {
+        "scheduling_policy": "FP" if problem.scheduling_policy.is_fp() else "EDF",
+        "preemption_model": "FP" if problem.preemption_model.is_fp() else "NP",
+        "tasks": [canonical_task(t) for t in tasks],
+    }
+    return content_hash(
+        "rta",
+        json.dumps(canonical, sort_keys=True),
+        rta_version(),
+        poet_version(),
+        str(RESULTS_FORMAT_VERSION),
+    )
+
+
+@functools.cache
+def rta_version() -> str:
+    from importlib import metadata
+
+    return metadata.version("response-time-analysis")
+
+
+@functools.cache
+def poet_version() -> str:
+    # POET may also be run from a source tree that is not installed.
+    from importlib import metadata
+
+    try:
+        return metadata.version("poet")
+    except metadata.PackageNotFoundError:
+        return ""
+
+
+def canonical_task(t: Task) -> dict[str, object]:
+    # The arrival curve as written in the input is already parsed into
+    # arrival_curve, hence both spellings yield the same key.
+    return t.model_dump(mode="json", exclude_none=True, exclude={"arrival_curve_spec"})
+
+
+def analyze_task_set_cached(
+    problem: Problem,
+    cache: AnalysisCache | None,
+    jobs: int = 1,
+    known: dict[Task, TaskAnalysisResults] | None = None,
+    backend: str = "pyrta",
+) -> AnalysisResults:
+    # Like analyze_task_set(), but returns the cached results if the same
+    # problem instance was analyzed before. All backends yield the same
+    # results, hence they share the cache entries.
+    if cache is None:
+        return analyze_task_set(problem, jobs, known, backend)
+    cached = cache.lookup(problem)
+    if cached is not None:
+        return cached
+    analysis_results = analyze_task_set(problem, jobs, known, backend)
+    cache.save(problem, analysis_results)
+    return analysis_results
@@ -0,0 +1,315 @@
+"""
+This module implements a vectorized response-time analysis with NumPy, an
+alternative to pyRTA's scalar fixed-point iterations. The request-bound
+functions of all tasks are evaluated at many points at once, and the fixed
+points of all offsets in the search space are computed together. The results
+are the same as those of task_analysis.analyze().
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+
+import numpy as np
+import numpy.typing as npt
+from response_time_analysis import model as rta_model
+
+from .model import SchedulingPolicy
+from .task_analysis import THREE_YEARS_IN_NANOSECONDS, TaskAnalysisResults
+from .task_analysis import analyze as analyze_scalar
+
+Ints = npt.NDArray[np.int64]
+
+# All intermediate values must stay well below 2^63.
+INT64_LIMIT = 2**60
+
+
+class RequestBounds:
+    # The request-bound functions of a group of tasks with arrival-curve
+    # prefixes. The steps of all curves are stored in one sorted array, where
+    # the steps of the j-th task are shifted by j * stride (stride > all
+    # horizons) and preceded by a sentinel step (0, 0), so that a single
+    # searchsorted() looks up the arrivals of all tasks.
+
+    def __init__(self, tasks: Sequence[rta_model.Task]) -> None:
+        curves = [curve_of(t) for t in tasks]
+        self.size: int = len(tasks)
+        self.stride: int = max((c.horizon for c in curves), default=0) + 1
+        self.horizons: Ints = column([c.horizon for c in curves])
+        self.per_horizon: Ints = column([c.ac_steps[-1][1] for c in curves])
+        self.costs: Ints = column([t.cost.value for t in tasks])
+        self.offsets: Ints = column([j * self.stride for j in range(len(tasks))])
+        self.deltas: Ints = np.array(
+            [j * self.stride + d for j, c in enumerate(curves) for d in step_deltas(c)],
+            dtype=np.int64,
+        )
+        self.counts: Ints = np.array(
+            [n for c in curves for n in step_counts(c)], dtype=np.int64
+        )
+
+    def rbf(self, delta: Ints) -> Ints:
+        # RBF_j(delta) of every task j; delta is broadcast against a column
+        # with one row per task.
+        windows, offset = np.divmod(delta, self.horizons)
+        index = np.searchsorted(self.deltas, offset + self.offsets, side="right") - 1
+        arrivals = windows * self.per_horizon + self.counts[index]
+        return np.where(delta > 0, self.costs * arrivals, 0)
+
+    def total(self, delta: Ints) -> Ints:
+        # The sum of all RBFs at each of the given points.
+        if self.size == 0:
+            return np.zeros_like(delta)
+        return self.rbf(delta[np.newaxis, :]).sum(axis=0)
+
+
+class TaskSetArrays:
+    # The task set and the per-task parameters used by the analysis, as arrays.
+
+    def __init__(self, task_set: rta_model.TaskSet) -> None:
+        self.task_set: rta_model.TaskSet = task_set
+        tasks = task_set.tasks
+        self.all: RequestBounds = RequestBounds(tasks)
+        self.deadlines: Ints = column([rta_model.deadline_of(t).value for t in tasks])
+        self.max_nps: Ints = column(
+            [t.execution.max_non_preemptive_segment for t in tasks]
+        )
+
+    def fits_int64(self, horizon: int) -> bool:
+        # Bounds all values computed by the analysis (with Python integers),
+        # assuming that no fixed-point iteration continues beyond the horizon.
+        curves = [curve_of(t) for t in self.task_set]
+
+        def max_rbf(delta: int) -> int:
+            return sum(
+                t.cost.value * c.ac_steps[-1][1] * (delta // c.horizon + 1)
+                for t, c in zip(self.task_set, curves)
+            )
+
+        max_deadline = int(self.deadlines.max())
+        max_horizon = self.all.stride
+        max_offset = max_rbf(horizon) + max_deadline + max_horizon + 2
+        max_point = int(self.max_nps.max()) + max_rbf(max_offset) + max_rbf(horizon)
+        max_value = max_point + max_rbf(max_point) + max_rbf(max_offset)
+        return max(max_value, self.all.size * max_horizon) < INT64_LIMIT
+
+
+def analyze(
+    scheduling_policy: SchedulingPolicy,
+    task_set: TaskSetArrays,
+    task_under_analysis: rta_model.Task,
+    warm_start: TaskAnalysisResults | None = None,
+    horizon: int = THREE_YEARS_IN_NANOSECONDS,
+) -> TaskAnalysisResults:
+    # Computes R for the given task, like task_analysis.analyze().
+    # L and R are -1 if they cannot be bounded.
+    # The fixed-point iterations start from the results in `warm_start`, if
+    # given, which must be lower bounds (see analysis.analyze_task_set()).
+    if not task_set.fits_int64(horizon):
+        # Some values might overflow; pyRTA uses arbitrary-precision integers.
+        return analyze_scalar(
+            scheduling_policy, task_set.task_set, task_under_analysis, horizon
+        )
+    if scheduling_policy.is_fp():
+        results = analyze_fp(task_set, task_under_analysis, horizon, warm_start)
+    elif scheduling_policy.is_edf():
+        results = analyze_edf(task_set, task_under_analysis, horizon, warm_start)
+    else:
+        assert False, "support for policies other than FP and EDF not yet implemented"
+    if warm_start is not None and results.R < 0:
+        # Beyond the horizon, warm-started iterations may give up at another
+        # point than pyRTA's, hence unbounded results are computed again.
+        return analyze(scheduling_policy, task_set, task_under_analysis, None, horizon)
+    return results
+
+
+def analyze_fp(
+    task_set: TaskSetArrays,
+    task_under_analysis: rta_model.Task,
+    horizon: int,
+    warm_start: TaskAnalysisResults | None,
+) -> TaskAnalysisResults:
+    # See fp.rta() of pyRTA
+    tua = task_under_analysis
+    prio = rta_model.prio_of(tua)
+    tasks = task_set.task_set
+    hep = RequestBounds([t for t in tasks if rta_model.prio_of(t) >= prio])
+    ohep = RequestBounds(
+        [t for t in tasks if rta_model.prio_of(t) >= prio and t != tua]
+    )
+    blocking = max(
+        (
+            t.execution.max_non_preemptive_segment - rta_model.EPSILON_TIME
+            for t in tasks.with_priority_lower_than_iter(tua)
+        ),
+        default=0,
+    )
+
+    L = int(
+        solve(lambda x, _: blocking + hep.total(x), start_of_L(warm_start), horizon)[0]
+    )
+    if L < 0:
+        return TaskAnalysisResults(None, -1, [], [], -1)
+
+    # POET's search space: the steps of the RBF of the task under analysis
+    # below L, rounded up to the next multiple of the horizon.
+    curve = curve_of(tua)
+    A = steps_below(curve, (L // curve.horizon + 1) * curve.horizon)
+    work = own_work(tua, A)
+    F = solve(
+        lambda x, i: np.maximum(blocking + work[i] + ohep.total(x), A[i]),
+        start_of_F(warm_start, A, ones(len(A))),
+        horizon,
+    )
+    return task_results(tua, L, A, F)
+
+
+def analyze_edf(
+    task_set: TaskSetArrays,
+    task_under_analysis: rta_model.Task,
+    horizon: int,
+    warm_start: TaskAnalysisResults | None,
+) -> TaskAnalysisResults:
+    # See edf.rta() of pyRTA, on an ideal processor
+    tua = task_under_analysis
+    tua_deadline = rta_model.deadline_of(tua).value
+    tasks = task_set.task_set
+
+    L = int(
+        solve(lambda x, _: task_set.all.total(x), start_of_L(warm_start), horizon)[0]
+    )
+    if L < 0:
+        return TaskAnalysisResults(None, -1, [], [], -1)
+
+    # POET's search space: the steps of the RBF of each task (in the order of
+    # the task set), shifted by the difference of the deadlines.
+    parts: list[Ints] = []
+    for t in tasks:
+        curve = curve_of(t)
+        deadline = rta_model.deadline_of(t).value
+        bound = L + max(0, tua_deadline - deadline)
+        points = steps_below(curve, (bound // curve.horizon + 1) * curve.horizon)
+        points = points[points + 1 + deadline >= tua_deadline]
+        parts.append(np.maximum(0, points - tua_deadline + deadline))
+    A = np.concatenate(parts)
+
+    # The blocking bound and the interference of the other tasks depend on the
+    # offset; rows are tasks, columns are offsets.
+    blocking = np.max(
+        np.where(
+            task_set.deadlines > A + tua_deadline,
+            task_set.max_nps - rta_model.EPSILON_TIME,
+            0,
+        ),
+        axis=0,
+        initial=0,
+    )
+    others = [t for t in tasks if t != tua]
+    other_bounds = RequestBounds(others)
+    other_deadlines = column([rta_model.deadline_of(t).value for t in others])
+    hep_reference = A + rta_model.EPSILON_TIME + tua_deadline
+    work = own_work(tua, A)
+
+    def hep_bound(x: Ints, i: Ints) -> Ints:
+        if other_bounds.size == 0:
+            return np.zeros_like(x)
+        delta = np.minimum(hep_reference[i] - other_deadlines, x)
+        return other_bounds.rbf(delta).sum(axis=0)
+
+    F = solve(
+        lambda x, i: np.maximum(A[i], blocking[i] + work[i] + hep_bound(x, i)),
+        start_of_F(warm_start, A, blocking + work),
+        horizon,
+    )
+    return task_results(tua, L, A, F)
+
+
+def solve(lhs: Callable[[Ints, Ints], Ints], start: Ints, horizon: int) -> Ints:
+    # solve.inequality() of pyRTA with the supply of an ideal processor, for
+    # many inequalities at once: lhs(x, i) is the left-hand side of the i-th
+    # inequality at x[i]. Returns -1 for the inequalities without a solution
+    # up to the horizon.
+    solution = np.full(len(start), -1, dtype=np.int64)
+    pending = np.arange(len(start))
+    x = start
+    while len(pending) > 0:
+        lh = lhs(x, pending)
+        rh = np.maximum(x, 0)
+        done = lh <= rh
+        solution[pending[done]] = x[done]
+        active = ~done & (x <= horizon)
+        pending = pending[active]
+        x = np.maximum(lh, x + (lh - rh))[active]
+    return solution
+
+
+def start_of_L(warm_start: TaskAnalysisResults | None) -> Ints:
+    if warm_start is None or warm_start.L < 1:
+        return ones(1)
+    return np.array([warm_start.L], dtype=np.int64)
+
+
+def start_of_F(warm_start: TaskAnalysisResults | None, A: Ints, start: Ints) -> Ints:
+    # The previous solution at the same offset, if any, and otherwise `start`.
+    # As F >= A in POET's search space, F = A + Fs.
+    if warm_start is None or not warm_start.SS:
+        return start
+    previous = np.array(warm_start.SS, dtype=np.int64)
+    order = np.argsort(previous, kind="stable")
+    offsets = previous[order]
+    solutions = (previous + np.array(warm_start.Fs, dtype=np.int64))[order]
+    index = np.minimum(np.searchsorted(offsets, A), len(offsets) - 1)
+    return np.maximum(start, np.where(offsets[index] == A, solutions[index], 0))
+
+
+def own_work(tua: rta_model.Task, A: Ints) -> Ints:
+    # The work of the jobs of the task under analysis released before or at A,
+    # excluding the non-preemptive part of the last one.
+    own = RequestBounds([tua])
+    return own.total(A + rta_model.EPSILON_TIME) - (
+        tua.cost.value - tua.execution.run_to_completion_threshold
+    )
+
+
+def task_results(tua: rta_model.Task, L: int, A: Ints, F: Ints) -> TaskAnalysisResults:
+    # As task_analysis.analyze() converts the solution of pyRTA
+    # AR is the supply needed to complete the job (on an ideal processor).
+    AR = F + (tua.cost.value - tua.execution.run_to_completion_threshold)
+    R = (
+        -1
+        if (F < 0).any()
+        else int(max(0, np.max(AR - A, initial=0), np.max(F - A, initial=0)))
+    )
+    Fs = np.maximum(0, np.maximum(F, 0) - A)
+    return TaskAnalysisResults(None, L, A.tolist(), Fs.tolist(), R)
+
+
+def steps_below(curve: rta_model.ArrivalCurvePrefix, bound: int) -> Ints:
+    # The points delta < bound at which the arrivals change (i.e., where
+    # max_arrivals(delta) != max_arrivals(delta + 1)), in increasing order.
+    if bound <= 0:
+        return np.zeros(0, dtype=np.int64)
+    windows = np.arange((bound - 1) // curve.horizon + 1, dtype=np.int64)
+    deltas = np.array(step_deltas(curve)[1:], dtype=np.int64)
+    points = (windows[:, np.newaxis] * curve.horizon + deltas - 1).ravel()
+    return points[points < bound]
+
+
+def curve_of(t: rta_model.Task) -> rta_model.ArrivalCurvePrefix:
+    assert isinstance(t.arrivals, rta_model.ArrivalCurvePrefix)
+    return t.arrivals
+
+
+def step_deltas(curve: rta_model.ArrivalCurvePrefix) -> list[int]:
+    return [0] + [d for d, _ in curve.ac_steps]
+
+
+def step_counts(curve: rta_model.ArrivalCurvePrefix) -> list[int]:
+    return [0] + [n for _, n in curve.ac_steps]
+
+
+def column(values: list[int]) -> Ints:
+    return np.array(values, dtype=np.int64).reshape(-1, 1)
+
+
+def ones(n: int) -> Ints:
+    return np.ones(n, dtype=np.int64)
@@ -0,0 +1,478 @@
+"""
+This module implements batch mode: many workloads are analyzed and certified in
+a single process, sharing one pool of workers.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import glob
+import os
+import sys
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import cast
+
+import yaml
+from joblib import Parallel, delayed
+from pydantic import ValidationError
+
+from poet.analysis import BACKENDS, AnalysisResults, backend_available
+from poet.analysis_cache import AnalysisCache, analyze_task_set_cached
+from poet.certificates import pipeline, templates
+from poet.cli import (
+    POETArgs,
+    add_async_proofs_argument,
+    add_coqchk_shards_argument,
+    add_memory_budget_argument,
+    add_reduction_argument,
+    add_time_limit_arguments,
+    add_trace_argument,
+    generate_certificates,
+    open_analysis_cache,
+    open_certificate_cache,
+    prepare_certificates_folder,
+    start_trace,
+    update_failure_report,
+)
+from poet.model import Problem
+from poet.utils import statistics, timing, trace
+from poet.utils.cache import default_cache_folder
+from poet.utils.processes import Resources
+
+RESULTS_FILE_NAME = "results.csv"
+
+
+class BatchArgs(POETArgs):
+    inputs: Sequence[str] = ()  # a list, as set by argparse
+
+
+@dataclass
+class Workload:
+    input_path: str
+    certificates_path: str
+    status: str = "pending"
+    problem: Problem | None = None
+    analysis_results: AnalysisResults | None = None
+    rta_cache: AnalysisCache | None = None
+    v_files: list[str] = field(default_factory=list)
+    poet_time: float = 0.0
+    times: dict[str, float] = field(default_factory=dict)
+    resources: dict[str, Resources] = field(default_factory=dict)
+    # Whether a job did not succeed, including those that did not run (e.g.,
+    # because they were cancelled)
+    incomplete: bool = False
+
+    def failed(self) -> bool:
+        return self.incomplete or any(t <= 0 for t in self.times.values())
+
+
+def run_batch(argv: list[str]) -> None:
+    opts = parse_batch_args(argv)
+    start_trace(opts.trace)
+    input_paths = collect_inputs(opts.inputs)
+    if not input_paths:
+        print("No input files found.")
+        sys.exit(1)
+    output_path = opts.output_path if opts.output_path is not None else "poet-batch"
+
+    ######################################
+    # Parsing, RTA, certificate generation
+    ######################################
+
+    # Each preparation also returns when and in which process it ran.
+    with trace.span("preparation"):
+        prepared = cast(
+            list[tuple[Workload, float, float, int]],
+            Parallel(n_jobs=opts.jobs)(
+                delayed(trace.timed)(
+                    prepare_workload, path, os.path.join(output_path, name), opts
+                )
+                for path, name in zip(input_paths, workload_folder_names(input_paths))
+            ),
+        )
+    workloads = [w for w, _, _, _ in prepared]
+    for w, start, end, pid in prepared:
+        lane = trace.MAIN_LANE if pid == os.getpid() else f"preparation worker {pid}"
+        trace.add_span(
+            f"prepare {os.path.basename(w.certificates_path)}",
+            "preparation",
+            start,
+            end,
+            lane,
+            {"status": w.status},
+        )
+    print(f"Prepared {len(workloads)} workloads.")
+
+    ######################################
+    # Coq compilation and verification
+    ######################################
+
+    certified = [w for w in workloads if w.status == "certificates generated"]
+    if not opts.no_check:
+        run_certificate_jobs(certified, opts)
+        for w in certified:
+            w.status = "failed" if w.failed() else "verified"
+
+    ######################################
+    # Statistics
+    ######################################
+
+    for w in certified:
+        save_workload_stats(w, opts)
+    results_path = os.path.join(output_path, RESULTS_FILE_NAME)
+    save_results_table(workloads, results_path)
+    print_summary(workloads, results_path)
+
+    if any(w.status not in ["verified", "certificates generated"] for w in workloads):
+        sys.exit(1)
+
+
+def collect_inputs(inputs: Sequence[str]) -> list[str]:
+    # Each input is a folder (all contained YAML and JSON files), a file, or a
+    # glob pattern.
+    paths: list[str] = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(
+                sorted(
+                    glob.glob(os.path.join(item, "*.yaml"))
+                    + glob.glob(os.path.join(item, "*.json"))
+                )
+            )
+        elif os.path.isfile(item):
+            paths.append(item)
+        else:
+            paths.extend(sorted(glob.glob(item)))
+    return list(dict.fromkeys(paths))  # drop duplicates, keep order
+
+
+def workload_folder_names(input_paths: list[str]) -> list[str]:
+    # Each workload is saved in a folder named after its input file, without
+    # the extension unless another input has the same name (e.g., x.yaml and
+    # the x.json written by `poet convert`). Inputs with the same file name in
+    # different folders get a numeric suffix.
+    stems = [os.path.splitext(os.path.basename(p))[0] for p in input_paths]
+    names: list[str] = []
+    for path, stem in zip(input_paths, stems):
+        name = os.path.basename(path) if stems.count(stem) > 1 else stem
+        unique, i = name, 1
+        while unique in names:
+            i += 1
+            unique = f"{name}-{i}"
+        names.append(unique)
+    return names
+
+
+def prepare_workload(
+    input_path: str, certificates_path: str, opts: BatchArgs
+) -> Workload:
+    # Parses and analyzes one workload and generates its certificates.
+    # Runs in a worker process, hence problems are reported via the status.
+    stopwatch = timing.Stopwatch()
+    stopwatch.start_timer("total_poet_time")
+    workload = Workload(input_path, certificates_path)
+
+    try:
+        problem_instance = Problem.from_file(input_path)
+    except (ValidationError, ValueError, yaml.YAMLError, OSError) as e:
+        print(f"Failed to parse {input_path}: {e}")
+        workload.status = "parse error"
+        return workload
+    workload.rta_cache = open_analysis_cache(opts)
+    analysis_results = analyze_task_set_cached(
+        problem_instance, workload.rta_cache, backend=opts.rta_backend
+    )
+    workload.problem = problem_instance
+    workload.analysis_results = analysis_results
+
+    if not analysis_results.respose_time_is_bounded():
+        workload.status = "unbounded"
+    elif (
+        not opts.bounded_tardiness_allowed
+        and not analysis_results.all_deadlines_respected()
+    ):
+        workload.status = "deadline violation"
+    else:
+        prepare_certificates_folder(certificates_path, opts)
+        _ = generate_certificates(
+            problem_instance, analysis_results, certificates_path, opts
+        )
+        workload.v_files = [t.v_name() for t in problem_instance.task_set]
+        if not opts.repeat_declaration:
+            declaration_v_name = f"{templates.TASK_SET_DECLARATION_FILE_NAME}.v"
+            workload.v_files = [declaration_v_name] + workload.v_files
+        workload.status = "certificates generated"
+
+    workload.poet_time = stopwatch.stop_timer("total_poet_time")
+    return workload
+
+
+def run_certificate_jobs(workloads: list[Workload], opts: BatchArgs) -> None:
+    # Compiles and verifies the certificates of all workloads in one shared
+    # pipeline; a failure only blocks the jobs of the workload it belongs to.
+    declaration_v_name = f"{templates.TASK_SET_DECLARATION_FILE_NAME}.v"
+    cache = open_certificate_cache(opts)
+    jobs_by_workload: list[list[pipeline.Job]] = []
+    for i, w in enumerate(workloads):
+        assert w.problem is not None and w.analysis_results is not None
+        prefix = f"{i}:"
+        workload_jobs = pipeline.certificate_jobs(
+            w.certificates_path,
+            w.v_files,
+            None if opts.repeat_declaration else declaration_v_name,
+            templates.get_main_certificate_path(w.problem),
+            opts.prosa_path,
+            opts.verify_without_dependencies,
+            cache,
+            costs=pipeline.estimate_costs(
+                w.problem, w.analysis_results, w.certificates_path
+            ),
+            prefix=prefix,
+            coqchk_shards=opts.coqchk_shards,
+            async_proofs=opts.async_proofs,
+            memory_estimates=pipeline.estimate_memory(
+                w.problem,
+                w.certificates_path,
+                None if opts.repeat_declaration else declaration_v_name,
+            ),
+        )
+        jobs_by_workload.append(workload_jobs)
+
+    all_jobs = [job for js in jobs_by_workload for job in js]
+    with trace.span("compilation and verification"):
+        _ = pipeline.run_pipeline(
+            all_jobs,
+            opts.jobs,
+            opts.memory_budget,
+            opts.job_timeout,
+            opts.timeout,
+            opts.fail_fast,
+        )
+    pipeline.trace_jobs(all_jobs)
+    for i, (w, workload_jobs) in enumerate(zip(workloads, jobs_by_workload)):
+        w.incomplete = not all(job.succeeded() for job in workload_jobs)
+        update_failure_report(
+            w.certificates_path, workload_jobs, not w.incomplete, opts, f"{i}:"
+        )
+        for name, time in pipeline.job_times(workload_jobs).items():
+            w.times[name.removeprefix(f"{i}:")] = time
+        for name, used in pipeline.job_resources(workload_jobs).items():
+            w.resources[name.removeprefix(f"{i}:")] = used
+    if cache is not None:
+        cache.evict()
+
+
+def workload_stopwatch(w: Workload) -> timing.Stopwatch:
+    stopwatch = timing.Stopwatch()
+    for name, time in w.times.items():
+        stopwatch.set_time(name, time)
+    coq_time = sum(t for n, t in w.times.items() if n.endswith("_coq_time"))
+    coqchk_time = sum(t for n, t in w.times.items() if n.endswith("_coqchk_time"))
+    stopwatch.set_time("total_poet_time", w.poet_time)
+    stopwatch.set_time("total_coq_time", coq_time)
+    stopwatch.set_time("total_coqchk_time", coqchk_time)
+    stopwatch.set_time("total_time", w.poet_time + coq_time + coqchk_time)
+    return stopwatch
+
+
+def save_workload_stats(w: Workload, opts: BatchArgs) -> None:
+    assert w.problem is not None and w.analysis_results is not None
+    stats = statistics.Statistics(
+        w.problem,
+        w.analysis_results,
+        workload_stopwatch(w),
+        minimal_search_space=opts.minimal_search_space,
+        rta_cache=w.rta_cache,
+        resources=w.resources,
+    )
+    name = "stats_error.yaml" if w.status == "failed" else "stats.yaml"
+    stats.save(os.path.join(w.certificates_path, name))
+
+
+RESULTS_COLUMNS = [
+    "workload",
+    "status",
+    "tasks",
+    "utilization",
+    "max_response_time",
+    "poet_time",
+    "coq_time",
+    "coqchk_time",
+]
+
+
+def results_row(w: Workload) -> dict[str, object]:
+    row: dict[str, object] = {"workload": w.input_path, "status": w.status}
+    if w.problem is not None and w.analysis_results is not None:
+        stopwatch = workload_stopwatch(w)
+        row["tasks"] = len(w.problem.task_set)
+        row["utilization"] = f"{w.problem.total_utilization():.4f}"
+        row["max_response_time"] = max(r.R for r in w.analysis_results.results.values())
+        row["poet_time"] = f"{w.poet_time:.3f}"
+        row["coq_time"] = f"{stopwatch.get_time('total_coq_time'):.3f}"
+        row["coqchk_time"] = f"{stopwatch.get_time('total_coqchk_time'):.3f}"
+    return row
+
+
+def save_results_table(workloads: list[Workload], path: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULTS_COLUMNS)
+        writer.writeheader()
+        for w in workloads:
+            writer.writerow(results_row(w))
+
+
+def print_summary(workloads: list[Workload], results_path: str) -> None:
+    print("\n#######     BATCH SUMMARY     #######")
+    counts: dict[str, int] = {}
+    for w in workloads:
+        counts[w.status] = counts.get(w.status, 0) + 1
+    for status, count in sorted(counts.items()):
+        print(f"{status:<22}: {count}")
+    for w in workloads:
+        if w.status not in ["verified", "certificates generated"]:
+            print(f"- {w.input_path}: {w.status}")
+    print(f"Results table     : {results_path}")
+
+
+def parse_batch_args(argv: list[str]) -> BatchArgs:
+    parser = argparse.ArgumentParser(
+        prog="poet batch",
+        description="Analyze and certify many workloads in a single process.",
+    )
+
+    _ = parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="Input folders, files, or glob patterns.",
+    )
+
+    _ = parser.add_argument(
+        "-c",
+        "--clean",
+        dest="clean_output_folder",
+        default=False,
+        action="store_true",
+        help="Empty the folders before generating new certificates.",
+    )
+
+    _ = parser.add_argument(
+        "-o",
+        "--output",
+        dest="output_path",
+        default=None,
+        action="store",
+        help="Folder in which one subfolder per workload and the results table "
+        + "are created (default: poet-batch).",
+    )
+
+    _ = parser.add_argument(
+        "-p",
+        "--prosa",
+        dest="prosa_path",
+        default=None,
+        action="store",
+        help="Prosa root folder (when using a development version).",
+    )
+
+    _ = parser.add_argument(
+        "-j",
+        "--jobs",
+        dest="jobs",
+        default=1,
+        type=int,
+        action="store",
+        help="Maximum number of jobs, shared by all workloads.",
+    )
+
+    _ = parser.add_argument(
+        "-b",
+        "--bounded-tardiness",
+        dest="bounded_tardiness_allowed",
+        default=False,
+        action="store_true",
+        help="Allow deadline violations (i.e., soft deadlines)",
+    )
+
+    _ = parser.add_argument(
+        "-r",
+        "--repeat-declaration",
+        dest="repeat_declaration",
+        default=False,
+        action="store_true",
+        help="Repeat the task set declaration in every certificate.",
+    )
+
+    add_reduction_argument(parser)
+
+    _ = parser.add_argument(
+        "--minimal-search-space",
+        dest="minimal_search_space",
+        default=False,
+        action="store_true",
+        help="Check only the points of the search space below L in the certificates.",
+    )
+
+    _ = parser.add_argument(
+        "--rta-backend",
+        dest="rta_backend",
+        default="pyrta",
+        choices=BACKENDS,
+        action="store",
+        help="Implementation of the response-time analysis: pyRTA (default) or "
+        + "the vectorized one (requires NumPy); both yield the same results.",
+    )
+
+    _ = parser.add_argument(
+        "--cache",
+        dest="cache_path",
+        default=None,
+        nargs="?",
+        const=default_cache_folder(),
+        action="store",
+        metavar="FOLDER",
+        help="Reuse analysis results, compiled certificates, and coqchk verdicts "
+        + f"of earlier runs (default folder: {default_cache_folder()}).",
+    )
+
+    _ = parser.add_argument(
+        "--cache-size",
+        dest="cache_size",
+        default=1024,
+        type=int,
+        action="store",
+        metavar="MB",
+        help="Maximum size of the cache; least recently used entries are evicted.",
+    )
+
+    _ = parser.add_argument(
+        "-v",
+        "--verify-without-dependencies",
+        dest="verify_without_dependencies",
+        default=False,
+        action="store_true",
+        help="Ignore the dependencies (Prosa, ssreflect, ...) while verifying.",
+    )
+
+    add_coqchk_shards_argument(parser)
+    add_async_proofs_argument(parser)
+    add_memory_budget_argument(parser)
+    add_time_limit_arguments(parser)
+    add_trace_argument(parser)
+
+    _ = parser.add_argument(
+        "-n",
+        "--no-check",
+        dest="no_check",
+        default=False,
+        action="store_true",
+        help="Only generate but do not actually check the certificates.",
+    )
+
+    opts = parser.parse_args(argv, namespace=BatchArgs())
+    if not backend_available(opts.rta_backend):
+        parser.error(f"the {opts.rta_backend} analysis backend requires NumPy")
+    return opts
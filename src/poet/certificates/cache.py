@@ -0,0 +1,152 @@
+"""
+This module caches compiled certificates (.vo files) and coqchk verdicts across runs.
+"""
+
+import os
+import shutil
+import subprocess
+import threading
+
+from ..utils.cache import DiskCache, content_hash, file_hash
+
+VO_FILE_NAME = "certificate.vo"
+VERDICT_FILE_NAME = "verdict"
+
+
+class CertificateCache:
+    # Cache entries are content-addressed:
+    # - a compiled certificate is keyed by the text of the .v file, the template
+    #   it was generated from, the hash of the task_set.vo it imports (if any),
+    #   and the Rocq/Prosa toolchain;
+    # - a coqchk verdict is keyed by the hash of the checked .vo file, the hash of
+    #   the task_set.vo it imports (if any), the toolchain, and whether
+    #   dependencies were checked, too.
+    # Only successful verdicts are stored, so failures are always re-checked.
+    # The counters may be updated from several worker threads.
+
+    def __init__(
+        self,
+        cache_folder: str,
+        max_size: int,
+        prosa_path: str | None,
+    ) -> None:
+        self.store: DiskCache = DiskCache(cache_folder, max_size)
+        self.toolchain: str = toolchain_version(prosa_path)
+        self.coqc_hits: int = 0
+        self.coqc_misses: int = 0
+        self.coqchk_hits: int = 0
+        self.coqchk_misses: int = 0
+        self.lock: threading.Lock = threading.Lock()
+
+    def compile_key(
+        self,
+        certificates_path: str,
+        v_name: str,
+        template_path: str,
+        declaration_vo_name: str | None,
+    ) -> str:
+        with open(os.path.join(certificates_path, v_name), "r") as f:
+            certificate = f.read()
+        with open(template_path, "r") as f:
+            template = f.read()
+        declaration = (
+            file_hash(os.path.join(certificates_path, declaration_vo_name))
+            if declaration_vo_name is not None
+            else ""
+        )
+        return content_hash("coqc", certificate, template, declaration, self.toolchain)
+
+    def verdict_key(
+        self,
+        certificates_path: str,
+        vo_name: str,
+        declaration_vo_name: str | None,
+        verify_without_dependencies: bool,
+    ) -> str:
+        vo = file_hash(os.path.join(certificates_path, vo_name))
+        declaration = (
+            file_hash(os.path.join(certificates_path, declaration_vo_name))
+            if declaration_vo_name is not None and declaration_vo_name != vo_name
+            else ""
+        )
+        return content_hash(
+            "coqchk",
+            vo,
+            declaration,
+            self.toolchain,
+            str(verify_without_dependencies),
+        )
+
+    def restore_vo(self, key: str, certificates_path: str, vo_name: str) -> bool:
+        # Copies the cached .vo file (if any) into the certificates folder.
+        cached = self.store.lookup(key, VO_FILE_NAME)
+        restored = False
+        if cached is not None:
+            try:
+                _ = shutil.copyfile(cached, os.path.join(certificates_path, vo_name))
+                restored = True
+            except FileNotFoundError:
+                pass  # evicted by another process since the lookup
+        with self.lock:
+            if restored:
+                self.coqc_hits += 1
+            else:
+                self.coqc_misses += 1
+        return restored
+
+    def store_vo(self, key: str, certificates_path: str, vo_name: str) -> None:
+        self.store.store(key, VO_FILE_NAME, os.path.join(certificates_path, vo_name))
+
+    def has_verdict(self, key: str) -> bool:
+        verdict = self.store.read_text(key, VERDICT_FILE_NAME)
+        ok = verdict is not None and verdict.strip() == "ok"
+        with self.lock:
+            if ok:
+                self.coqchk_hits += 1
+            else:
+                self.coqchk_misses += 1
+        return ok
+
+    def store_verdict(self, key: str) -> None:
+        self.store.write_text(key, VERDICT_FILE_NAME, "ok\n")
+
+    def evict(self) -> None:
+        _ = self.store.evict()
+
+
+def toolchain_version(prosa_path: str | None) -> str:
+    # Identifies the toolchain by the output of `coqc --version` and `coqc -where`
+    # and by the compiled Prosa library: the .vo files under the development
+    # version of Prosa given by prosa_path, or else under the user-contrib folder
+    # of the Rocq installation (where opam installs rocq-prosa and
+    # rocq-prosa-refinements).
+    parts: list[str] = []
+    for flag in ["--version", "-where"]:
+        try:
+            parts.append(
+                subprocess.run(
+                    ["coqc", flag], capture_output=True, text=True, check=False
+                ).stdout
+            )
+        except OSError:
+            parts.append("")
+    if prosa_path:
+        parts.append(os.path.realpath(prosa_path))
+        prosa_root = prosa_path
+    else:
+        prosa_root = os.path.join(parts[1].strip(), "user-contrib", "prosa")
+    parts.append(library_hash(prosa_root))
+    return "\n".join(parts)
+
+
+def library_hash(root: str) -> str:
+    # Hashes the paths (relative to root) and contents of all .vo files below
+    # root; an empty or missing folder has a fixed hash.
+    parts: list[str] = []
+    for folder, subfolders, files in os.walk(root):
+        subfolders.sort()
+        for name in sorted(files):
+            if name.endswith(".vo"):
+                path = os.path.join(folder, name)
+                parts += [os.path.relpath(path, root), file_hash(path)]
+    return content_hash(*parts)
@@ -4,12 +4,19 @@ This module handles the generation of the Coq proof file.
 
 from __future__ import annotations
 
-from collections.abc import Sequence
+from collections.abc import Mapping, Sequence
 
-from ..analysis import TaskAnalysisResults
 from ..certificates import templates
 from ..model import Problem, Task
-from ..utils import conditional_cut_patch, patch
+from ..task_analysis import TaskAnalysisResults
+from ..utils.reduction import DEFAULT_REDUCTION, REDUCTION_TACTICS
+
+# The wildcards of the tactics of the obligations in utils.reduction.OBLIGATIONS
+REDUCTION_WILDCARDS = {
+    "arrival-curves": templates.WC_ARRIVAL_CURVES_REDUCTION,
+    "L-fixed-point": templates.WC_L_FIXED_POINT_REDUCTION,
+    "R-is-maximum": templates.WC_R_IS_MAXIMUM_REDUCTION,
+}
 
 
 def generate_proof(
@@ -18,63 +25,80 @@ def generate_proof(
     results: TaskAnalysisResults,
     bounded_tardiness_allowed: bool,
     split_declaration: bool,
+    task_set_values: dict[str, object] | None = None,
+    minimal_search_space: bool = False,
+    reduction: Mapping[str, str] | None = None,
 ) -> tuple[str, str]:
-    ts = problem_instance.task_set
-    proof = templates.get_main_certificate(problem_instance)
-    proof = patch(
-        proof, templates.WC_TASK_SET_DECLARATION, task_set_declaration(problem_instance)
-    )
-    proof = patch(proof, templates.WC_TASK_SET_LIST, task_set_list(ts))
-    proof = patch(proof, templates.WC_TASK_UNDER_ANALYSIS, tsk.name())
-    proof = patch(proof, templates.WC_MAX_BUSY_INTERVAL, f"{results.L}%N")
-    proof = patch(proof, templates.WC_RESPONSE_TIME_BOUND, f"{results.R}%N")
-    proof = patch(proof, templates.WC_SEARCH_SPACE, coq_list(results.SS))
-    proof = patch(proof, templates.WC_SEARCH_SPACE_SIZE, len(results.SS))
-    proof = patch(proof, templates.WC_F_SOLUTIONS, get_F_solutions(results.Fs))
+    # task_set_values (see get_task_set_values()) is the same for all tasks and
+    # can be computed once by the caller. With minimal_search_space, only the
+    # points of the search space below L are checked in the certificate.
+    # `reduction` maps obligations to reduction strategies (see
+    # utils.reduction); the others are discharged with vm_compute.
+    template = templates.get_compiled_main_certificate(problem_instance)
+    if task_set_values is None:
+        task_set_values = get_task_set_values(problem_instance)
 
     use_tardiness_bound = bounded_tardiness_allowed and tsk.deadline < results.R
     if use_tardiness_bound:
         tbdec = f"Definition B := {results.R - tsk.deadline}%N\n."
     else:
         tbdec = ""
-    proof = patch(proof, templates.WC_TARDINESS_BOUND_DECLARATION, tbdec)
-    proof, _ = conditional_cut_patch(
-        proof,
-        templates.WC_DEADLINE_IS_RESPECTED_START,
-        templates.WC_DEADLINE_IS_RESPECTED_END,
-        use_tardiness_bound,
-    )
-    proof, _ = conditional_cut_patch(
-        proof,
-        templates.WC_TARDINESS_IS_BOUNDED_START,
-        templates.WC_TARDINESS_IS_BOUNDED_END,
-        not use_tardiness_bound,
-    )
-    proof, _ = conditional_cut_patch(
-        proof,
-        templates.WC_DEADLINE_IS_RESPECTED_PRINT_START,
-        templates.WC_DEADLINE_IS_RESPECTED_PRINT_END,
-        use_tardiness_bound,
-    )
-    proof, _ = conditional_cut_patch(
-        proof,
-        templates.WC_TARDINESS_IS_BOUNDED_PRINT_START,
-        templates.WC_TARDINESS_IS_BOUNDED_PRINT_END,
-        not use_tardiness_bound,
-    )
 
-    proof, declaration = conditional_cut_patch(
-        proof,
-        templates.WC_DECLARATION_START,
-        templates.WC_CERTIFICATE_START,
-        split_declaration,
+    SS, Fs = (
+        results.minimal_search_space()
+        if minimal_search_space
+        else (results.SS, results.Fs)
+    )
+    values: dict[str, object] = {
+        **task_set_values,
+        templates.WC_TASK_UNDER_ANALYSIS: tsk.name(),
+        templates.WC_MAX_BUSY_INTERVAL: f"{results.L}%N",
+        templates.WC_RESPONSE_TIME_BOUND: f"{results.R}%N",
+        templates.WC_SEARCH_SPACE_SIZE: len(SS),
+        templates.WC_SEARCH_SPACE_LEMMA: "A_in_minimal_search_space"
+        if minimal_search_space
+        else "A_in_search_space",
+        templates.WC_F_SOLUTIONS: get_F_solutions(Fs),
+        templates.WC_TARDINESS_BOUND_DECLARATION: tbdec,
+        **reduction_tactics(reduction),
+    }
+    if templates.WC_SEARCH_SPACE in template.wildcards:
+        values[templates.WC_SEARCH_SPACE] = coq_list(SS)
+
+    proof, cut_texts = template.render(
+        values,
+        {
+            templates.WC_DEADLINE_IS_RESPECTED_START: use_tardiness_bound,
+            templates.WC_TARDINESS_IS_BOUNDED_START: not use_tardiness_bound,
+            templates.WC_DEADLINE_IS_RESPECTED_PRINT_START: use_tardiness_bound,
+            templates.WC_TARDINESS_IS_BOUNDED_PRINT_START: not use_tardiness_bound,
+            templates.WC_MINIMAL_SEARCH_SPACE_START: not minimal_search_space,
+            templates.WC_DECLARATION_START: split_declaration,
+        },
     )
+    declaration = cut_texts.get(templates.WC_DECLARATION_START, "")
     if split_declaration:
         proof = f"Require Import {templates.TASK_SET_DECLARATION_FILE_NAME}.\n" + proof
 
     return proof, declaration
 
 
+def reduction_tactics(reduction: Mapping[str, str] | None) -> dict[str, str]:
+    reduction = reduction if reduction is not None else {}
+    return {
+        wildcard: REDUCTION_TACTICS[reduction.get(obligation, DEFAULT_REDUCTION)]
+        for obligation, wildcard in REDUCTION_WILDCARDS.items()
+    }
+
+
+def get_task_set_values(problem_instance: Problem) -> dict[str, object]:
+    # Returns the values of the wildcards that depend only on the task set.
+    return {
+        templates.WC_TASK_SET_DECLARATION: task_set_declaration(problem_instance),
+        templates.WC_TASK_SET_LIST: task_set_list(problem_instance.task_set),
+    }
+
+
 def get_F_solutions(Fs: Sequence[int]) -> str:
     return f"Let Fs : seq N := {coq_list(Fs)}%N.\n"
 
@@ -83,31 +107,33 @@ def task_set_declaration(problem_instance: Problem) -> str:
     # Generates Coq records from the given task set.
     # Syntax: `Let tsk1 := {| task_id := 1; task_deadline := 3; ... |}.`
     def task_declaration(t: Task) -> str:
-        task_dec = templates.get_task_declaration(problem_instance, t)
-        task_dec = patch(task_dec, templates.WC_TASK_NAME, t.name())
-        task_dec = patch(task_dec, templates.WC_TASK_ID, f"{t.id}")
-        task_dec = patch(task_dec, templates.WC_TASK_COST, f"{t.wcet}")
-        task_dec = patch(task_dec, templates.WC_TASK_DEADLINE, f"{t.deadline}")
+        values: dict[str, object] = {
+            templates.WC_TASK_NAME: t.name(),
+            templates.WC_TASK_ID: f"{t.id}",
+            templates.WC_TASK_COST: f"{t.wcet}",
+            templates.WC_TASK_DEADLINE: f"{t.deadline}",
+        }
 
         if problem_instance.scheduling_policy.is_fp():
-            task_dec = patch(task_dec, templates.WC_TASK_PRIORITY, f"{t.priority}")
+            values[templates.WC_TASK_PRIORITY] = f"{t.priority}"
 
         if t.period is not None:
-            task_dec = patch(task_dec, templates.WC_TASK_ARRIVAL, f"{t.period}")
+            values[templates.WC_TASK_ARRIVAL] = f"{t.period}"
         elif t.mit is not None:
-            task_dec = patch(task_dec, templates.WC_TASK_ARRIVAL, f"{t.mit}")
+            values[templates.WC_TASK_ARRIVAL] = f"{t.mit}"
         elif t.arrival_curve is not None:
-            curve = templates.TEMPLATE_CURVE
-            curve = patch(
-                curve, templates.WC_CURVE_HORIZON, f"{t.arrival_curve.horizon}"
-            )
-            curve = patch(
-                curve, templates.WC_CURVE_STEPS, f"{coq_list(t.arrival_curve.steps)}"
+            curve, _ = templates.compile_template(templates.TEMPLATE_CURVE).render(
+                {
+                    templates.WC_CURVE_HORIZON: f"{t.arrival_curve.horizon}",
+                    templates.WC_CURVE_STEPS: f"{coq_list(t.arrival_curve.steps)}",
+                },
+                {},
             )
-            task_dec = patch(task_dec, templates.WC_TASK_ARRIVAL, curve)
+            values[templates.WC_TASK_ARRIVAL] = curve
         else:
             assert False  # unreachable
-        return task_dec
+        task_dec = templates.get_task_declaration(problem_instance, t)
+        return templates.compile_template(task_dec).render(values, {})[0]
 
     task_declarations = [task_declaration(t) for t in problem_instance.task_set]
     return "\n".join(task_declarations)
@@ -0,0 +1,847 @@
+"""
+This module compiles and verifies certificates as a dependency-aware pipeline:
+every job starts as soon as the jobs it depends on have succeeded, and all jobs
+share one budget of workers. Among the ready jobs, the ones on the longest
+remaining chain of (estimated) costs are started first. Optionally, jobs are
+only started while their estimated memory fits a budget, jobs and the whole run
+are limited in time, and all jobs are cancelled on the first failure.
+"""
+
+import functools
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from typing import cast
+
+import yaml
+
+from ..analysis import AnalysisResults
+from ..model import Problem
+from ..utils import processes, statistics, timing, trace
+from .cache import CertificateCache
+
+COQ_STAGE = "coq"
+COQCHK_STAGE = "coqchk"
+
+# Estimated peak memory (in MB) of a job if no earlier run of it was measured
+DEFAULT_MEMORY_ESTIMATE = 1024.0
+
+
+@dataclass
+class Job:
+    # A job runs one external command (in a worker thread; the actual work
+    # happens in the child process) and returns its duration, or a negative
+    # value on failure. Dependencies that are not part of the pipeline (e.g.,
+    # certificates that are up to date) are considered satisfied.
+    name: str
+    stage: str
+    run: Callable[[], float]
+    dependencies: list[str] = field(default_factory=list)
+    cost: float = 0.0  # estimated duration, in any unit shared by all jobs
+    memory: float = 0.0  # estimated peak memory, in MB
+    time: float | None = None  # None if the job did not run
+    start: float = 0.0
+    end: float = 0.0
+    lane: int = 0  # the worker slot (1 to `workers`) that ran the job, 0 if none
+    # The results of the certificates checked by a shard (see shard_jobs()),
+    # by timer name, filled in by `run`
+    shares: dict[str, float] = field(default_factory=dict)
+    # pending, succeeded, failed, timed out, cancelled, or blocked (by a
+    # dependency that did not succeed)
+    status: str = "pending"
+    calls: list[processes.Call] = field(default_factory=list)  # the processes run
+
+    def succeeded(self) -> bool:
+        return self.time is not None and self.time > 0
+
+
+def run_pipeline(
+    jobs: list[Job],
+    workers: int,
+    memory_budget: float | None = None,
+    job_timeout: float | None = None,
+    timeout: float | None = None,
+    fail_fast: bool = False,
+) -> bool:
+    # Runs all jobs whose dependencies succeed, at most `workers` at a time.
+    # Ready jobs are started in order of decreasing priority (see priorities()),
+    # ties in list order. With a `memory_budget` (in MB), the next ready job
+    # waits until it fits (see fits()); jobs of lower priority do not overtake
+    # it. The processes of a job are killed once the job takes longer than
+    # `job_timeout` seconds. Once the run takes longer than `timeout` seconds
+    # or, with `fail_fast`, once a job fails, all running processes are killed
+    # and no further jobs are started. Returns True iff all jobs succeeded.
+    by_name = {job.name: job for job in jobs}
+    assert len(by_name) == len(jobs), "job names must be unique"
+    priority = priorities(jobs)
+    pending = sorted(jobs, key=lambda job: -priority[job.name])
+    running: dict[Future[float], Job] = {}
+    clock = timing.Stopwatch()
+
+    def state(job: Job) -> str:
+        deps = [by_name[d] for d in job.dependencies if d in by_name]
+        if any(d in pending or d in running.values() for d in deps):
+            return "waiting"
+        return "ready" if all(d.succeeded() for d in deps) else "blocked"
+
+    def fits(job: Job) -> bool:
+        # The running jobs take their estimated memory or, if larger, the memory
+        # they currently use; they may still grow up to their estimates. A job
+        # is started if it fits both the budget and the available memory, or
+        # if no other job is running.
+        if memory_budget is None or not running:
+            return True
+        estimated = sum(j.memory for j in running.values())
+        used = processes.running_memory()
+        available = processes.available_memory()
+        return max(estimated, used) + job.memory <= memory_budget and (
+            available is None or max(estimated - used, 0.0) + job.memory <= available
+        )
+
+    processes.start_run(timeout)
+    deadline = clock.now() + timeout if timeout is not None else None
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        while pending or running:
+            if processes.cancelled():
+                for job in pending:
+                    job.status = "cancelled"
+                pending.clear()
+            progress = False
+            for job in list(pending):
+                if len(running) >= max(1, workers):
+                    break
+                job_state = state(job)
+                if job_state == "waiting":
+                    continue
+                if job_state == "ready" and not fits(job):
+                    break
+                pending.remove(job)
+                progress = True
+                if job_state == "ready":
+                    job.start = clock.now()
+                    busy = {j.lane for j in running.values()}
+                    job.lane = min(set(range(1, len(busy) + 2)) - busy)
+                    running[executor.submit(run_job, job, job_timeout)] = job
+                else:
+                    job.status = "blocked"
+            if not running:
+                assert progress or not pending, "cyclic job dependencies"
+                continue
+            done, _ = wait(
+                running,
+                timeout=max(deadline - clock.now(), 0.0)
+                if deadline is not None and not processes.cancelled()
+                else None,
+                return_when=FIRST_COMPLETED,
+            )
+            for future in done:
+                job = running.pop(future)
+                job.end = clock.now()
+                job.time = future.result()
+                job.status = job_status(job)
+                if (
+                    fail_fast
+                    and job.status != "succeeded"
+                    and not processes.cancelled()
+                ):
+                    print(f"Job {job.name} {job.status}; cancelling all jobs.")
+                    processes.cancel()
+            run_timed_out = deadline is not None and clock.now() >= deadline
+            if run_timed_out and not processes.cancelled():
+                print(
+                    f"The run exceeded its time limit ({timeout} s); cancelling all jobs."
+                )
+                processes.cancel()
+
+    return all(job.succeeded() for job in jobs)
+
+
+def run_job(job: Job, timeout: float | None) -> float:
+    # Runs the job in a worker thread and records the processes it started.
+    processes.start_job(timeout)
+    try:
+        return job.run()
+    finally:
+        job.calls = processes.finish_job()
+
+
+def job_status(job: Job) -> str:
+    # A job that ran failed if one of its processes failed by itself; otherwise,
+    # it did not succeed because a process was killed.
+    if job.succeeded():
+        return "succeeded"
+    if any(c.exit_status and not (c.timed_out or c.cancelled) for c in job.calls):
+        return "failed"
+    if any(c.timed_out for c in job.calls):
+        return "timed out"
+    if any(c.cancelled for c in job.calls):
+        return "cancelled"
+    return "failed"
+
+
+def save_failure_report(
+    path: str, jobs: list[Job], limits: dict[str, object], prefix: str = ""
+) -> None:
+    # Saves the jobs that did not succeed (without `prefix` in their names):
+    # those that failed or timed out with the processes they ran, and the names
+    # of those that were cancelled or blocked. `limits` are the time limits and
+    # options of the run.
+    def calls(job: Job) -> list[dict[str, object]]:
+        return [
+            cast(dict[str, object], asdict(c)) | {"command": " ".join(c.command)}
+            for c in job.calls
+        ]
+
+    report = {
+        "limits": limits,
+        "failed": [
+            {
+                "job": job.name.removeprefix(prefix),
+                "status": job.status,
+                "time": job.time,
+                "calls": calls(job),
+            }
+            for job in jobs
+            if job.status in ["failed", "timed out"]
+        ],
+        "cancelled": [
+            j.name.removeprefix(prefix) for j in jobs if j.status == "cancelled"
+        ],
+        "blocked": [j.name.removeprefix(prefix) for j in jobs if j.status == "blocked"],
+    }
+    try:
+        with open(path, "w") as f:
+            _ = f.write(yaml.safe_dump(report, sort_keys=False))
+    except OSError as e:
+        print(f"Error while saving failure report '{path}'")
+        print(e)
+
+
+def trace_jobs(jobs: list[Job], lane_prefix: str = "") -> None:
+    # Records the jobs that ran as spans on the lanes of their workers (see
+    # --trace), with their estimates and the resources of their processes.
+    for job in jobs:
+        if job.lane == 0:
+            continue
+        used = functools.reduce(add_resources, job.calls, processes.Resources())
+        trace.add_span(
+            job.name,
+            job.stage,
+            job.start,
+            job.end,
+            f"{lane_prefix}worker {job.lane}",
+            {
+                "status": job.status,
+                "cost": job.cost,
+                "memory": job.memory,
+                "user_time": used.user_time,
+                "system_time": used.system_time,
+                "peak_memory": used.peak_memory,
+                "commands": [" ".join(c.command) for c in job.calls],
+            },
+        )
+
+
+def priorities(jobs: list[Job]) -> dict[str, float]:
+    # The priority of a job is the total cost of the most expensive chain of
+    # jobs that starts with it (i.e., the job and the jobs that depend on it).
+    # Starting the longest chains first keeps a single expensive certificate
+    # from being compiled last and determining the total time alone.
+    dependents: dict[str, list[str]] = {job.name: [] for job in jobs}
+    for job in jobs:
+        for d in job.dependencies:
+            if d in dependents:
+                dependents[d].append(job.name)
+    cost = {job.name: job.cost for job in jobs}
+    result: dict[str, float] = {}
+
+    def chain(name: str) -> float:
+        if name not in result:
+            result[name] = cost[name] + max(
+                (chain(d) for d in dependents[name]), default=0.0
+            )
+        return result[name]
+
+    for job in jobs:
+        _ = chain(job.name)
+    return result
+
+
+def estimate_costs(
+    problem: Problem,
+    analysis_results: AnalysisResults,
+    history_folder: str | None,
+) -> dict[str, tuple[float, float]]:
+    # Estimates the (compilation, verification) cost of each task certificate
+    # (by .v name). Times measured by earlier runs in `history_folder` are used
+    # where available. The other tasks are estimated from the size of their
+    # search space, converted to seconds by the average time per search-space
+    # point of the measured tasks (if any), with `L` breaking ties.
+    history = (
+        statistics.past_task_times(history_folder) if history_folder is not None else {}
+    )
+    size = {t: len(analysis_results.results[t].SS) for t in problem.task_set}
+    max_L = max(analysis_results.results[t].L for t in problem.task_set)
+
+    def rate(stage: int) -> float:
+        measured = [
+            (times[stage], size[t])
+            for t in problem.task_set
+            if (times := history.get(t.name())) is not None and times[stage] is not None
+        ]
+        points = sum(n for _, n in measured)
+        return (
+            sum(cast(float, time) for time, _ in measured) / points if points else 1.0
+        )
+
+    rates = (rate(0), rate(1))
+    costs: dict[str, tuple[float, float]] = {}
+    for t in problem.task_set:
+        tie_break = analysis_results.results[t].L / (max_L + 1)
+        recorded = history.get(t.name(), (None, None))
+        estimate = [
+            recorded[stage]
+            if recorded[stage] is not None
+            else (size[t] + tie_break) * rates[stage]
+            for stage in (0, 1)
+        ]
+        costs[t.v_name()] = (cast(float, estimate[0]), cast(float, estimate[1]))
+    return costs
+
+
+def estimate_memory(
+    problem: Problem, history_folder: str | None, declaration_v_name: str | None
+) -> dict[str, tuple[float, float]]:
+    # Estimates the peak memory (in MB) of compiling and verifying each
+    # certificate (by .v name), including the declaration (if any). Peaks
+    # measured by earlier runs in `history_folder` are used where available.
+    # The other certificates are estimated at the largest peak measured in the
+    # same stage, or at DEFAULT_MEMORY_ESTIMATE if there is none.
+    history = (
+        statistics.past_task_memory(history_folder)
+        if history_folder is not None
+        else {}
+    )
+    largest = [
+        max(
+            (peak for peaks in history.values() if (peak := peaks[stage]) is not None),
+            default=DEFAULT_MEMORY_ESTIMATE,
+        )
+        for stage in (0, 1)
+    ]
+    estimates: dict[str, tuple[float, float]] = {}
+    for t in problem.task_set:
+        recorded = history.get(t.name(), (None, None))
+        estimate = [
+            recorded[stage] if recorded[stage] is not None else largest[stage]
+            for stage in (0, 1)
+        ]
+        estimates[t.v_name()] = (cast(float, estimate[0]), cast(float, estimate[1]))
+    if declaration_v_name is not None:
+        estimates[declaration_v_name] = (largest[0], largest[1])
+    return estimates
+
+
+def stage_span(jobs: list[Job], stage: str) -> float:
+    # Returns the wall-clock time from the first start to the last end of the
+    # jobs of the given stage that ran.
+    ran = [job for job in jobs if job.stage == stage and job.time is not None]
+    if not ran:
+        return 0.0
+    return max(job.end for job in ran) - min(job.start for job in ran)
+
+
+def certificate_jobs(
+    certificates_path: str,
+    v_files: list[str],
+    declaration_v_name: str | None,
+    template_path: str,
+    prosa_path: str | None,
+    verify_without_dependencies: bool,
+    cache: CertificateCache | None = None,
+    up_to_date: set[str] | None = None,
+    verified: set[str] | None = None,
+    costs: dict[str, tuple[float, float]] | None = None,
+    prefix: str = "",
+    coqchk_shards: int = 0,
+    async_proofs: bool = False,
+    memory_estimates: dict[str, tuple[float, float]] | None = None,
+) -> list[Job]:
+    # Creates one compilation and one verification job per certificate (.v name).
+    # The declaration (if any) is compiled before all certificates importing it;
+    # each certificate is verified as soon as it is compiled. Certificates in
+    # `up_to_date` (by .v name) and `verified` (by .vo name) are skipped.
+    # `costs` holds the estimated (compilation, verification) cost by .v name.
+    # Job names are the stopwatch timer names, preceded by `prefix`.
+    # With `coqchk_shards` > 0, the certificates are instead verified by that
+    # many coqchk calls (see shard_jobs()). With `async_proofs`, the
+    # certificates are compiled in two passes instead (see async_jobs()).
+    # `memory_estimates` holds the estimated (compilation, verification) peak
+    # memory by .v name.
+    up_to_date = up_to_date if up_to_date is not None else set()
+    costs = costs if costs is not None else {}
+    memory_estimates = memory_estimates if memory_estimates is not None else {}
+    if async_proofs:
+        return async_jobs(
+            certificates_path,
+            [v for v in v_files if v not in up_to_date],
+            declaration_v_name,
+            prosa_path,
+            costs,
+            prefix,
+            memory_estimates,
+        )
+    verified = verified if verified is not None else set()
+    declaration_vo_name = (
+        declaration_v_name + "o" if declaration_v_name is not None else None
+    )
+
+    jobs: list[Job] = []
+    for v in v_files:
+        is_declaration = v == declaration_v_name
+        coq_cost, coqchk_cost = costs.get(v, (0.0, 0.0))
+        coq_memory, coqchk_memory = memory_estimates.get(v, (0.0, 0.0))
+        coq_job = f"{prefix}{v}_coq_time"
+        if v not in up_to_date:
+            jobs.append(
+                Job(
+                    coq_job,
+                    COQ_STAGE,
+                    functools.partial(
+                        compile_certificate_with_cache,
+                        cache,
+                        template_path,
+                        None if is_declaration else declaration_vo_name,
+                        prosa_path,
+                        certificates_path,
+                        v,
+                        declaration_v_name is not None,
+                    ),
+                    []
+                    if is_declaration or declaration_v_name is None
+                    else [f"{prefix}{declaration_v_name}_coq_time"],
+                    coq_cost,
+                    coq_memory,
+                )
+            )
+        vo = v + "o"
+        if vo not in verified and coqchk_shards == 0:
+            jobs.append(
+                Job(
+                    f"{prefix}{vo}_coqchk_time",
+                    COQCHK_STAGE,
+                    functools.partial(
+                        verify_certificate_with_cache,
+                        cache,
+                        declaration_vo_name,
+                        prosa_path,
+                        certificates_path,
+                        vo,
+                        verify_without_dependencies,
+                    ),
+                    [coq_job],
+                    coqchk_cost,
+                    coqchk_memory,
+                )
+            )
+    if coqchk_shards > 0:
+        jobs += shard_jobs(
+            certificates_path,
+            [v for v in v_files if v + "o" not in verified],
+            declaration_vo_name,
+            prosa_path,
+            verify_without_dependencies,
+            coqchk_shards,
+            cache,
+            costs,
+            prefix,
+            memory_estimates,
+        )
+    return jobs
+
+
+def async_jobs(
+    certificates_path: str,
+    v_files: list[str],
+    declaration_v_name: str | None,
+    prosa_path: str | None,
+    costs: dict[str, tuple[float, float]],
+    prefix: str,
+    memory_estimates: dict[str, tuple[float, float]],
+) -> list[Job]:
+    # Creates two compilation jobs per certificate: `coqc -vos` (timer
+    # {v}_vos_time) skips the proofs and quickly produces the interface that
+    # the certificates importing it need, and `coqc -vok` ({v}_vok_time) then
+    # checks the proofs. Thus, only the cheap -vos passes wait for the
+    # declaration, and the proofs of all certificates, including the
+    # declaration, are checked in parallel. No .vo files are produced, hence
+    # there is nothing to verify with coqchk.
+    jobs: list[Job] = []
+    for v in v_files:
+        vos_job = f"{prefix}{v}_vos_time"
+        coq_memory = memory_estimates.get(v, (0.0, 0.0))[0]
+        jobs.append(
+            Job(
+                vos_job,
+                COQ_STAGE,
+                functools.partial(
+                    compile_certificate,
+                    prosa_path,
+                    certificates_path,
+                    v,
+                    declaration_v_name is not None,
+                    "-vos",
+                ),
+                []
+                if v == declaration_v_name or declaration_v_name is None
+                else [f"{prefix}{declaration_v_name}_vos_time"],
+                memory=coq_memory,
+            )
+        )
+        jobs.append(
+            Job(
+                f"{prefix}{v}_vok_time",
+                COQ_STAGE,
+                functools.partial(
+                    compile_certificate,
+                    prosa_path,
+                    certificates_path,
+                    v,
+                    declaration_v_name is not None,
+                    "-vok",
+                ),
+                [vos_job],
+                costs.get(v, (0.0, 0.0))[0],
+                coq_memory,
+            )
+        )
+    return jobs
+
+
+def job_times(jobs: list[Job]) -> dict[str, float]:
+    # Returns the times of the jobs that ran and of the certificates verified
+    # by shards, by timer name. The coq time of a certificate compiled in two
+    # passes (see async_jobs()) is the sum of both, or negative if either
+    # failed.
+    times: dict[str, float] = {}
+    for job in jobs:
+        if job.time is not None:
+            times[job.name] = job.time
+        times.update(job.shares)
+    for name, vos_time in list(times.items()):
+        if name.endswith("_vos_time"):
+            v = name.removesuffix("_vos_time")
+            vok_time = times.get(f"{v}_vok_time", -1)
+            times[f"{v}_coq_time"] = (
+                vos_time + vok_time if vos_time > 0 and vok_time > 0 else -1
+            )
+    return times
+
+
+def job_resources(jobs: list[Job]) -> dict[str, processes.Resources]:
+    # Returns the resources used by the processes of the jobs, by timer name
+    # (see job_times()); jobs without processes (e.g., cache hits) are omitted.
+    # The certificates checked by one coqchk call (see shard_jobs()) share its
+    # peak memory and exit status, and its CPU times are split equally among
+    # them. The resources of the two passes of a certificate (see async_jobs())
+    # add up to those of its compilation.
+    resources: dict[str, processes.Resources] = {}
+    for job in jobs:
+        prefix = job.name.rpartition("coqchk_shard_")[0]
+        for c in job.calls:
+            names = (
+                [
+                    name
+                    for name in job.shares
+                    if name.removeprefix(prefix).removesuffix("_coqchk_time")
+                    in c.command
+                ]
+                if job.shares
+                else [job.name]
+            )
+            for name in names:
+                resources[name] = add_resources(resources.get(name), c, 1 / len(names))
+    for name in list(resources):
+        if name.endswith("_vos_time"):
+            v = name.removesuffix("_vos_time")
+            resources[f"{v}_coq_time"] = add_resources(
+                resources[name], resources.get(f"{v}_vok_time")
+            )
+    return resources
+
+
+def add_resources(
+    total: processes.Resources | None,
+    more: processes.Resources | None,
+    share: float = 1.0,
+) -> processes.Resources:
+    # Adds the given `share` of the CPU times of `more` to those of `total`.
+    # The peak memory is the larger one, and the exit status is that of `more`
+    # (if it ran).
+    total = total if total is not None else processes.Resources()
+    if more is None:
+        return total
+
+    def add(a: float | None, b: float | None, weight: float = 1.0) -> float | None:
+        return a if b is None else (a or 0.0) + b * weight
+
+    return processes.Resources(
+        add(total.user_time, more.user_time, share),
+        add(total.system_time, more.system_time, share),
+        max(total.peak_memory or 0.0, more.peak_memory)
+        if more.peak_memory is not None
+        else total.peak_memory,
+        more.exit_status if more.exit_status is not None else total.exit_status,
+    )
+
+
+def shard_jobs(
+    certificates_path: str,
+    v_files: list[str],
+    declaration_vo_name: str | None,
+    prosa_path: str | None,
+    verify_without_dependencies: bool,
+    shards: int,
+    cache: CertificateCache | None,
+    costs: dict[str, tuple[float, float]],
+    prefix: str,
+    memory_estimates: dict[str, tuple[float, float]] | None = None,
+) -> list[Job]:
+    # Splits the verification of the given certificates into at most `shards`
+    # jobs of similar estimated cost, each of which checks its certificates
+    # with a single coqchk call once they are all compiled. Thus, the
+    # dependencies (Prosa, mathcomp, ...) are checked once per shard rather
+    # than once per certificate. The results of the certificates are stored in
+    # the `shares` of the shard under their usual timer names. A shard is
+    # estimated to take as much memory as its largest certificate.
+    memory_estimates = memory_estimates if memory_estimates is not None else {}
+    members: list[list[str]] = [[] for _ in range(min(shards, len(v_files)))]
+    load = [0.0] * len(members)
+    for v in sorted(v_files, key=lambda v: -costs.get(v, (0.0, 0.0))[1]):
+        i = load.index(min(load))
+        members[i].append(v)
+        load[i] += costs.get(v, (0.0, 0.0))[1]
+
+    jobs: list[Job] = []
+    for i, shard in enumerate(members):
+        shares: dict[str, float] = {}
+        jobs.append(
+            Job(
+                f"{prefix}coqchk_shard_{i}",
+                COQCHK_STAGE,
+                functools.partial(
+                    verify_shard_with_cache,
+                    cache,
+                    declaration_vo_name,
+                    prosa_path,
+                    certificates_path,
+                    {v + "o": costs.get(v, (0.0, 0.0))[1] for v in shard},
+                    verify_without_dependencies,
+                    prefix,
+                    shares,
+                ),
+                [f"{prefix}{v}_coq_time" for v in shard],
+                load[i],
+                max(memory_estimates.get(v, (0.0, 0.0))[1] for v in shard),
+                shares=shares,
+            )
+        )
+    return jobs
+
+
+def compile_certificate_with_cache(
+    cache: CertificateCache | None,
+    template_path: str,
+    declaration_vo_name: str | None,
+    prosa_path: str | None,
+    certificates_path: str,
+    certificate: str,
+    external_dec: bool,
+) -> float:
+    # Restores the compiled certificate from the cache if possible; otherwise
+    # compiles it and stores the result in the cache.
+    if cache is None:
+        return compile_certificate(
+            prosa_path, certificates_path, certificate, external_dec
+        )
+
+    lookup = timing.Stopwatch()
+    lookup.start_timer("cache_lookup")
+    key = cache.compile_key(
+        certificates_path, certificate, template_path, declaration_vo_name
+    )
+    if cache.restore_vo(key, certificates_path, certificate + "o"):
+        return lookup.stop_timer("cache_lookup")
+
+    time_value = compile_certificate(
+        prosa_path, certificates_path, certificate, external_dec
+    )
+    if time_value > 0:
+        cache.store_vo(key, certificates_path, certificate + "o")
+    return time_value
+
+
+def verify_certificate_with_cache(
+    cache: CertificateCache | None,
+    declaration_vo_name: str | None,
+    prosa_path: str | None,
+    certificates_path: str,
+    certificate: str,
+    verify_without_dependencies: bool,
+) -> float:
+    # Skips the check if the cache holds a successful verdict for this
+    # certificate; otherwise checks it and stores a successful verdict.
+    if cache is None:
+        return verify_certificate(
+            prosa_path, certificates_path, certificate, verify_without_dependencies
+        )
+
+    lookup = timing.Stopwatch()
+    lookup.start_timer("cache_lookup")
+    key = cache.verdict_key(
+        certificates_path, certificate, declaration_vo_name, verify_without_dependencies
+    )
+    if cache.has_verdict(key):
+        return lookup.stop_timer("cache_lookup")
+
+    time_value = verify_certificate(
+        prosa_path, certificates_path, certificate, verify_without_dependencies
+    )
+    if time_value > 0:
+        cache.store_verdict(key)
+    return time_value
+
+
+def verify_shard_with_cache(
+    cache: CertificateCache | None,
+    declaration_vo_name: str | None,
+    prosa_path: str | None,
+    certificates_path: str,
+    certificates: dict[str, float],
+    verify_without_dependencies: bool,
+    prefix: str,
+    shares: dict[str, float],
+) -> float:
+    # Checks the certificates (.vo names, with their estimated costs) that have
+    # no cached verdict in one coqchk call. The time of the call is split among
+    # them in proportion to their costs. If the call fails, they are checked
+    # one by one to find the failing certificates. Returns the total time, or
+    # a negative value if any certificate fails.
+    stopwatch = timing.Stopwatch()
+    keys: dict[str, str] = {}
+    pending: list[str] = []
+    for vo in certificates:
+        if cache is not None:
+            lookup_start = stopwatch.now()
+            keys[vo] = cache.verdict_key(
+                certificates_path, vo, declaration_vo_name, verify_without_dependencies
+            )
+            if cache.has_verdict(keys[vo]):
+                shares[f"{prefix}{vo}_coqchk_time"] = stopwatch.now() - lookup_start
+                continue
+        pending.append(vo)
+    if not pending:
+        return sum(shares.values())
+
+    time_value = verify_certificates(
+        prosa_path, certificates_path, pending, verify_without_dependencies
+    )
+    if time_value > 0:
+        # Certificates without an estimate (e.g., the declaration) count as the
+        # cheapest one.
+        cheapest = min(
+            (c for vo in pending if (c := certificates[vo]) > 0), default=1.0
+        )
+        weights = {
+            vo: certificates[vo] if certificates[vo] > 0 else cheapest for vo in pending
+        }
+        for vo in pending:
+            shares[f"{prefix}{vo}_coqchk_time"] = (
+                time_value * weights[vo] / sum(weights.values())
+            )
+    else:
+        print("Checking the certificates of the shard one by one...")
+        for vo in pending:
+            shares[f"{prefix}{vo}_coqchk_time"] = verify_certificate(
+                prosa_path, certificates_path, vo, verify_without_dependencies
+            )
+    if cache is not None:
+        for vo in pending:
+            if shares[f"{prefix}{vo}_coqchk_time"] > 0:
+                cache.store_verdict(keys[vo])
+    if any(time <= 0 for time in shares.values()):
+        return -1
+    return sum(shares.values())
+
+
+def compile_certificate(
+    prosa_path: str | None,
+    certificates_path: str,
+    certificate: str,
+    _external_dec: bool,
+    compile_pass: str | None = None,
+) -> float:
+    # `compile_pass` is None for a full compilation, or -vos or -vok.
+    stopwatch = timing.Stopwatch()
+    stopwatch.start_timer("coq_time")
+    print(
+        f"Compiling {certificate}"
+        + (f" ({compile_pass})" if compile_pass is not None else "")
+        + "..."
+    )
+    cmd = [
+        "coqc",
+        *([compile_pass] if compile_pass is not None else []),
+        "-w",
+        "-notation-overriden,-parsing,-projection-no-head-constant",
+        certificate,
+    ]
+    if prosa_path:
+        cmd += ["-Q", prosa_path, "prosa"]
+
+    return_code = processes.call(cmd, cwd=certificates_path)
+    success = return_code == 0
+    if not success:
+        print(f"Compilation of {certificate} ended with return code {return_code}")
+
+    time = stopwatch.stop_timer("coq_time")
+    return time if success else -1
+
+
+def verify_certificate(
+    prosa_path: str | None,
+    certificates_path: str,
+    certificate: str,
+    verify_without_dependencies: bool,
+) -> float:
+    return verify_certificates(
+        prosa_path, certificates_path, [certificate], verify_without_dependencies
+    )
+
+
+def verify_certificates(
+    prosa_path: str | None,
+    certificates_path: str,
+    certificates: list[str],
+    verify_without_dependencies: bool,
+) -> float:
+    # Checks all given certificates with a single coqchk call.
+    stopwatch = timing.Stopwatch()
+    stopwatch.start_timer("coqchk_time")
+    names = ", ".join(certificates)
+    print(f"Verifying {names}...")
+    cmd = ["coqchk", "-o", "-silent"]
+    if prosa_path:
+        cmd += ["-R", prosa_path, "prosa"]
+    for certificate in certificates:
+        if verify_without_dependencies:
+            cmd += ["-norec"]
+        cmd += [certificate]
+
+    return_code = processes.call(cmd, cwd=certificates_path)
+    success = return_code == 0
+    if not success:
+        print(f"Verifying of {names} ended with return code {return_code}")
+
+    time = stopwatch.stop_timer("coqchk_time")
+    return time if success else -1
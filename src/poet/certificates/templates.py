@@ -1,6 +1,8 @@
+import functools
 import os
 
 from ..model import Problem, Task
+from ..utils.template import Template
 
 TASK_SET_DECLARATION_FILE_NAME = "task_set"
 
@@ -32,8 +34,14 @@ WC_TARDINESS_IS_BOUNDED_START = "$TARDINESS_IS_BOUNDED_START$"
 WC_TARDINESS_IS_BOUNDED_END = "$TARDINESS_IS_BOUNDED_END$"
 WC_TARDINESS_IS_BOUNDED_PRINT_START = "$TARDINESS_IS_BOUNDED_PRINT_START$"
 WC_TARDINESS_IS_BOUNDED_PRINT_END = "$TARDINESS_IS_BOUNDED_PRINT_END$"
+WC_MINIMAL_SEARCH_SPACE_START = "$MINIMAL_SEARCH_SPACE_START$"
+WC_MINIMAL_SEARCH_SPACE_END = "$MINIMAL_SEARCH_SPACE_END$"
+WC_SEARCH_SPACE_LEMMA = "$SEARCH_SPACE_LEMMA$"
 WC_DECLARATION_START = "$DECLARATION_START$"
 WC_CERTIFICATE_START = "$CERTIFICATE_START$"
+WC_ARRIVAL_CURVES_REDUCTION = "$ARRIVAL_CURVES_REDUCTION$"
+WC_L_FIXED_POINT_REDUCTION = "$L_FIXED_POINT_REDUCTION$"
+WC_R_IS_MAXIMUM_REDUCTION = "$R_IS_MAXIMUM_REDUCTION$"
 
 WC_TARDINESS_BOUND_DECLARATION = "$TARDINESS_BOUND_DECLARATION$"
 WC_TASK_SET_DECLARATION = "$TASK_SET_DECLARATION$"
@@ -57,10 +65,29 @@ WC_PROSA_PATH = "$PROSA_PATH$"
 # **********************************************
 
 
-def get_main_certificate(problem_instance: Problem):
+def get_compiled_main_certificate(problem_instance: Problem) -> Template:
     """
     Picks a template file, basing on the problem instance.
-    Returns the entire file as a string.
+    Returns the parsed template, which is cached for the whole process.
+    """
+    return load_template(get_main_certificate_path(problem_instance))
+
+
+@functools.cache
+def load_template(path: str) -> Template:
+    with open(path, "r") as f:
+        return Template(f.read(), {WC_DECLARATION_START: WC_CERTIFICATE_START})
+
+
+@functools.cache
+def compile_template(text: str) -> Template:
+    return Template(text)
+
+
+def get_main_certificate_path(problem_instance: Problem) -> str:
+    """
+    Picks a template file, basing on the problem instance.
+    Returns the path of the file.
     """
     pm = problem_instance.preemption_model
     sp = problem_instance.scheduling_policy
@@ -78,7 +105,7 @@ def get_main_certificate(problem_instance: Problem):
             f"Invalid scheduling policy: {problem_instance.scheduling_policy}"
         )
 
-    return open(template_file_path, "r").read()
+    return template_file_path
 
 
 def get_task_declaration(problem_instance: Problem, t: Task):
@@ -0,0 +1,313 @@
+"""
+This module holds the command-line options and the helpers shared by the poet
+command (see __main__) and its batch mode (see batch).
+"""
+
+from __future__ import annotations
+
+import argparse
+import atexit
+import os
+import shutil
+from typing import TYPE_CHECKING
+
+from poet import incremental
+from poet.analysis import AnalysisResults
+from poet.analysis_cache import AnalysisCache
+from poet.model import Problem, Task
+from poet.utils import trace
+from poet.utils.reduction import DEFAULT_REDUCTION, OBLIGATIONS, parse_reduction
+
+# The modules needed to generate and check certificates are imported by the
+# functions using them, so that schedulability tests (-t) start faster.
+if TYPE_CHECKING:
+    from poet.certificates import pipeline
+    from poet.certificates.cache import CertificateCache
+
+GENERATED_FILE_TYPES = [
+    ".sh",
+    ".v",
+    ".vo",
+    ".vok",
+    ".vos",
+    ".glob",
+    ".aux",
+]  # Used to delete old results on each run
+FAILURE_REPORT_FILE_NAME = "failure_report.yaml"
+
+
+class POETArgs(argparse.Namespace):
+    input_path: str = ""
+    verify_only_id: int | None = None
+    output_path: str | None = None
+    prosa_path: str | None = None
+    clean_output_folder: bool = False
+    delete_certificates: bool = False
+    save_stats: bool = False
+    bounded_tardiness_allowed: bool = False
+    test_schedulability: bool = False
+    repeat_declaration: bool = False
+    no_check: bool = False
+    jobs: int = 1
+    coqchk_shards: int = 0
+    async_proofs: bool = False
+    memory_budget: int | None = None
+    job_timeout: float | None = None
+    timeout: float | None = None
+    fail_fast: bool = False
+    trace: str | None = None
+    verify_without_dependencies: bool = False
+    cache_path: str | None = None
+    cache_size: int = 1024
+    incremental: bool = False
+    minimal_search_space: bool = False
+    reduction: dict[str, str] | None = None
+    rta_backend: str = "pyrta"
+    sensitivity: str | None = None
+    assign_priorities: bool = False
+
+
+def add_coqchk_shards_argument(parser: argparse.ArgumentParser) -> None:
+    _ = parser.add_argument(
+        "--coqchk-shards",
+        dest="coqchk_shards",
+        default=0,
+        type=int,
+        action="store",
+        metavar="N",
+        help="Verify the certificates with N coqchk calls, each checking several "
+        + "certificates and their dependencies once, rather than with one call "
+        + "per certificate (default: 0, i.e., one call per certificate).",
+    )
+
+
+def add_async_proofs_argument(parser: argparse.ArgumentParser) -> None:
+    _ = parser.add_argument(
+        "--async-proofs",
+        dest="async_proofs",
+        default=False,
+        action="store_true",
+        help="Compile the certificates in two passes: coqc -vos (which skips the "
+        + "proofs) and then coqc -vok (which checks them), so that the proofs "
+        + "of all certificates are checked in parallel without waiting for the "
+        + "declaration. No .vo files are produced, hence coqchk is not run.",
+    )
+
+
+def add_memory_budget_argument(parser: argparse.ArgumentParser) -> None:
+    _ = parser.add_argument(
+        "--memory-budget",
+        dest="memory_budget",
+        default=None,
+        type=int,
+        action="store",
+        metavar="MB",
+        help="Start a coqc or coqchk job only if the estimated peak memory of the "
+        + "running jobs and of the new one fits this budget and the available "
+        + "memory. The estimates are the peaks measured by earlier runs (in the "
+        + "statistics), or the largest measured peak for new certificates "
+        + "(default: unlimited).",
+    )
+
+
+def add_time_limit_arguments(parser: argparse.ArgumentParser) -> None:
+    _ = parser.add_argument(
+        "--job-timeout",
+        dest="job_timeout",
+        default=None,
+        type=float,
+        action="store",
+        metavar="SECONDS",
+        help="Kill a coqc or coqchk job that takes longer (default: unlimited).",
+    )
+
+    _ = parser.add_argument(
+        "--timeout",
+        dest="timeout",
+        default=None,
+        type=float,
+        action="store",
+        metavar="SECONDS",
+        help="Kill all coqc and coqchk jobs once compiling and verifying takes "
+        + "longer (default: unlimited).",
+    )
+
+    _ = parser.add_argument(
+        "--fail-fast",
+        dest="fail_fast",
+        default=False,
+        action="store_true",
+        help="Cancel all coqc and coqchk jobs (killing the running ones) as soon "
+        + "as one fails or times out.",
+    )
+
+
+def add_trace_argument(parser: argparse.ArgumentParser) -> None:
+    _ = parser.add_argument(
+        "--trace",
+        dest="trace",
+        default=None,
+        action="store",
+        metavar="FILE",
+        help="Save a timeline of the run (its phases, the per-task analyses, and "
+        + "the coqc and coqchk jobs on the workers that ran them) to FILE in the "
+        + "Chrome trace-event format, viewable in Perfetto or chrome://tracing.",
+    )
+
+
+def start_trace(path: str | None) -> None:
+    # Records a timeline of the run, saved to `path` when POET exits (see
+    # poet.utils.trace), also if it exits early.
+    if path is not None:
+        trace.start()
+        atexit.register(trace.save, path)
+
+
+def add_reduction_argument(parser: argparse.ArgumentParser) -> None:
+    def reduction(spec: str) -> dict[str, str]:
+        try:
+            return parse_reduction(spec)
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e))
+
+    _ = parser.add_argument(
+        "--reduction",
+        dest="reduction",
+        default=DEFAULT_REDUCTION,
+        type=reduction,
+        action="store",
+        metavar="STRATEGY",
+        help="Reduction strategy of the computational proofs in the certificates: "
+        + "vm (vm_compute, default) or native (native_compute, requires a Rocq "
+        + "installation with native compilation). Choose it per obligation "
+        + f"({', '.join(OBLIGATIONS)}) with, e.g., 'vm,R-is-maximum=native'.",
+    )
+
+
+def prepare_certificates_folder(certificates_path: str, opts: POETArgs) -> None:
+    if opts.clean_output_folder:
+        clean_certificates_folder(certificates_path)
+    if not os.path.exists(certificates_path):
+        os.makedirs(certificates_path)
+
+
+def generate_certificates(
+    problem_instance: Problem,
+    analysis_results: AnalysisResults,
+    certificates_path: str,
+    opts: POETArgs,
+    unchanged: set[Task] | None = None,
+) -> str:
+    # Certificates of `unchanged` tasks are already up to date on disk
+    # and are hence not generated again.
+    from poet.certificates import coq_generator, templates
+
+    unchanged = unchanged if unchanged is not None else set()
+    task_set_values = coq_generator.get_task_set_values(problem_instance)
+    external_declaration: str | None = None
+    for task in problem_instance.task_set:
+        if task in unchanged and (
+            external_declaration is not None or opts.repeat_declaration
+        ):
+            continue
+        results = analysis_results.results[task]
+        with trace.span(f"generate {task.name()}", "generation"):
+            proof, proof_declaration = coq_generator.generate_proof(
+                problem_instance,
+                task,
+                results,
+                opts.bounded_tardiness_allowed,
+                not opts.repeat_declaration,
+                task_set_values,
+                opts.minimal_search_space,
+                opts.reduction,
+            )
+        if external_declaration is None:
+            external_declaration = proof_declaration
+        else:
+            assert proof_declaration == external_declaration
+
+        if task in unchanged:
+            continue
+        certificate_path = os.path.join(certificates_path, task.name() + ".v")
+        save_certificate(certificate_path, proof)
+
+    declaration_v_name = f"{templates.TASK_SET_DECLARATION_FILE_NAME}.v"
+    if not opts.repeat_declaration:  # Save declaration
+        assert external_declaration is not None
+        certificate_path = os.path.join(certificates_path, declaration_v_name)
+        save_certificate(certificate_path, external_declaration)
+    return declaration_v_name
+
+
+def clean_certificates_folder(certificates_path: str, delete_all: bool = False) -> None:
+    if not os.path.exists(certificates_path):
+        return
+
+    if delete_all:
+        shutil.rmtree(certificates_path)
+    else:
+        for file in os.scandir(certificates_path):
+            ext = os.path.splitext(file)[1]
+            if (
+                ext in GENERATED_FILE_TYPES
+                or file.name == incremental.MANIFEST_FILE_NAME
+                or file.name == FAILURE_REPORT_FILE_NAME
+            ):
+                os.unlink(file.path)
+
+        remainining_files = len(os.listdir(certificates_path))
+        if remainining_files > 0:
+            print(
+                f"Certificates path is not empty: {remainining_files} files detected. Continuing anyway..."
+            )
+
+
+def save_certificate(path: str, certificate: str) -> None:
+    try:
+        with open(path, "w") as f:
+            _ = f.write(certificate)
+    except Exception as e:
+        print(f"Error while saving certificate to '{path}'")
+        print(e)
+
+
+def open_analysis_cache(opts: POETArgs) -> AnalysisCache | None:
+    if opts.cache_path is None:
+        return None
+    return AnalysisCache(opts.cache_path, opts.cache_size * 1024 * 1024)
+
+
+def open_certificate_cache(opts: POETArgs) -> CertificateCache | None:
+    from poet.certificates.cache import CertificateCache
+
+    if opts.cache_path is None:
+        return None
+    return CertificateCache(
+        opts.cache_path, opts.cache_size * 1024 * 1024, opts.prosa_path
+    )
+
+
+def update_failure_report(
+    folder: str,
+    jobs: list[pipeline.Job],
+    success: bool,
+    opts: POETArgs,
+    prefix: str = "",
+) -> None:
+    # Saves the failure report of the jobs (see pipeline.save_failure_report())
+    # if any of them did not succeed, and otherwise removes a stale one.
+    from poet.certificates import pipeline
+
+    path = os.path.join(folder, FAILURE_REPORT_FILE_NAME)
+    if success:
+        if os.path.isfile(path):
+            os.unlink(path)
+        return
+    limits: dict[str, object] = {
+        "job_timeout": opts.job_timeout,
+        "timeout": opts.timeout,
+        "fail_fast": opts.fail_fast,
+    }
+    pipeline.save_failure_report(path, jobs, limits, prefix)
+    print(f"Failure report: {path}")
@@ -0,0 +1,92 @@
+"""
+This module implements the conversion of input files between the YAML format
+and the equivalent JSON format, which is much faster to load.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from collections.abc import Sequence
+
+import yaml
+from pydantic import ValidationError
+
+from poet.model import Problem
+
+FORMATS = {"json": ".json", "yaml": ".yaml"}
+
+
+class ConvertArgs(argparse.Namespace):
+    inputs: Sequence[str] = ()  # a list, as set by argparse
+    output_path: str | None = None
+    output_format: str = "json"
+
+
+def run_convert(argv: list[str]) -> None:
+    opts = parse_convert_args(argv)
+    failed = False
+    for input_path in opts.inputs:
+        output_path = converted_path(input_path, opts)
+        try:
+            problem = Problem.from_file(input_path)
+        except (ValidationError, ValueError, yaml.YAMLError, OSError) as e:
+            print(f"Failed to read {input_path}: {e}")
+            failed = True
+            continue
+        with open(output_path, "w") as f:
+            _ = f.write(dump_problem(problem, opts.output_format))
+        print(f"{input_path} -> {output_path}")
+    if failed:
+        sys.exit(1)
+
+
+def converted_path(input_path: str, opts: ConvertArgs) -> str:
+    folder = (
+        opts.output_path
+        if opts.output_path is not None
+        else os.path.dirname(input_path)
+    )
+    name = os.path.splitext(os.path.basename(input_path))[0]
+    return os.path.join(folder, name + FORMATS[opts.output_format])
+
+
+def dump_problem(problem: Problem, output_format: str) -> str:
+    data = problem.to_input()
+    if output_format == "json":
+        return json.dumps(data, separators=(",", ":"))
+    return yaml.safe_dump(data, sort_keys=False)
+
+
+def parse_convert_args(argv: list[str]) -> ConvertArgs:
+    parser = argparse.ArgumentParser(
+        prog="poet convert",
+        description="Convert input files between the YAML and the JSON format.",
+    )
+
+    _ = parser.add_argument("inputs", nargs="+", help="Input files.")
+
+    _ = parser.add_argument(
+        "-o",
+        "--output",
+        dest="output_path",
+        default=None,
+        action="store",
+        help="Folder in which the converted files are created "
+        + "(default: next to the input files).",
+    )
+
+    _ = parser.add_argument(
+        "--to",
+        dest="output_format",
+        default="json",
+        choices=sorted(FORMATS),
+        help="Output format (default: json).",
+    )
+
+    opts = parser.parse_args(argv, namespace=ConvertArgs())
+    if opts.output_path is not None:
+        os.makedirs(opts.output_path, exist_ok=True)
+    return opts
@@ -0,0 +1,277 @@
+"""
+This module supports incremental runs: a manifest of the previous run is kept in
+the certificates folder and compared against the current problem instance to
+determine which analyses, certificates, and checks can be reused.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import asdict, dataclass, field
+from typing import TypedDict
+
+import yaml
+from pydantic import TypeAdapter, ValidationError
+
+from .analysis import AnalysisResults
+from .model import Problem, Task, YAMLLoader
+from .task_analysis import TaskAnalysisResults, TaskResultsDict
+from .utils.cache import file_hash
+
+MANIFEST_FILE_NAME = "poet_manifest.yaml"
+
+
+@dataclass
+class FileRecord:
+    certificate: str  # hash of the .v file
+    compiled: str = ""  # hash of the .vo file; empty if not compiled
+    verified: bool = False
+    verified_with_dependencies: bool = False
+
+
+class TaskRecord(TypedDict):
+    input: dict[str, object]  # as in the input file
+    results: TaskResultsDict
+
+
+@dataclass
+class Manifest:
+    scheduling_policy: str
+    preemption_model: str
+    # options that influence the generated certificates or their compilation
+    options: dict[str, object]
+    # per-task input (as in the input file) and analysis results, by task id
+    tasks: dict[int, TaskRecord] = field(default_factory=dict)
+    # per-certificate state, by .v file name
+    files: dict[str, FileRecord] = field(default_factory=dict)
+
+    def save(self, certificates_path: str) -> None:
+        path = os.path.join(certificates_path, MANIFEST_FILE_NAME)
+        try:
+            with open(path, "w") as f:
+                _ = f.write(yaml.safe_dump(asdict(self), sort_keys=False))
+        except (OSError, yaml.YAMLError) as e:
+            print(f"Error while saving manifest file '{path}'")
+            print(e)
+
+    @staticmethod
+    def load(certificates_path: str) -> Manifest | None:
+        path = os.path.join(certificates_path, MANIFEST_FILE_NAME)
+        if not os.path.isfile(path):
+            return None
+        try:
+            with open(path, "r") as f:
+                return MANIFEST.validate_python(yaml.load(f.read(), Loader=YAMLLoader))
+        except (OSError, yaml.YAMLError, ValidationError) as e:
+            print(f"Ignoring unreadable manifest file '{path}'")
+            print(e)
+        return None
+
+
+MANIFEST: TypeAdapter[Manifest] = TypeAdapter(Manifest)
+
+
+def manifest_options(
+    bounded_tardiness_allowed: bool,
+    repeat_declaration: bool,
+    minimal_search_space: bool,
+    prosa_path: str | None,
+    reduction: dict[str, str] | None,
+    async_proofs: bool,
+) -> dict[str, object]:
+    return {
+        "bounded_tardiness_allowed": bounded_tardiness_allowed,
+        "repeat_declaration": repeat_declaration,
+        "minimal_search_space": minimal_search_space,
+        "prosa_path": prosa_path,
+        "reduction": reduction,
+        "async_proofs": async_proofs,
+    }
+
+
+def task_input(t: Task) -> dict[str, object]:
+    return t.model_dump(mode="json", by_alias=True, exclude_none=True)
+
+
+def same_model(manifest: Manifest, problem: Problem) -> bool:
+    return manifest.scheduling_policy == canonical_policy(
+        problem
+    ) and manifest.preemption_model == canonical_preemption_model(problem)
+
+
+def canonical_policy(problem: Problem) -> str:
+    return "FP" if problem.scheduling_policy.is_fp() else "EDF"
+
+
+def canonical_preemption_model(problem: Problem) -> str:
+    return "FP" if problem.preemption_model.is_fp() else "NP"
+
+
+def affected_tasks(manifest: Manifest | None, problem: Problem) -> set[int]:
+    # Returns the ids of the tasks whose analysis results may differ from the
+    # ones recorded in the manifest.
+    all_ids = {t.id for t in problem.task_set}
+    if manifest is None or not same_model(manifest, problem):
+        return all_ids
+
+    current = {t.id: task_input(t) for t in problem.task_set}
+    previous = {i: record["input"] for i, record in manifest.tasks.items()}
+    changed = {i for i in current if previous.get(i) != current[i]}
+    changed |= set(previous) - set(current)  # removed tasks
+    if not changed:
+        return set()
+
+    if not (problem.scheduling_policy.is_fp() and problem.preemption_model.is_fp()):
+        # Under EDF, any task can interfere with any other task, and under
+        # non-preemptive scheduling, lower-priority tasks cause blocking.
+        return all_ids
+
+    # Under fully preemptive FP scheduling, a task's response time depends only
+    # on itself and the tasks of higher or equal priority. A changed task hence
+    # affects all tasks with a priority not above its old or new priority.
+    def priority(data: dict[str, object] | None) -> int | None:
+        p = data.get("priority") if data is not None else None
+        return p if isinstance(p, int) else None
+
+    levels = [
+        p
+        for i in changed
+        for p in [priority(previous.get(i)), priority(current.get(i))]
+        if p is not None
+    ]
+    threshold = max(levels, default=None)
+    return {
+        t.id
+        for t in problem.task_set
+        if t.id in changed
+        or t.priority is None
+        or (threshold is not None and t.priority <= threshold)
+    }
+
+
+def reusable_results(
+    manifest: Manifest | None, problem: Problem, affected: set[int]
+) -> dict[Task, TaskAnalysisResults]:
+    if manifest is None:
+        return {}
+    return {
+        t: TaskAnalysisResults.from_dict(manifest.tasks[t.id]["results"])
+        for t in problem.task_set
+        if t.id not in affected and t.id in manifest.tasks
+    }
+
+
+def reusable_certificates(
+    manifest: Manifest | None,
+    problem: Problem,
+    certificates_path: str,
+    affected: set[int],
+    options: dict[str, object],
+) -> set[Task]:
+    # Returns the tasks whose certificates on disk are known to be unchanged.
+    # With a repeated declaration, every certificate contains the whole task set.
+    if manifest is None or manifest.options != options or options["repeat_declaration"]:
+        return set()
+
+    def unchanged(t: Task) -> bool:
+        record = manifest.files.get(t.v_name())
+        v_path = os.path.join(certificates_path, t.v_name())
+        return (
+            record is not None
+            and os.path.isfile(v_path)
+            and file_hash(v_path) == record.certificate
+        )
+
+    return {t for t in problem.task_set if t.id not in affected and unchanged(t)}
+
+
+def up_to_date_files(
+    manifest: Manifest | None,
+    certificates_path: str,
+    v_files: list[str],
+    declaration_v_name: str | None,
+    options: dict[str, object],
+    verify_without_dependencies: bool,
+) -> tuple[set[str], set[str]]:
+    # Returns the certificates that need not be compiled again (by .v name) and
+    # the compiled certificates that need not be checked again (by .vo name).
+    # If the declaration must be recompiled, so must all certificates importing it.
+    if manifest is None or manifest.options != options:
+        return set(), set()
+
+    def is_compiled(v: str) -> bool:
+        record = manifest.files.get(v)
+        v_path = os.path.join(certificates_path, v)
+        vo_path = v_path + "o"
+        return (
+            record is not None
+            and record.compiled != ""
+            and os.path.isfile(v_path)
+            and os.path.isfile(vo_path)
+            and file_hash(v_path) == record.certificate
+            and file_hash(vo_path) == record.compiled
+        )
+
+    compiled = {v for v in v_files if is_compiled(v)}
+    if declaration_v_name is not None and declaration_v_name not in compiled:
+        compiled = set[str]()
+
+    def is_verified(v: str) -> bool:
+        record = manifest.files[v]
+        return record.verified and (
+            verify_without_dependencies or record.verified_with_dependencies
+        )
+
+    verified = {v + "o" for v in compiled if is_verified(v)}
+    return compiled, verified
+
+
+def remove_stale_certificates(
+    manifest: Manifest | None, problem: Problem, certificates_path: str
+) -> None:
+    # Deletes the certificates of tasks that are no longer part of the task set.
+    if manifest is None:
+        return
+    current = {t.v_name() for t in problem.task_set}
+    for v in manifest.files:
+        if v.startswith("tsk") and v not in current:
+            for path in [v, v + "o"]:
+                full_path = os.path.join(certificates_path, path)
+                if os.path.exists(full_path):
+                    os.unlink(full_path)
+
+
+def build_manifest(
+    problem: Problem,
+    analysis_results: AnalysisResults,
+    certificates_path: str,
+    v_files: list[str],
+    options: dict[str, object],
+    compiled: set[str],
+    verified: set[str],
+    verify_without_dependencies: bool,
+) -> Manifest:
+    # Records the state after this run. `compiled` and `verified` contain the
+    # certificates (by .v name) that are known to be compiled and checked.
+    manifest = Manifest(
+        scheduling_policy=canonical_policy(problem),
+        preemption_model=canonical_preemption_model(problem),
+        options=options,
+    )
+    for t in problem.task_set:
+        manifest.tasks[t.id] = {
+            "input": task_input(t),
+            "results": analysis_results.results[t].to_dict(),
+        }
+    for v in v_files:
+        v_path = os.path.join(certificates_path, v)
+        vo_path = v_path + "o"
+        record = FileRecord(certificate=file_hash(v_path))
+        if v in compiled and os.path.isfile(vo_path):
+            record.compiled = file_hash(vo_path)
+            record.verified = v in verified
+            record.verified_with_dependencies = (
+                record.verified and not verify_without_dependencies
+            )
+        manifest.files[v] = record
+    return manifest
@@ -1,44 +1,188 @@
 from __future__ import annotations
 
 # pyright: reportIncompatibleVariableOverride=false
+import operator
+from array import array
+from bisect import bisect_right
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field, replace
 from enum import StrEnum
 from pathlib import Path
-from typing import Self, override
+from typing import Annotated, Any, Self, cast, overload, override
 
 import yaml
 from pydantic import (
     BaseModel,
     ConfigDict,
     Field,
+    PlainSerializer,
+    PlainValidator,
     PositiveInt,
+    TypeAdapter,
     model_validator,
 )
 from response_time_analysis import model as rta_model
 
+# The C implementation of the YAML loader (libyaml) is much faster than the
+# pure-Python one; it is used whenever PyYAML was built with it.
+YAMLLoader: type[yaml.SafeLoader] = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 class InputModel(BaseModel):
     model_config: ConfigDict = ConfigDict(extra="forbid", validate_by_name=True)
 
 
+class CurveSteps(Sequence[tuple[int, int]]):
+    # The steps (delta, job count) of an arrival curve. They are stored as two
+    # arrays of machine integers rather than as a list of tuples of Python
+    # integers, which saves memory and allows checks and lookups in C loops.
+    __slots__: tuple[str, ...] = ("counts", "deltas")
+
+    def __init__(self, deltas: array[int], counts: array[int]) -> None:
+        self.deltas: array[int] = deltas
+        self.counts: array[int] = counts
+
+    @staticmethod
+    def parse(value: object) -> CurveSteps:
+        # Validates a list of pairs of positive integers (as in input files).
+        # Other values are coerced (e.g., 2.0 or "2") or rejected like those
+        # of a list[tuple[PositiveInt, PositiveInt]] field.
+        if isinstance(value, CurveSteps):
+            return value
+        try:
+            return CurveSteps.from_pairs(value)
+        except (TypeError, ValueError, OverflowError):
+            pass
+        pairs = STEP_PAIRS.validate_python(value)
+        try:
+            return CurveSteps.from_pairs(pairs)
+        except OverflowError:
+            raise ValueError("arrival-curve steps must fit in 64 bits") from None
+
+    @staticmethod
+    def from_pairs(value: object) -> CurveSteps:
+        # Raises TypeError or ValueError unless the value is a non-empty list of
+        # pairs of positive integers.
+        if not isinstance(value, (list, tuple)) or not value:
+            raise ValueError("arrival-curve steps must be a non-empty list")
+        pairs = cast(Sequence[object], value)
+        deltas = array("q", [d for d, _ in pairs])  # pyright: ignore[reportGeneralTypeIssues]
+        counts = array("q", [c for _, c in pairs])  # pyright: ignore[reportGeneralTypeIssues]
+        if min(deltas) <= 0 or min(counts) <= 0:
+            raise ValueError("arrival-curve steps must be positive")
+        return CurveSteps(deltas, counts)
+
+    def to_list(self) -> list[tuple[int, int]]:
+        return list(zip(self.deltas, self.counts))
+
+    @override
+    def __len__(self) -> int:
+        return len(self.deltas)
+
+    @overload
+    def __getitem__(self, index: int) -> tuple[int, int]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[tuple[int, int]]: ...
+
+    @override
+    def __getitem__(
+        self, index: int | slice
+    ) -> tuple[int, int] | list[tuple[int, int]]:
+        if isinstance(index, slice):
+            return list(zip(self.deltas[index], self.counts[index]))
+        return self.deltas[index], self.counts[index]
+
+    @override
+    def __iter__(self) -> Iterator[tuple[int, int]]:
+        return zip(self.deltas, self.counts)
+
+    @override
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CurveSteps):
+            return self.deltas == other.deltas and self.counts == other.counts
+        if isinstance(other, Sequence):
+            return self.to_list() == [tuple(s) for s in cast(Sequence[Any], other)]
+        return NotImplemented
+
+    @override
+    def __repr__(self) -> str:
+        return f"CurveSteps({self.to_list()})"
+
+
+STEP_PAIRS: TypeAdapter[list[tuple[int, int]]] = TypeAdapter(
+    Annotated[list[tuple[PositiveInt, PositiveInt]], Field(min_length=1)]
+)
+
+# Steps as they appear in input files: a list of [delta, job count] pairs.
+Steps = Annotated[
+    CurveSteps,
+    PlainValidator(CurveSteps.parse),
+    PlainSerializer(CurveSteps.to_list),
+]
+
+
 class ArrivalCurve(InputModel):
     horizon: PositiveInt
-    steps: list[tuple[PositiveInt, PositiveInt]] = Field(min_length=1)
+    steps: Steps
 
     @model_validator(mode="after")
     def _validate_steps(self) -> Self:
-        def strictly_monotonic(values: list[int]) -> bool:
-            return all(a < b for a, b in zip(values, values[1:]))
-
-        if not strictly_monotonic([s[0] for s in self.steps]):
+        if not all(map(operator.lt, self.steps.deltas, self.steps.deltas[1:])):
             raise ValueError("arrival-curve steps must be strictly monotonic")
-        if not strictly_monotonic([s[1] for s in self.steps]):
+        if not all(map(operator.lt, self.steps.counts, self.steps.counts[1:])):
             raise ValueError("arrival-curve job counts must be strictly monotonic")
-        if self.steps[0][0] != 1:
+        if self.steps.deltas[0] != 1:
             raise ValueError("the first arrival-curve step must occur at 1")
-        if self.steps[-1][0] >= self.horizon:
+        if self.steps.deltas[-1] >= self.horizon:
             raise ValueError("all steps must occur before the horizon")
         return self
 
+    def max_arrivals(self, delta: int) -> int:
+        # The maximum number of arrivals in any interval of length delta. Beyond
+        # the horizon, the curve is extrapolated as in pyRTA: each full horizon
+        # contributes the job count of the last step.
+        if delta <= 0:
+            return 0
+        full_windows, offset = divmod(delta, self.horizon)
+        step = bisect_right(self.steps.deltas, offset)
+        within_horizon = self.steps.counts[step - 1] if step > 0 else 0
+        return full_windows * self.steps.counts[-1] + within_horizon
+
+    def to_rta_model(self) -> rta_model.ArrivalCurvePrefix:
+        return IndexedArrivalCurvePrefix(self.horizon, self.steps.to_list())
+
+
+@dataclass(frozen=True)
+class IndexedArrivalCurvePrefix(rta_model.ArrivalCurvePrefix):
+    # pyRTA's arrival-curve prefix, but the steps are looked up by bisection
+    # rather than by a linear scan (the results are the same).
+    deltas: list[int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        object.__setattr__(self, "deltas", [d for d, _ in self.ac_steps])
+
+    @override
+    def max_arrivals_within_horizon(self, delta: int) -> int:
+        if delta <= 0:
+            return 0
+        return self.ac_steps[bisect_right(self.deltas, delta) - 1][1]
+
+
+def indexed_arrival_curves(task_set: rta_model.TaskSet) -> rta_model.TaskSet:
+    # Replaces the arrival-curve prefixes of all tasks (e.g., as returned by
+    # with_arrival_curves()) with equivalent IndexedArrivalCurvePrefix ones.
+    def indexed(t: rta_model.Task) -> rta_model.Task:
+        arrivals = t.arrivals
+        if isinstance(arrivals, rta_model.ArrivalCurvePrefix) and not isinstance(
+            arrivals, IndexedArrivalCurvePrefix
+        ):
+            arrivals = IndexedArrivalCurvePrefix(arrivals.horizon, arrivals.ac_steps)
+        return replace(t, arrivals=arrivals)
+
+    return rta_model.TaskSet(tuple(indexed(t) for t in task_set))
+
 
 class Task(InputModel):
     id: int
@@ -47,9 +191,9 @@ class Task(InputModel):
     period: PositiveInt | None = None
     mit: PositiveInt | None = Field(default=None, alias="min interarrival", gt=0)
     arrival_curve: ArrivalCurve | None = Field(default=None)
-    arrival_curve_spec: (
-        tuple[PositiveInt, list[tuple[PositiveInt, PositiveInt]]] | None
-    ) = Field(default=None, alias="arrival curve")
+    arrival_curve_spec: tuple[PositiveInt, Steps] | None = Field(
+        default=None, alias="arrival curve"
+    )
     priority: int | None = None
 
     @model_validator(mode="after")
@@ -103,9 +247,7 @@ class Task(InputModel):
         elif self.mit is not None:
             arrival = rta_model.Sporadic(self.mit)
         elif self.arrival_curve is not None:
-            arrival = rta_model.ArrivalCurvePrefix(
-                horizon=self.arrival_curve.horizon, ac_steps=self.arrival_curve.steps
-            )
+            arrival = self.arrival_curve.to_rta_model()
         else:
             assert False  # unreachable
         wcet = rta_model.WCET(self.wcet)
@@ -120,15 +262,27 @@ class Task(InputModel):
     def __hash__(self) -> int:
         return hash(self.id)
 
+    def max_arrivals(self, delta: int) -> int:
+        # The maximum number of jobs released in any interval of length delta.
+        if delta <= 0:
+            return 0
+        if self.period is not None:
+            return -(-delta // self.period)
+        elif self.mit is not None:
+            return -(-delta // self.mit)
+        elif self.arrival_curve is not None:
+            return self.arrival_curve.max_arrivals(delta)
+        else:
+            assert False  # unreachable
+
     def utilization(self) -> float:
         if self.period is not None:
             return self.wcet / self.period
         elif self.mit is not None:
             return self.wcet / self.mit
         elif self.arrival_curve is not None:
-            return (
-                self.arrival_curve.steps[-1][1] * self.wcet / self.arrival_curve.horizon
-            )
+            h = self.arrival_curve.horizon
+            return self.arrival_curve.max_arrivals(h) * self.wcet / h
         else:
             assert False  # unreachable
 
@@ -173,17 +327,44 @@ class Problem(InputModel):
             raise ValueError("task IDs must be unique")
         return self
 
+    @staticmethod
+    def from_file(path: str | Path) -> Problem:
+        # Input files are in YAML or, if their extension is .json, in JSON.
+        if not isinstance(path, Path):
+            path = Path(path)
+        if path.suffix == ".json":
+            return Problem.from_json(path.read_bytes())
+        return Problem.from_yaml(path.read_text())
+
     @staticmethod
     def from_yaml_file(path: str | Path) -> Problem:
         if not isinstance(path, Path):
             path = Path(path)
-        data = yaml.safe_load(path.read_text())  # pyright: ignore[reportAny]
+        return Problem.from_yaml(path.read_text())
+
+    @staticmethod
+    def from_yaml(text: str) -> Problem:
+        data = yaml.load(text, Loader=YAMLLoader)  # pyright: ignore[reportAny]
         if data is None:
             raise ValueError("input YAML file is empty")
         if not isinstance(data, dict):
             raise ValueError("input YAML file must contain a mapping at the root level")
         return Problem.model_validate(data)
 
+    @staticmethod
+    def from_json(text: str | bytes) -> Problem:
+        # The JSON format has the same structure and keys as the YAML format,
+        # but is parsed and validated directly by pydantic (and hence faster).
+        return Problem.model_validate_json(text)
+
+    def to_input(self) -> dict[str, Any]:
+        # Returns the problem as in an input file (e.g., to convert formats).
+        data = self.model_dump(mode="json", by_alias=True, exclude_none=True)
+        for task in cast(list[dict[str, Any]], data["task set"]):
+            if "arrival curve" in task:
+                del task["arrival_curve"]  # parsed from "arrival curve"
+        return data
+
     def total_utilization(self):
         return sum([t.utilization() for t in self.task_set])
 
@@ -0,0 +1,151 @@
+"""
+This module implements Audsley's optimal priority assignment for task sets under
+FP scheduling: priorities are assigned from the lowest to the highest, each time
+to a task that remains schedulable when all tasks without a priority yet have
+a higher priority.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+
+from response_time_analysis import fp
+from response_time_analysis import model as rta_model
+
+from .analysis import AnalysisResults, analyze_task_set, task_analyzer
+from .model import Problem, Task, indexed_arrival_curves
+from .sensitivity import exact_total_utilization
+from .task_analysis import TaskAnalysisResults
+
+# The priorities of the tasks in the task set of a per-task analysis, relative
+# to the candidate task at the level being assigned
+HIGHER, LEVEL, LOWER = 2, 1, 0
+
+
+@dataclass(frozen=True)
+class PriorityAssignment:
+    # The problem with the assigned priorities (1 is the lowest priority) and its
+    # analysis results, both None if no assignment is schedulable, and the
+    # number of per-task analyses run.
+    problem: Problem | None
+    analysis_results: AnalysisResults | None
+    analyses: int
+
+
+# Per-task results by task id and the ids of the tasks of higher priority. The
+# remaining tasks have a lower priority, hence these determine the results.
+Memo = dict[tuple[int, frozenset[int]], TaskAnalysisResults]
+
+
+def assign_priorities(
+    problem: Problem,
+    bounded_tardiness_allowed: bool,
+    jobs: int = 1,
+    backend: str = "pyrta",
+    memo: Memo | None = None,
+) -> PriorityAssignment:
+    # At each level, from the lowest, the unassigned tasks are tried in the
+    # reverse deadline-monotonic order, so that deadline-monotonic priorities
+    # are found with one analysis per task if they are schedulable.
+    # The analysis of the task assigned at a level is exactly its analysis under
+    # the final assignment, hence the assigned task set is not analyzed again.
+    assert problem.scheduling_policy.is_fp()
+    memo = memo if memo is not None else {}
+
+    def schedulable(t: Task, results: TaskAnalysisResults) -> bool:
+        if bounded_tardiness_allowed:
+            return results.R > 0
+        return results.R > 0 and results.R <= t.deadline
+
+    # At the lowest level, all other tasks have a higher priority, so that no
+    # response time is bounded beyond a total utilization of 1.
+    if exact_total_utilization(problem) > 1:
+        return PriorityAssignment(None, None, 0)
+
+    rta_tasks = {
+        t.id: tsk
+        for t, tsk in zip(
+            problem.task_set,
+            indexed_arrival_curves(problem.to_rta_model().with_arrival_curves()),
+        )
+    }
+    unassigned = sorted(problem.task_set, key=lambda t: (t.deadline, t.id))
+    priorities: dict[int, int] = {}
+    analyses = 0
+    while unassigned:
+        higher = frozenset(t.id for t in unassigned)
+        for t in reversed(unassigned):
+            key = (t.id, higher - {t.id})
+            if key not in memo:
+                task_set, tsk = level_task_set(problem, rta_tasks, t, higher)
+                if not bounded_tardiness_allowed and first_job_misses_deadline(
+                    task_set, tsk
+                ):
+                    continue
+                analyses += 1
+                analyze = task_analyzer(problem.scheduling_policy, task_set, backend)
+                memo[key] = analyze(tsk, None)
+            if schedulable(t, memo[key]):
+                break
+        else:
+            return PriorityAssignment(None, None, analyses)
+        priorities[t.id] = len(priorities) + 1
+        unassigned.remove(t)
+
+    task_set = [
+        t.model_copy(update={"priority": priorities[t.id]}) for t in problem.task_set
+    ]
+    assigned = problem.model_copy(update={"task_set": task_set})
+    known = {t: memo[t.id, assigned_higher(assigned, t)] for t in assigned.task_set}
+    results = analyze_task_set(assigned, jobs, known, backend)
+    return PriorityAssignment(assigned, results, analyses)
+
+
+def level_task_set(
+    problem: Problem,
+    rta_tasks: dict[int, rta_model.Task],
+    t: Task,
+    unassigned: frozenset[int],
+) -> tuple[rta_model.TaskSet, rta_model.Task]:
+    # The task set in which t is at the lowest unassigned level: the other
+    # unassigned tasks have a higher priority, the assigned ones a lower one.
+    def level(u: Task) -> int:
+        if u.id == t.id:
+            return LEVEL
+        return HIGHER if u.id in unassigned else LOWER
+
+    task_set = rta_model.TaskSet(
+        tuple(
+            replace(rta_tasks[u.id], priority=rta_model.Priority(level(u)))
+            for u in problem.task_set
+        )
+    )
+    [tsk] = [tsk for u, tsk in zip(problem.task_set, task_set) if u.id == t.id]
+    return task_set, tsk
+
+
+def first_job_misses_deadline(task_set: rta_model.TaskSet, tsk: rta_model.Task) -> bool:
+    # The offset 0 is in the search space of every task, and R is at least its
+    # solution F (see fp.rta() of pyRTA). If F exceeds the deadline, so does R,
+    # which is found without iterating over the (possibly long) busy window.
+    deadline = rta_model.deadline_of(tsk).value
+    ohep = task_set.with_priority_higher_than_or_equal_to_excluding(tsk)
+    base = (
+        fp.blocking_bound(task_set, tsk)
+        + tsk.rbf(rta_model.EPSILON_TIME)
+        - (tsk.cost.value - tsk.execution.run_to_completion_threshold)
+    )
+    # Iterating from below yields the least F with base + ohep.rbf(F) <= F.
+    bound = base
+    while bound <= deadline and base + ohep.rbf(bound) > bound:
+        bound = base + ohep.rbf(bound)
+    return bound > deadline
+
+
+def assigned_higher(problem: Problem, t: Task) -> frozenset[int]:
+    assert t.priority is not None
+    return frozenset(
+        u.id
+        for u in problem.task_set
+        if u.priority is not None and u.priority > t.priority
+    )
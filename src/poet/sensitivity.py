@@ -0,0 +1,147 @@
+"""
+This module implements the sensitivity analysis: it determines by how much the
+WCETs of a task set can be scaled (uniformly or per task) such that the task set
+remains schedulable.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from fractions import Fraction
+
+from .analysis import AnalysisResults, analyze_task_set
+from .model import Problem, Task
+from .task_analysis import TaskAnalysisResults
+
+# Scaling factors are multiples of 1 / RESOLUTION.
+RESOLUTION = 1000
+
+
+@dataclass(frozen=True)
+class SensitivityResult:
+    # The largest schedulable factor (None if even the smallest one is not
+    # schedulable), the problem and the analysis results for that factor, and
+    # the number of checked factors.
+    factor: Fraction | None
+    problem: Problem
+    analysis_results: AnalysisResults | None
+    steps: int
+
+
+def scaled_problem(
+    problem: Problem, factor: Fraction, task_ids: set[int] | None = None
+) -> Problem:
+    # Scales the WCETs of the given tasks (or of all tasks). The scaled WCETs
+    # are rounded up, so that they are at least `factor` times the original ones.
+    task_set = [
+        t.model_copy(update={"wcet": max(1, math.ceil(t.wcet * factor))})
+        if task_ids is None or t.id in task_ids
+        else t
+        for t in problem.task_set
+    ]
+    return problem.model_copy(update={"task_set": task_set})
+
+
+def exact_utilization(t: Task) -> Fraction:
+    if t.period is not None:
+        window = t.period
+    elif t.mit is not None:
+        window = t.mit
+    else:
+        assert t.arrival_curve is not None
+        window = t.arrival_curve.horizon
+    return Fraction(t.max_arrivals(window) * t.wcet, window)
+
+
+def exact_total_utilization(problem: Problem) -> Fraction:
+    return sum((exact_utilization(t) for t in problem.task_set), Fraction(0))
+
+
+def max_sensitivity(
+    problem: Problem,
+    bounded_tardiness_allowed: bool,
+    task_ids: set[int] | None = None,
+    jobs: int = 1,
+    backend: str = "pyrta",
+) -> SensitivityResult:
+    # Binary search for the largest factor by which the WCETs of the given
+    # tasks (or of all tasks) can be scaled such that all deadlines are met
+    # (or, with bounded tardiness, all response times are bounded).
+    # Each step is warm-started from the results of the largest factor known
+    # to be schedulable, which are lower bounds for all larger factors.
+
+    def schedulable(results: AnalysisResults) -> bool:
+        if bounded_tardiness_allowed:
+            return results.respose_time_is_bounded()
+        return results.all_deadlines_respected()
+
+    # Beyond a total utilization of 1, no response time is bounded. This bounds
+    # the search, and factors exceeding it after rounding are not analyzed.
+    scaled = [t for t in problem.task_set if task_ids is None or t.id in task_ids]
+    fixed = [
+        t for t in problem.task_set if task_ids is not None and t.id not in task_ids
+    ]
+    slack = 1 - sum((exact_utilization(t) for t in fixed), Fraction(0))
+    rate = sum((exact_utilization(t) for t in scaled), Fraction(0))
+    unschedulable = math.floor(slack / rate * RESOLUTION) + 1 if slack > 0 else 1
+
+    # The results of the first step for the tasks that are not affected by
+    # the scaling (see unaffected())
+    known: dict[int, TaskAnalysisResults] = {}
+    schedulable_factor = 0
+    best: AnalysisResults | None = None
+    steps = 0
+    # The first step checks the unscaled task set.
+    candidate = min(RESOLUTION, unschedulable - 1)
+    while schedulable_factor + 1 < unschedulable:
+        steps += 1
+        candidate_problem = scaled_problem(
+            problem, Fraction(candidate, RESOLUTION), task_ids
+        )
+        if exact_total_utilization(candidate_problem) > 1:
+            unschedulable = candidate
+            candidate = (schedulable_factor + unschedulable) // 2
+            continue
+        results = analyze_task_set(
+            candidate_problem,
+            jobs,
+            {
+                t: known[t.id]
+                for t in candidate_problem.task_set
+                if t.id in known and unaffected(problem, t, task_ids)
+            },
+            backend,
+            {t.id: r for t, r in best.results.items()} if best is not None else None,
+        )
+        if not known:
+            known = {t.id: r for t, r in results.results.items()}
+        if schedulable(results):
+            schedulable_factor, best = candidate, results
+        else:
+            unschedulable = candidate
+        candidate = (schedulable_factor + unschedulable) // 2
+
+    if best is None:
+        return SensitivityResult(None, problem, None, steps)
+    factor = Fraction(schedulable_factor, RESOLUTION)
+    return SensitivityResult(factor, best.problem, best, steps)
+
+
+def unaffected(problem: Problem, t: Task, task_ids: set[int] | None) -> bool:
+    # Whether the results of t do not depend on the WCETs of the scaled tasks:
+    # under fully preemptive FP scheduling, those of tasks of higher priority.
+    if task_ids is None or t.id in task_ids:
+        return False
+    if not (problem.scheduling_policy.is_fp() and problem.preemption_model.is_fp()):
+        return False
+    priorities = [u.priority for u in problem.task_set if u.id in task_ids]
+    return t.priority is not None and all(
+        p is not None and t.priority > p for p in priorities
+    )
+
+
+def format_factor(factor: Fraction | None) -> str:
+    if factor is None:
+        return f"< {1 / RESOLUTION}"
+    return f"{float(factor):.3f}"
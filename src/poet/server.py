@@ -0,0 +1,344 @@
+"""
+This module implements server mode: a long-running process that analyzes
+problem instances sent over HTTP (on a TCP port or a Unix socket), so that the
+start-up cost of the interpreter and of the imported libraries is paid once.
+"""
+
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import multiprocessing
+import os
+import signal
+import socketserver
+import sys
+from concurrent.futures import ProcessPoolExecutor, wait
+from dataclasses import dataclass, fields
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, cast, override
+from urllib.parse import parse_qs, urlsplit
+
+import yaml
+from pydantic import ValidationError
+
+from poet.analysis import AnalysisResults
+from poet.analysis_cache import AnalysisCache, analyze_task_set_cached
+from poet.certificates import coq_generator, templates
+from poet.model import Problem
+from poet.utils.cache import default_cache_folder
+
+ANALYZE_PATH = "/analyze"
+HEALTH_PATH = "/health"
+TRUE_VALUES = ["", "1", "true", "yes"]
+
+
+class ServerArgs(argparse.Namespace):
+    host: str = "127.0.0.1"
+    port: int = 8080
+    socket_path: str | None = None
+    jobs: int = 1
+    cache_path: str | None = None
+    cache_size: int = 1024
+
+
+@dataclass(frozen=True)
+class RequestOptions:
+    # Set via the query string, e.g., "/analyze?certificates&bounded-tardiness"; the names
+    # are those of the corresponding command-line options.
+    certificates: bool = False
+    bounded_tardiness: bool = False
+    repeat_declaration: bool = False
+    minimal_search_space: bool = False
+
+    @staticmethod
+    def from_query(query: str) -> RequestOptions:
+        names = {f.name.replace("_", "-"): f.name for f in fields(RequestOptions)}
+        values: dict[str, bool] = {}
+        for name, value in parse_qs(query, keep_blank_values=True).items():
+            if name not in names:
+                raise ValueError(f"unknown option '{name}'")
+            values[names[name]] = value[-1].lower() in TRUE_VALUES
+        return RequestOptions(**values)
+
+
+def run_server(argv: list[str]) -> None:
+    opts = parse_server_args(argv)
+    # The workers are not forked from the (multi-threaded) server process.
+    context = multiprocessing.get_context("forkserver")
+    with ProcessPoolExecutor(max_workers=opts.jobs, mp_context=context) as pool:
+        server = make_server(opts, pool)
+        print(f"Serving on {server_url(server)} with {opts.jobs} workers.")
+        _ = signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            if opts.socket_path is not None and os.path.exists(opts.socket_path):
+                os.unlink(opts.socket_path)
+
+
+def make_server(opts: ServerArgs, pool: ProcessPoolExecutor) -> socketserver.TCPServer:
+    # The workers are started (and import everything) before the first request.
+    _ = wait([pool.submit(warm_up) for _ in range(opts.jobs)])
+    handler = functools.partial(AnalysisRequestHandler, pool=pool, opts=opts)
+    if opts.socket_path is None:
+        return ThreadingHTTPServer((opts.host, opts.port), handler)
+    if os.path.exists(opts.socket_path):
+        os.unlink(opts.socket_path)
+    return ThreadingUnixHTTPServer(opts.socket_path, handler)
+
+
+def server_url(server: socketserver.TCPServer) -> str:
+    if isinstance(server, ThreadingUnixHTTPServer):
+        return f"unix:{server.server_address}"
+    host, port = cast(tuple[str, int], server.server_address)[:2]
+    return f"http://{host}:{port}"
+
+
+def warm_up() -> None:
+    for path in [
+        templates.TEMPLATE_MAIN_FP_FP,
+        templates.TEMPLATE_MAIN_FP_EDF,
+        templates.TEMPLATE_MAIN_NP_FP,
+        templates.TEMPLATE_MAIN_NP_EDF,
+    ]:
+        _ = templates.load_template(path)
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads: bool = True
+
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+    # Requests are received by one thread per connection and handed to the
+    # worker processes, hence up to `jobs` analyses run concurrently.
+
+    def __init__(
+        self,
+        *args: Any,
+        pool: ProcessPoolExecutor,
+        opts: ServerArgs,
+        **kwargs: Any,
+    ) -> None:
+        self.pool: ProcessPoolExecutor = pool
+        self.opts: ServerArgs = opts
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self) -> None:
+        if urlsplit(self.path).path == HEALTH_PATH:
+            self.send_json(HTTPStatus.OK, {"status": "ok"})
+        else:
+            self.send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        if url.path != ANALYZE_PATH:
+            self.send_json(HTTPStatus.NOT_FOUND, {"error": "not found"})
+            return
+        try:
+            options = RequestOptions.from_query(url.query)
+        except ValueError as e:
+            self.send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+            if length < 0:
+                raise ValueError
+        except ValueError:
+            error = "missing or invalid Content-Length header"
+            self.send_json(HTTPStatus.BAD_REQUEST, {"error": error})
+            return
+        body = self.rfile.read(length)
+        try:
+            future = self.pool.submit(
+                handle_analysis,
+                body,
+                self.headers.get_content_type(),
+                options,
+                self.opts.cache_path,
+                self.opts.cache_size,
+            )
+            status, response = future.result()
+        except Exception as e:
+            # e.g., a crashed worker process; the server logs the traceback
+            error = f"analysis failed: {type(e).__name__}: {e}"
+            self.send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": error})
+            raise
+        self.send_json(status, response)
+
+    def send_json(self, status: int, response: dict[str, object]) -> None:
+        data = json.dumps(response).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        _ = self.wfile.write(data)
+
+    @override
+    def address_string(self) -> str:
+        # Clients connected via a Unix socket have no address.
+        return str(self.client_address[0]) if self.client_address else "local"
+
+
+def handle_analysis(
+    body: bytes,
+    content_type: str,
+    options: RequestOptions,
+    cache_path: str | None,
+    cache_size: int,
+) -> tuple[int, dict[str, object]]:
+    # Runs in a worker process. Returns the HTTP status and the JSON response.
+    try:
+        if content_type == "application/json":
+            problem = Problem.from_json(body)
+        else:
+            problem = Problem.from_yaml(body.decode())
+    except ValidationError as err:
+        return HTTPStatus.BAD_REQUEST, {
+            "error": "failed to parse input",
+            "details": [
+                f"[{'.'.join(str(x) for x in e['loc'])}] {e['msg']}"
+                for e in err.errors(include_url=False)
+            ],
+        }
+    except (ValueError, yaml.YAMLError) as e:
+        return HTTPStatus.BAD_REQUEST, {"error": f"failed to parse input: {e}"}
+
+    cache = (
+        AnalysisCache(cache_path, cache_size * 1024 * 1024)
+        if cache_path is not None
+        else None
+    )
+    analysis_results = analyze_task_set_cached(problem, cache)
+    if cache is not None and cache.misses > 0:
+        cache.evict()
+    response = analysis_response(analysis_results)
+    if not options.certificates:
+        return HTTPStatus.OK, response
+
+    if not analysis_results.respose_time_is_bounded():
+        error = (
+            "At least one response time is unbounded; unable to generate certificates."
+        )
+    elif (
+        not options.bounded_tardiness and not analysis_results.all_deadlines_respected()
+    ):
+        error = "There is a deadline violation; unable to generate certificates."
+    else:
+        response["certificates"] = certificate_texts(analysis_results, options)
+        return HTTPStatus.OK, response
+    response["error"] = error
+    return HTTPStatus.UNPROCESSABLE_ENTITY, response
+
+
+def analysis_response(analysis_results: AnalysisResults) -> dict[str, object]:
+    problem = analysis_results.problem
+    return {
+        "schedulable": analysis_results.all_deadlines_respected(),
+        "bounded": analysis_results.respose_time_is_bounded(),
+        "tasks": [
+            {"id": t.id, **analysis_results.results[t].to_dict()}
+            for t in problem.task_set
+        ],
+    }
+
+
+def certificate_texts(
+    analysis_results: AnalysisResults, options: RequestOptions
+) -> dict[str, str]:
+    # Returns the generated certificates by file name, as written by `poet`.
+    problem = analysis_results.problem
+    task_set_values = coq_generator.get_task_set_values(problem)
+    certificates: dict[str, str] = {}
+    declaration = ""
+    for task in problem.task_set:
+        certificates[task.v_name()], declaration = coq_generator.generate_proof(
+            problem,
+            task,
+            analysis_results.results[task],
+            options.bounded_tardiness,
+            not options.repeat_declaration,
+            task_set_values,
+            options.minimal_search_space,
+        )
+    if not options.repeat_declaration:
+        certificates[f"{templates.TASK_SET_DECLARATION_FILE_NAME}.v"] = declaration
+    return certificates
+
+
+def parse_server_args(argv: list[str]) -> ServerArgs:
+    parser = argparse.ArgumentParser(
+        prog="poet serve",
+        description="Answer analysis requests over HTTP in a long-running process.",
+        epilog="POST a problem instance (YAML, or JSON with Content-Type "
+        + f"application/json) to {ANALYZE_PATH}; add ?certificates to also "
+        + "receive the generated certificates.",
+    )
+
+    _ = parser.add_argument(
+        "--host",
+        dest="host",
+        default="127.0.0.1",
+        action="store",
+        help="Address to listen on (default: 127.0.0.1).",
+    )
+
+    _ = parser.add_argument(
+        "--port",
+        dest="port",
+        default=8080,
+        type=int,
+        action="store",
+        help="TCP port to listen on (default: 8080).",
+    )
+
+    _ = parser.add_argument(
+        "--socket",
+        dest="socket_path",
+        default=None,
+        action="store",
+        metavar="PATH",
+        help="Listen on a Unix socket instead of a TCP port.",
+    )
+
+    _ = parser.add_argument(
+        "-j",
+        "--jobs",
+        dest="jobs",
+        default=1,
+        type=int,
+        action="store",
+        help="Number of worker processes, i.e., of requests handled concurrently.",
+    )
+
+    _ = parser.add_argument(
+        "--cache",
+        dest="cache_path",
+        default=None,
+        nargs="?",
+        const=default_cache_folder(),
+        action="store",
+        metavar="FOLDER",
+        help="Reuse analysis results of earlier requests and runs "
+        + f"(default folder: {default_cache_folder()}).",
+    )
+
+    _ = parser.add_argument(
+        "--cache-size",
+        dest="cache_size",
+        default=1024,
+        type=int,
+        action="store",
+        metavar="MB",
+        help="Maximum size of the cache; least recently used entries are evicted.",
+    )
+
+    opts = parser.parse_args(argv, namespace=ServerArgs())
+    if opts.jobs < 1:
+        parser.error("the number of jobs must be positive")
+    return opts
@@ -0,0 +1,97 @@
+"""
+This module analyzes a single task with pyRTA and holds the analysis results of
+a task. It is shared by analysis.py and the NumPy backend in analysis_numpy.py,
+which falls back to analyze() where it does not apply.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TypedDict, override
+
+from response_time_analysis import edf, fp
+from response_time_analysis import model as rta_model
+from response_time_analysis.analysis import Solution as RTASolution
+
+from .model import SchedulingPolicy
+
+
+class TaskResultsDict(TypedDict):
+    # The analysis results of a task as saved across runs (see
+    # TaskAnalysisResults.to_dict()).
+    L: int
+    R: int
+    SS: list[int]
+    Fs: list[int]
+
+
+@dataclass
+class TaskAnalysisResults:
+    rta_solution: RTASolution | None  # None if restored from a previous run
+    L: int
+    SS: list[int]
+    Fs: list[int]
+    R: int
+
+    @override
+    def __str__(self) -> str:
+        exact_search_space = set((point for point in self.SS if point < self.L))
+        return f"L: {self.L} | R: {self.R} | SS size: {len(self.SS)} | exact size: {len(exact_search_space)}"
+
+    def minimal_search_space(self) -> tuple[list[int], list[int]]:
+        # Returns the points of the search space that must actually be checked
+        # (i.e., those below L), together with their solutions F.
+        points = [(A, F) for A, F in zip(self.SS, self.Fs) if A < self.L]
+        return [A for A, _ in points], [F for _, F in points]
+
+    def to_dict(self) -> TaskResultsDict:
+        return {"L": self.L, "R": self.R, "SS": self.SS, "Fs": self.Fs}
+
+    @staticmethod
+    def from_dict(data: TaskResultsDict) -> TaskAnalysisResults:
+        return TaskAnalysisResults(
+            None, data["L"], list(data["SS"]), list(data["Fs"]), data["R"]
+        )
+
+
+THREE_YEARS_IN_NANOSECONDS = 10**17
+
+
+def analyze(
+    scheduling_policy: SchedulingPolicy,
+    all_tasks: rta_model.TaskSet,
+    task_under_analysis: rta_model.Task,
+    horizon: int = THREE_YEARS_IN_NANOSECONDS,
+) -> TaskAnalysisResults:
+    # Computes R for the given task.
+    # L and R are -1 if they cannot be bounded.
+
+    # run the RTA
+    if scheduling_policy.is_fp():
+        sol = fp.rta(
+            all_tasks,
+            task_under_analysis,
+            rta_model.IdealProcessor(),
+            use_poet_search_space=True,
+            horizon=horizon,
+        )
+    elif scheduling_policy.is_edf():
+        sol = edf.rta(
+            all_tasks,
+            task_under_analysis,
+            rta_model.IdealProcessor(),
+            use_poet_search_space=True,
+            horizon=THREE_YEARS_IN_NANOSECONDS,
+        )
+    else:
+        assert False, "support for policies other than FP and EDF not yet implemented"
+
+    if sol.busy_window_bound is None or sol.search_space is None:
+        # Infinite busy-interval, not schedulable
+        return TaskAnalysisResults(sol, -1, [], [], -1)
+
+    SS = [A for (A, _F, _R) in sol.search_space]
+    Fs: list[int] = [max(0, (F or 0) - A) for (A, F, _R) in sol.search_space]
+    R = sol.response_time_bound if sol.response_time_bound is not None else -1
+
+    return TaskAnalysisResults(sol, sol.busy_window_bound, SS, Fs, R)
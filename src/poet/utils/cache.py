@@ -0,0 +1,134 @@
+"""
+This module implements a size-bounded, content-addressed on-disk cache.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+
+
+def default_cache_folder() -> str:
+    # Follows the XDG convention, falling back to ~/.cache.
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "poet")
+
+
+def content_hash(*parts: str | bytes) -> str:
+    # Hashes the given parts into a single hex digest. Each part is prefixed
+    # with its length so that ("ab", "c") and ("a", "bc") do not collide.
+    h = hashlib.sha256()
+    for part in parts:
+        data = part.encode() if isinstance(part, str) else part
+        h.update(f"{len(data)}:".encode())
+        h.update(data)
+    return h.hexdigest()
+
+
+def file_hash(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class DiskCache:
+    # A directory of cache entries, each identified by a content hash (the key).
+    # An entry is a folder holding one or more files. Entries are evicted in
+    # least-recently-used order once the total size exceeds max_size bytes; the
+    # modification time of the entry folder serves as the access time.
+    # Several processes may share the cache, hence entries (and the temporary
+    # files of entries being written) can vanish at any time.
+
+    def __init__(self, root: str, max_size: int) -> None:
+        self.root: str = root
+        self.max_size: int = max_size
+        os.makedirs(self.root, exist_ok=True)
+
+    def entry_path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def lookup(self, key: str, name: str) -> str | None:
+        # Returns the path of the cached file, or None on a miss.
+        path = os.path.join(self.entry_path(key), name)
+        if not os.path.isfile(path):
+            return None
+        self.touch(key)
+        return path
+
+    def store(self, key: str, name: str, src_path: str) -> None:
+        # Copies the file into the entry. The copy goes through a temporary file
+        # so that concurrent readers never observe a partially written entry.
+        entry = self.entry_path(key)
+        os.makedirs(entry, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=entry)
+        os.close(fd)
+        try:
+            _ = shutil.copyfile(src_path, tmp_path)
+            os.replace(tmp_path, os.path.join(entry, name))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self.touch(key)
+
+    def read_text(self, key: str, name: str) -> str | None:
+        path = self.lookup(key, name)
+        if path is None:
+            return None
+        try:
+            with open(path, "r") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None  # evicted since the lookup
+
+    def write_text(self, key: str, name: str, text: str) -> None:
+        entry = self.entry_path(key)
+        os.makedirs(entry, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=entry)
+        with os.fdopen(fd, "w") as f:
+            _ = f.write(text)
+        os.replace(tmp_path, os.path.join(entry, name))
+        self.touch(key)
+
+    def touch(self, key: str) -> None:
+        try:
+            os.utime(self.entry_path(key))
+        except OSError:
+            pass
+
+    def entries(self) -> list[tuple[float, int, str]]:
+        # Lists all entries as (last access, size in bytes, path).
+        result: list[tuple[float, int, str]] = []
+        for bucket in os.scandir(self.root):
+            if not bucket.is_dir():
+                continue
+            for entry in os.scandir(bucket.path):
+                if not entry.is_dir():
+                    continue
+                try:
+                    size = sum(f.stat().st_size for f in os.scandir(entry.path))
+                    result.append((entry.stat().st_mtime, size, entry.path))
+                except FileNotFoundError:
+                    continue  # evicted or written concurrently
+        return result
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self) -> int:
+        # Deletes least-recently-used entries until the cache fits into max_size.
+        # Returns the number of deleted entries.
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            evicted += 1
+        return evicted
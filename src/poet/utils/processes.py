@@ -0,0 +1,196 @@
+"""
+This module runs the coqc and coqchk processes of the pipeline: it measures
+their resident memory (and that of the system) via /proc, kills them once their
+job or the whole run exceeds its time limit, and kills all of them when the run
+is cancelled. The CPU times and the peak memory of each process are taken from
+its resource usage as reported by wait4(). Where /proc or wait4() is not
+available, no memory figures are reported (None), and the memory budget (see
+--memory-budget) only counts estimates.
+"""
+
+from __future__ import annotations
+
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+
+# Interval at which a running process is sampled, in seconds
+POLL_INTERVAL = 0.05
+
+
+@dataclass
+class Resources:
+    # The resources used by one or more processes: user and system CPU time in
+    # seconds (None if not measured), peak resident memory in MB (None if not
+    # measured), and the exit status of the last process (negative if it was
+    # killed by a signal; None if no process ran).
+    user_time: float | None = None
+    system_time: float | None = None
+    peak_memory: float | None = None
+    exit_status: int | None = None
+
+
+@dataclass
+class Call(Resources):
+    # A process started by call() and its resources. The exit status is None if
+    # the process was not started because the run was cancelled. `timed_out`
+    # and `cancelled` tell whether it was killed for exceeding its time limit or
+    # because the run was cancelled.
+    command: list[str] = field(default_factory=list)
+    timed_out: bool = False
+    cancelled: bool = False
+
+
+_lock = threading.Lock()
+# The processes started by call(), with their calls and deadlines, by pid
+_running: dict[int, tuple[subprocess.Popen[bytes], Call, float | None]] = {}
+_monitor: threading.Thread | None = None  # see monitor()
+_cancelled = threading.Event()
+_run_deadline: float | None = None  # time.monotonic() at which the run ends
+_jobs = threading.local()  # the calls and the deadline of the job of a thread
+
+
+def read_field(path: str, field: str) -> float | None:
+    # Returns a field given in kB (e.g., VmRSS in /proc/<pid>/status) in MB.
+    try:
+        with open(path) as f:
+            for line in f:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def available_memory() -> float | None:
+    # Memory available for new processes without swapping, in MB
+    return read_field("/proc/meminfo", "MemAvailable")
+
+
+def running_memory() -> float:
+    # Total resident memory of the processes currently started by call(), in MB
+    with _lock:
+        pids = list(_running)
+    return sum(read_field(f"/proc/{pid}/status", "VmRSS") or 0.0 for pid in pids)
+
+
+def start_run(timeout: float | None) -> None:
+    # Starts a run of the pipeline, which ends after `timeout` seconds.
+    global _run_deadline
+    _cancelled.clear()
+    _run_deadline = time.monotonic() + timeout if timeout is not None else None
+
+
+def cancel() -> None:
+    # Kills all running processes; no further processes are started until the
+    # next run.
+    _cancelled.set()
+    with _lock:
+        for process, _, _ in _running.values():
+            kill(process)
+
+
+def cancelled() -> bool:
+    return _cancelled.is_set()
+
+
+def start_job(timeout: float | None) -> None:
+    # Starts a job in the current thread, whose processes are killed once it
+    # takes longer than `timeout` seconds.
+    _jobs.calls = []
+    _jobs.deadline = time.monotonic() + timeout if timeout is not None else None
+
+
+def finish_job() -> list[Call]:
+    # Returns the calls of the job of the current thread.
+    calls: list[Call] = getattr(_jobs, "calls", [])
+    _jobs.calls = []
+    return calls
+
+
+def call(cmd: list[str], cwd: str) -> int:
+    # Like subprocess.call(), but records the call in the job of the current
+    # thread (see Call). While the process runs, monitor() samples its peak
+    # resident memory (VmHWM) and enforces its deadline. Returns -1 if the
+    # process was not started or killed.
+    global _monitor
+    record = Call(command=cmd)
+    if hasattr(_jobs, "calls"):
+        _jobs.calls.append(record)
+    deadlines = [_run_deadline, getattr(_jobs, "deadline", None)]
+    deadline = min((d for d in deadlines if d is not None), default=None)
+    with _lock:
+        if _cancelled.is_set():
+            record.cancelled = True
+            return -1
+        process = subprocess.Popen(cmd, cwd=cwd)
+        _running[process.pid] = (process, record, deadline)
+        if _monitor is None:
+            _monitor = threading.Thread(target=monitor, daemon=True)
+            _monitor.start()
+    with process:
+        try:
+            record.exit_status = wait(process, record)
+        except BaseException:
+            with _lock:
+                kill(process)
+            raise
+        finally:
+            with _lock:
+                del _running[process.pid]
+    if _cancelled.is_set() and record.exit_status != 0:
+        record.cancelled = True
+    return -1 if record.timed_out or record.cancelled else record.exit_status
+
+
+def kill(process: subprocess.Popen[bytes]) -> None:
+    # Kills the process unless it was reaped (call with _lock held). Unlike
+    # Popen.kill(), this does not poll the process, which could reap it while
+    # wait() waits for it.
+    if process.returncode is None:
+        try:
+            os.kill(process.pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+        except ProcessLookupError:
+            pass
+
+
+def wait(process: subprocess.Popen[bytes], record: Call) -> int:
+    # Waits for the process to exit and returns its exit status, recording its
+    # resource usage if wait4() is available.
+    if not hasattr(os, "wait4"):
+        return process.wait()
+    try:
+        _, status, usage = os.wait4(process.pid, 0)
+    except ChildProcessError:
+        # reaped elsewhere (e.g., by Popen.poll()), without resource usage
+        return process.wait()
+    with _lock:
+        process.returncode = os.waitstatus_to_exitcode(status)
+    record.user_time = usage.ru_utime
+    record.system_time = usage.ru_stime
+    # ru_maxrss is in kB on Linux, but in bytes on macOS
+    maxrss = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    record.peak_memory = max(record.peak_memory or 0.0, maxrss)
+    return process.returncode
+
+
+def monitor() -> None:
+    # Runs in the background: samples the peak memory of the running processes
+    # and kills those beyond their deadline.
+    while True:
+        time.sleep(POLL_INTERVAL)
+        with _lock:
+            running = list(_running.values())
+        for process, record, deadline in running:
+            peak = read_field(f"/proc/{process.pid}/status", "VmHWM")
+            if peak is not None:
+                record.peak_memory = max(record.peak_memory or 0.0, peak)
+            if deadline is not None and time.monotonic() > deadline:
+                with _lock:
+                    if process.returncode is None:
+                        record.timed_out = True
+                        kill(process)
@@ -0,0 +1,38 @@
+"""
+This module defines the reduction strategies with which the computational
+obligations of the certificates are discharged (see --reduction).
+"""
+
+from __future__ import annotations
+
+# The strategies and their Rocq tactics
+REDUCTION_TACTICS = {"vm": "vm_compute", "native": "native_compute"}
+DEFAULT_REDUCTION = "vm"
+
+# The obligations whose strategy can be chosen; all other (small) obligations
+# are discharged with the default strategy.
+OBLIGATIONS = ["arrival-curves", "L-fixed-point", "R-is-maximum"]
+
+
+def parse_reduction(spec: str) -> dict[str, str]:
+    # Parses a comma-separated list of strategies, each of which applies to all
+    # obligations or, if prefixed with "OBLIGATION=", to a single one; later
+    # entries take precedence (e.g., "native,arrival-curves=vm").
+    reduction = {obligation: DEFAULT_REDUCTION for obligation in OBLIGATIONS}
+    for entry in spec.split(","):
+        obligation, _, strategy = entry.strip().rpartition("=")
+        if strategy not in REDUCTION_TACTICS:
+            raise ValueError(
+                f"unknown reduction strategy '{strategy}' "
+                + f"(expected one of {', '.join(REDUCTION_TACTICS)})"
+            )
+        if not obligation:
+            reduction = {o: strategy for o in OBLIGATIONS}
+        elif obligation in OBLIGATIONS:
+            reduction[obligation] = strategy
+        else:
+            raise ValueError(
+                f"unknown obligation '{obligation}' "
+                + f"(expected one of {', '.join(OBLIGATIONS)})"
+            )
+    return reduction
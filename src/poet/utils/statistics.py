@@ -1,12 +1,17 @@
 from __future__ import annotations
 
+import os
 from typing import cast, override
 
 import yaml
 
-from poet.analysis import AnalysisResults, TaskAnalysisResults
+from poet.analysis import AnalysisResults
+from poet.analysis_cache import AnalysisCache
+from poet.certificates.cache import CertificateCache
 from poet.model import Problem, Task
+from poet.task_analysis import TaskAnalysisResults
 from poet.utils import timing
+from poet.utils.processes import Resources
 
 
 class TaskStats(yaml.YAMLObject):
@@ -17,6 +22,8 @@ class TaskStats(yaml.YAMLObject):
         task: Task,
         results: TaskAnalysisResults,
         stopwatch: timing.Stopwatch,
+        minimal_search_space: bool = False,
+        resources: dict[str, Resources] | None = None,
     ) -> None:
         # Task information
         self.name: str = task.name()
@@ -25,26 +32,88 @@ class TaskStats(yaml.YAMLObject):
         self.L: int = results.L
         self.R: int = results.R
         self.search_space_size: int = len(results.SS)
+        # size of the search space checked in the certificate
+        self.certificate_search_space_size: int = (
+            len(results.minimal_search_space()[0])
+            if minimal_search_space
+            else self.search_space_size
+        )
 
-        # Time stats
+        # Time stats (negative if the step failed). Certificates verified
+        # together (see --coqchk-shards) share the time of their coqchk call.
         self.coq_time: float | None = None
         self.coqchk_time: float | None = None
         if stopwatch.has_time(f"{task.v_name()}_coq_time"):
             self.coq_time = stopwatch.get_time(f"{task.v_name()}_coq_time")
+        # The times of the two compilation passes (see --async-proofs), whose
+        # sum is the coq time
+        self.vos_time: float | None = None
+        self.vok_time: float | None = None
+        if stopwatch.has_time(f"{task.v_name()}_vos_time"):
+            self.vos_time = stopwatch.get_time(f"{task.v_name()}_vos_time")
+        if stopwatch.has_time(f"{task.v_name()}_vok_time"):
+            self.vok_time = stopwatch.get_time(f"{task.v_name()}_vok_time")
         if stopwatch.has_time(f"{task.vo_name()}_coqchk_time"):
             self.coqchk_time = stopwatch.get_time(f"{task.vo_name()}_coqchk_time")
+        # Whether coqchk accepted the certificate (None if it was not checked)
+        self.verified: bool | None = (
+            self.coqchk_time >= 0 if self.coqchk_time is not None else None
+        )
+
+        # Resources used by coqc and coqchk: user and system CPU time (in s),
+        # peak resident memory (in MB), and exit status (negative if killed by
+        # a signal); all None if no process ran, e.g., if the result was cached
+        resources = resources if resources is not None else {}
+        coq = resources.get(f"{task.v_name()}_coq_time", Resources())
+        coqchk = resources.get(f"{task.vo_name()}_coqchk_time", Resources())
+        self.coq_user_time: float | None = coq.user_time
+        self.coq_system_time: float | None = coq.system_time
+        self.coq_memory: float | None = coq.peak_memory
+        self.coq_exit_status: int | None = coq.exit_status
+        self.coqchk_user_time: float | None = coqchk.user_time
+        self.coqchk_system_time: float | None = coqchk.system_time
+        self.coqchk_memory: float | None = coqchk.peak_memory
+        self.coqchk_exit_status: int | None = coqchk.exit_status
 
     @override
     def __str__(self) -> str:
         val = f"{self.name:<8} | R : {self.R} | L : {self.L} | SS: {self.search_space_size}"
+        trimmed = self.search_space_size - self.certificate_search_space_size
+        if trimmed > 0:
+            val += f" (trimmed: {trimmed})"
 
         if self.coq_time is not None:
             val += f" | coq : {self.coq_time:2f}"
+        if self.vos_time is not None and self.vok_time is not None:
+            val += f" (vos : {self.vos_time:2f} | vok : {self.vok_time:2f})"
         if self.coqchk_time is not None:
             val += f" | coqchk : {self.coqchk_time:2f}"
         val += "\n"
+        usage = [
+            f"{step} : {text}"
+            for step in ["coq", "coqchk"]
+            if (text := self.resources_str(step))
+        ]
+        if usage:
+            val += f"{'':<8} | " + " | ".join(usage) + "\n"
         return val
 
+    def resources_str(self, step: str) -> str:
+        # The resources used by coqc (step "coq") or coqchk ("coqchk"), as far as
+        # they are known (stats of earlier versions have none)
+        user_time = getattr(self, f"{step}_user_time", None)
+        system_time = getattr(self, f"{step}_system_time", None)
+        memory = getattr(self, f"{step}_memory", None)
+        exit_status = getattr(self, f"{step}_exit_status", None)
+        parts: list[str] = []
+        if user_time is not None and system_time is not None:
+            parts.append(f"user {user_time:.2f} s, sys {system_time:.2f} s")
+        if memory is not None:
+            parts.append(f"{memory:.0f} MB")
+        if exit_status:
+            parts.append(f"exit status {exit_status}")
+        return ", ".join(parts)
+
 
 class Statistics(yaml.YAMLObject):
     yaml_tag: str = "!POET_statistics"
@@ -54,6 +123,10 @@ class Statistics(yaml.YAMLObject):
         problem_instance: Problem,
         analysis_results: AnalysisResults,
         stopwatch: timing.Stopwatch,
+        cache: CertificateCache | None = None,
+        minimal_search_space: bool = False,
+        rta_cache: AnalysisCache | None = None,
+        resources: dict[str, Resources] | None = None,
     ) -> None:
         # Task set information
         num_tasks = len(problem_instance.task_set)
@@ -74,10 +147,32 @@ class Statistics(yaml.YAMLObject):
             if stopwatch.has_time("total_coqchk_time")
             else 0.0
         )
+        # Compilation and verification overlap, hence the pipeline time is
+        # less than the sum of the coq and coqchk times
+        self.total_pipeline_time: float = (
+            stopwatch.get_time("total_pipeline_time")
+            if stopwatch.has_time("total_pipeline_time")
+            else self.total_coq_time + self.total_coqchk_time
+        )
         self.total_time: float = stopwatch.get_time("total_time")
 
+        # Cache information
+        self.cache_used: bool = cache is not None or rta_cache is not None
+        self.rta_cache_hits: int = rta_cache.hits if rta_cache is not None else 0
+        self.rta_cache_misses: int = rta_cache.misses if rta_cache is not None else 0
+        self.coqc_cache_hits: int = cache.coqc_hits if cache is not None else 0
+        self.coqc_cache_misses: int = cache.coqc_misses if cache is not None else 0
+        self.coqchk_cache_hits: int = cache.coqchk_hits if cache is not None else 0
+        self.coqchk_cache_misses: int = cache.coqchk_misses if cache is not None else 0
+
         self.task_stats: list[TaskStats] = [
-            TaskStats(t, analysis_results.results[t], stopwatch)
+            TaskStats(
+                t,
+                analysis_results.results[t],
+                stopwatch,
+                minimal_search_space,
+                resources,
+            )
             for t in problem_instance.task_set
         ]
 
@@ -101,12 +196,7 @@ class Statistics(yaml.YAMLObject):
 
     @override
     def __str__(self) -> str:
-        other_time = (
-            self.total_time
-            - self.total_poet_time
-            - self.total_coq_time
-            - self.total_coqchk_time
-        )
+        other_time = self.total_time - self.total_poet_time - self.total_pipeline_time
         out = "\n####### PROBLEM INSTANCE STATS #######\n"
         out += f"Number of tasks   : {self.number_of_tasks}\n"
         out += f"Task set util.    : {self.total_utilization:.2f}\n"
@@ -116,10 +206,69 @@ class Statistics(yaml.YAMLObject):
         out += f"coq               : {self.total_coq_time:.2f} s\n"
         if self.total_coqchk_time:
             out += f"coqchk            : {self.total_coqchk_time:.2f} s\n"
+        out += f"Pipeline          : {self.total_pipeline_time:.2f} s\n"
         out += f"Other             : {other_time:.2f} s\n"
         out += f"Total             : {self.total_time:.2f} s\n"
+        if self.cache_used:
+            out += "\n#######      CACHE STATS      #######\n"
+            out += (
+                f"rta hits/misses   : {self.rta_cache_hits}/{self.rta_cache_misses}\n"
+            )
+            out += (
+                f"coq hits/misses   : {self.coqc_cache_hits}/{self.coqc_cache_misses}\n"
+            )
+            out += f"coqchk hits/misses: {self.coqchk_cache_hits}/{self.coqchk_cache_misses}\n"
         out += "\n#######     TASKS STATS       #######\n"
         for task in self.task_stats:
             out += str(task)
 
         return out
+
+
+def past_task_stats(folder: str) -> list[TaskStats]:
+    # Returns the task statistics recorded by earlier runs in the given folder;
+    # those of a successful run come after those of a failed one.
+    task_stats: list[TaskStats] = []
+    for name in ["stats_error.yaml", "stats.yaml"]:
+        path = os.path.join(folder, name)
+        if not os.path.isfile(path):
+            continue
+        stats = Statistics.load(path)
+        if isinstance(stats, Statistics):
+            task_stats += getattr(stats, "task_stats", [])
+    return task_stats
+
+
+def past_task_times(folder: str) -> dict[str, tuple[float | None, float | None]]:
+    # Returns the (coq, coqchk) times recorded per task name by earlier runs in
+    # the given folder. Times of failed or skipped jobs are omitted (None), and
+    # so are those of jobs that ran no process (i.e., without an exit status,
+    # such as cache hits, whose time is that of the lookup). Statistics saved
+    # before exit statuses were recorded are taken as they are.
+    def measured(task: TaskStats, step: str) -> float | None:
+        time: float | None = getattr(task, f"{step}_time", None)
+        if time is None or time <= 0:
+            return None
+        no_process = hasattr(task, f"{step}_exit_status") and (
+            getattr(task, f"{step}_exit_status") is None
+        )
+        return None if no_process else time
+
+    times: dict[str, tuple[float | None, float | None]] = {}
+    for task in past_task_stats(folder):  # successful runs take precedence
+        coq_time, coqchk_time = measured(task, "coq"), measured(task, "coqchk")
+        if coq_time is not None or coqchk_time is not None:
+            times[task.name] = (coq_time, coqchk_time)
+    return times
+
+
+def past_task_memory(folder: str) -> dict[str, tuple[float | None, float | None]]:
+    # Returns the (coq, coqchk) peak memory recorded per task name by earlier
+    # runs in the given folder (None if not measured).
+    peaks: dict[str, tuple[float | None, float | None]] = {}
+    for task in past_task_stats(folder):  # successful runs take precedence
+        coq_memory: float | None = getattr(task, "coq_memory", None)
+        coqchk_memory: float | None = getattr(task, "coqchk_memory", None)
+        if coq_memory is not None or coqchk_memory is not None:
+            peaks[task.name] = (coq_memory, coqchk_memory)
+    return peaks
@@ -0,0 +1,128 @@
+"""
+This module implements the template engine used to generate certificates.
+A template is parsed once into a sequence of segments (literal text, wildcard
+slots, and conditional blocks) and can then be rendered in a single pass.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import TypeAlias
+
+WILDCARD_RE = re.compile(r"\$[A-Z_]+\$")
+BLOCK_START_SUFFIX = "_START$"
+BLOCK_END_SUFFIX = "_END$"
+
+
+@dataclass(frozen=True)
+class Slot:
+    wildcard: str
+
+
+@dataclass(frozen=True)
+class Block:
+    # The text enclosed in the wildcards `start` and `end`. When rendering, the
+    # wildcards are removed and the enclosed text is either kept or cut away.
+    start: str
+    end: str
+    body: tuple[Segment, ...]
+
+
+Segment: TypeAlias = str | Slot | Block
+
+
+class Template:
+    # A wildcard "$X_START$" opens a block that is closed by "$X_END$", unless
+    # a different closing wildcard is given in block_ends. All other wildcards
+    # are slots.
+
+    def __init__(self, text: str, block_ends: Mapping[str, str] | None = None) -> None:
+        self.block_ends: dict[str, str] = dict(block_ends or {})
+        self.wildcards: set[str] = set()
+        self.segments: tuple[Segment, ...] = self.parse(text)
+
+    def parse(self, text: str) -> tuple[Segment, ...]:
+        # Stack of the open blocks: (start wildcard, end wildcard, segments)
+        stack: list[tuple[str, str, list[Segment]]] = [("", "", [])]
+        position = 0
+        for match in WILDCARD_RE.finditer(text):
+            wildcard = match.group(0)
+            if match.start() > position:
+                stack[-1][2].append(text[position : match.start()])
+            position = match.end()
+
+            start, end, segments = stack[-1]
+            if wildcard == end:
+                _ = stack.pop()
+                stack[-1][2].append(Block(start, end, tuple(segments)))
+            elif wildcard in self.block_ends or wildcard.endswith(BLOCK_START_SUFFIX):
+                closing = self.block_ends.get(
+                    wildcard,
+                    wildcard.removesuffix(BLOCK_START_SUFFIX) + BLOCK_END_SUFFIX,
+                )
+                stack.append((wildcard, closing, []))
+            elif wildcard.endswith(BLOCK_END_SUFFIX):
+                raise ValueError(f"Unexpected {wildcard} in template")
+            else:
+                self.wildcards.add(wildcard)
+                segments.append(Slot(wildcard))
+        if position < len(text):
+            stack[-1][2].append(text[position:])
+        if len(stack) > 1:
+            raise ValueError(f"Missing {stack[-1][1]} in template")
+        return tuple(stack[0][2])
+
+    def render(
+        self, values: Mapping[str, object], cut: Mapping[str, bool]
+    ) -> tuple[str, dict[str, str]]:
+        # Replaces each slot with its value; multi-line values are indented like
+        # the wildcard (see utils.patch). Blocks whose start wildcard is mapped
+        # to True in `cut` are removed. Slots without a value are left untouched.
+        # Returns the rendered text and the text cut from each block.
+        out: list[str] = []
+        cut_texts: dict[str, str] = {}
+        self.render_segments(self.segments, values, cut, out, cut_texts)
+        return "".join(out), cut_texts
+
+    def render_segments(
+        self,
+        segments: tuple[Segment, ...],
+        values: Mapping[str, object],
+        cut: Mapping[str, bool],
+        out: list[str],
+        cut_texts: dict[str, str],
+    ) -> None:
+        for segment in segments:
+            if isinstance(segment, str):
+                out.append(segment)
+            elif isinstance(segment, Slot):
+                if segment.wildcard not in values:
+                    out.append(segment.wildcard)
+                    continue
+                content = str(values[segment.wildcard])
+                if "\n" in content:
+                    follow_indent = re.sub(r"\S", " ", line_prefix(out))
+                    content = content.replace("\n", "\n" + follow_indent)
+                out.append(content)
+            else:
+                # The body is rendered in place, so that the indentation of
+                # multi-line values accounts for the text preceding the block.
+                begin = len(out)
+                self.render_segments(segment.body, values, cut, out, cut_texts)
+                if cut.get(segment.start, False):
+                    cut_texts[segment.start] = "".join(out[begin:])
+                    del out[begin:]
+
+
+def line_prefix(out: list[str]) -> str:
+    # Returns the text written since the last newline.
+    parts: list[str] = []
+    for piece in reversed(out):
+        newline = piece.rfind("\n")
+        if newline >= 0:
+            parts.append(piece[newline + 1 :])
+            break
+        parts.append(piece)
+    return "".join(reversed(parts))
@@ -0,0 +1,121 @@
+"""
+This module records a timeline of a POET run (see --trace): spans of the phases
+of the run, of the per-task analyses and of the coqc and coqchk jobs, each on a
+lane (e.g., the worker that ran it). The timeline is saved in the Chrome
+trace-event format, which Perfetto (https://ui.perfetto.dev) and
+chrome://tracing display. Recording is off unless start() was called, in which
+case all functions of this module do nothing.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+from typing import TypeVar
+
+T = TypeVar("T")
+
+MAIN_LANE = "main"
+
+_origin: float | None = None  # time.monotonic() at start(); None if not recording
+_events: list[dict[str, object]] = []
+_lanes: dict[str, int] = {}  # the thread ids of the lanes, by name
+
+
+def start() -> None:
+    # Starts recording; times are relative to now.
+    global _origin
+    _origin = time.monotonic()
+    _events.clear()
+    _lanes.clear()
+    _ = lane_id(MAIN_LANE)
+
+
+def recording() -> bool:
+    return _origin is not None
+
+
+def lane_id(name: str) -> int:
+    # Lanes are numbered in order of first use and named by a metadata event.
+    if name not in _lanes:
+        _lanes[name] = len(_lanes) + 1
+        _events.append(
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": 1,
+                "tid": _lanes[name],
+                "args": {"name": name},
+            }
+        )
+        _events.append(
+            {
+                "name": "thread_sort_index",
+                "ph": "M",
+                "pid": 1,
+                "tid": _lanes[name],
+                "args": {"sort_index": _lanes[name]},
+            }
+        )
+    return _lanes[name]
+
+
+def add_span(
+    name: str,
+    category: str,
+    start: float,
+    end: float,
+    lane: str = MAIN_LANE,
+    args: dict[str, object] | None = None,
+) -> None:
+    # Records a span between two time.monotonic() readings.
+    if _origin is None:
+        return
+    _events.append(
+        {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": round((start - _origin) * 1e6, 3),  # in microseconds
+            "dur": round(max(end - start, 0.0) * 1e6, 3),
+            "pid": 1,
+            "tid": lane_id(lane),
+            "args": args if args is not None else {},
+        }
+    )
+
+
+@contextmanager
+def span(
+    name: str, category: str = "phase", lane: str = MAIN_LANE, **args: object
+) -> Generator[None]:
+    # Records a span around the body of the with statement, also if it raises
+    # (e.g., SystemExit).
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        add_span(name, category, start, time.monotonic(), lane, args)
+
+
+def timed(function: Callable[..., T], *args: object) -> tuple[T, float, float, int]:
+    # Calls the function (possibly in a worker process) and returns its result
+    # with its start and end times and the pid of the process that ran it. On
+    # Linux and macOS, time.monotonic() is shared by all processes.
+    start = time.monotonic()
+    result = function(*args)
+    return result, start, time.monotonic(), os.getpid()
+
+
+def save(path: str) -> None:
+    # Saves the recorded events and stops recording.
+    global _origin
+    if _origin is None:
+        return
+    _origin = None
+    with open(path, "w") as f:
+        json.dump({"traceEvents": _events, "displayTimeUnit": "ms"}, f)
+    print(f"Trace saved to {path}")
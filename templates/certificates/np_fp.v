@@ -30,14 +30,14 @@ Section TaskSetDeclaration.
     split.
     { repeat (move: IN; rewrite in_cons => /orP [/eqP -> | IN]); apply/eqP; last by done.
       all: rewrite /max_arrivals /MaxArrivals /concrete_max_arrivals.
-      all: by clear; rewrite [_ == _]refines_eq; vm_compute. }
+      all: by clear; rewrite [_ == _]refines_eq; $ARRIVAL_CURVES_REDUCTION$. }
     { repeat (move: IN; rewrite in_cons => /orP [/eqP -> | IN]); last by done.
       all: rewrite /max_arrivals /MaxArrivals /concrete_max_arrivals /task_arrival.
       have TR1 := leq_steps_is_transitive.
       all: apply extrapolated_arrival_curve_is_monotone;
-        [ by apply/eqP/eqP; clear; rewrite [_ == _]refines_eq; vm_compute
+        [ by apply/eqP/eqP; clear; rewrite [_ == _]refines_eq; $ARRIVAL_CURVES_REDUCTION$
         | by rewrite /sorted_leq_steps -[sorted _  _]eqb_id; clear;
-          rewrite [_ == _]refines_eq; vm_compute ]. }
+          rewrite [_ == _]refines_eq; $ARRIVAL_CURVES_REDUCTION$ ]. }
   Qed.
 
   Lemma task_set_has_valid_arrivals:
@@ -45,8 +45,8 @@ Section TaskSetDeclaration.
   Proof.
     intros task IN.
     repeat (move: IN; rewrite in_cons => /orP [/eqP EQtsk | IN]); subst; last by done.
-    all: try by clear; rewrite [_ == _]refines_eq; vm_compute.
-    all: by rewrite [valid_arrivals _]refines_eq; vm_compute.
+    all: try by clear; rewrite [_ == _]refines_eq; $ARRIVAL_CURVES_REDUCTION$.
+    all: by rewrite [valid_arrivals _]refines_eq; $ARRIVAL_CURVES_REDUCTION$.
   Qed.
 
 End TaskSetDeclaration.
@@ -66,7 +66,7 @@ Section Certificate.
     blocking_bound_NP (map taskT_to_task ts) (taskT_to_task tsk) + total_hep_rbf (map taskT_to_task ts) (taskT_to_task tsk) L = L.
   Proof.
     rewrite /tsk; apply /eqP.
-    by clear; rewrite [_ == _]refines_eq; vm_compute.
+    by clear; rewrite [_ == _]refines_eq; $L_FIXED_POINT_REDUCTION$.
   Qed.
 
   Variable arr_seq : arrival_sequence Job.
@@ -95,7 +95,18 @@ Section Certificate.
       apply /andP; split; first by done.
       by rewrite mem_iota; move: IN => /andP[LT _].
   Qed.
-
+$MINIMAL_SEARCH_SPACE_START$
+  (** Only the points of the search space below [L] need to be checked. *)
+  Lemma A_in_minimal_search_space:
+    forall (A : duration),
+      is_in_search_space (taskT_to_task tsk) L A ->
+      A \in [seq A' <- search_space_emax_FP (taskT_to_task tsk) L | A' < L].
+  Proof.
+    move => A IN; rewrite mem_filter; apply/andP; split.
+    - by move: IN => /andP[LT _].
+    - by apply A_in_search_space.
+  Qed.
+$MINIMAL_SEARCH_SPACE_END$
   $F_SOLUTIONS$
 
   Lemma R_is_maximum:
@@ -107,13 +118,13 @@ Section Certificate.
         + total_ohep_rbf (map taskT_to_task ts) (taskT_to_task tsk) (A + F) <= A + F
         /\ F + (concept.task_cost (taskT_to_task tsk) - ε) <= R.
   Proof.
-    move => A SS; move: (A_in_search_space A SS) => IN; clear SS.
+    move => A SS; move: ($SEARCH_SPACE_LEMMA$ A SS) => IN; clear SS.
     move: A IN; apply forall_exists_implied_by_forall_in_zip with
       (P_bool := check_point_NP (map taskT_to_task ts) (taskT_to_task tsk) R).
     by intros; split; intros; apply/andP.
     exists (map nat_of_bin Fs); split.
-    - by apply/eqP; clear; rewrite [_ == _]refines_eq; vm_compute.
-    - by clear; rewrite [_ == _]refines_eq; vm_compute.
+    - by apply/eqP; clear; rewrite [_ == _]refines_eq; $R_IS_MAXIMUM_REDUCTION$.
+    - by clear; rewrite [_ == _]refines_eq; $R_IS_MAXIMUM_REDUCTION$.
   Qed.
 
   Ltac find_refl :=
@@ -0,0 +1,72 @@
+from pathlib import Path
+
+import pytest
+
+from poet.analysis import analyze_task_set
+from poet.model import Problem
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_parallel_analysis_matches_serial(subtests: pytest.Subtests) -> None:
+    paths = sorted((ROOT / "examples").glob("*.yaml"))
+    paths += [
+        ROOT / "test-cases" / f"{name}.yaml" for name in ["FP-FP-105", "NP-EDF-001"]
+    ]
+    for path in paths:
+        with subtests.test(msg="parallel RTA", path=path):
+            problem = Problem.from_yaml_file(path)
+            serial = analyze_task_set(problem)
+            parallel = analyze_task_set(problem, jobs=2)
+            for task in problem.task_set:
+                s, p = serial.results[task], parallel.results[task]
+                assert (s.L, s.R, s.SS, s.Fs) == (p.L, p.R, p.SS, p.Fs)
+
+
+def overloaded_problem(policy: str, wcet: int) -> Problem:
+    return Problem.model_validate(
+        {
+            "scheduling policy": policy,
+            "preemption model": "FP",
+            "task set": [
+                {
+                    "id": 1,
+                    "worst-case execution time": wcet,
+                    "period": 10**5,
+                    "deadline": 10**5,
+                    "priority": 2,
+                },
+                {
+                    "id": 2,
+                    "worst-case execution time": 1,
+                    "period": 10,
+                    "deadline": 10,
+                    "priority": 1,
+                },
+            ],
+        }
+    )
+
+
+def test_numpy_backend_matches_pyrta(subtests: pytest.Subtests) -> None:
+    _ = pytest.importorskip("numpy")
+    paths = sorted((ROOT / "examples").glob("*.yaml"))
+    paths += [
+        ROOT / "test-cases" / f"{name}.yaml"
+        for name in ["FP-FP-105", "FP-EDF-008", "NP-FP-007", "NP-EDF-001"]
+    ]
+    problems = [(str(path), Problem.from_file(path)) for path in paths]
+    # Unbounded busy windows, with and without values beyond 64 bits
+    problems += [
+        (f"overloaded {policy} {wcet}", overloaded_problem(policy, wcet))
+        for policy in ["FP", "EDF"]
+        for wcet in [10**5, 10**16]
+    ]
+    for name, problem in problems:
+        with subtests.test(msg="NumPy backend", path=name):
+            expected = analyze_task_set(problem)
+            for jobs in [1, 2]:
+                results = analyze_task_set(problem, jobs=jobs, backend="numpy")
+                for task in problem.task_set:
+                    e, r = expected.results[task], results.results[task]
+                    assert (e.L, e.R, e.SS, e.Fs) == (r.L, r.R, r.SS, r.Fs)
@@ -0,0 +1,85 @@
+from pathlib import Path
+
+import pytest
+
+from poet import analysis_cache
+from poet.analysis import analyze_task_set
+from poet.analysis_cache import (
+    RESULTS_FILE_NAME,
+    AnalysisCache,
+    analyze_task_set_cached,
+    problem_key,
+)
+from poet.model import Problem
+
+TASK_1 = """\
+- id: 1
+  worst-case execution time: 50
+  arrival curve: [220,[[1,1],[105,2]]]
+  deadline: 100
+  priority: 2
+"""
+
+TASK_2 = """\
+- deadline: 100
+  period: 30
+  worst-case execution time: 10
+  id: 2
+  priority: 1
+"""
+
+
+def load(tmp_path: Path, tasks: str, policy: str = "FP") -> Problem:
+    path = tmp_path / "problem.yaml"
+    _ = path.write_text(
+        f"scheduling policy: {policy}\npreemption model: FP\ntask set:\n{tasks}"
+    )
+    return Problem.from_yaml_file(path)
+
+
+def test_key_is_canonical(tmp_path: Path):
+    problem = load(tmp_path, TASK_1 + TASK_2)
+    assert problem_key(problem) == problem_key(load(tmp_path, TASK_2 + TASK_1))
+    assert problem_key(problem) != problem_key(load(tmp_path, TASK_1 + TASK_2, "EDF"))
+    changed = TASK_2.replace("period: 30", "period: 31")
+    assert problem_key(problem) != problem_key(load(tmp_path, TASK_1 + changed))
+
+
+def test_hit_after_miss(tmp_path: Path):
+    cache = AnalysisCache(str(tmp_path / "cache"), 1024 * 1024)
+    problem = load(tmp_path, TASK_1 + TASK_2)
+    expected = analyze_task_set(problem)
+
+    first = analyze_task_set_cached(problem, cache)
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    # A fresh cache on the same folder, with the tasks listed in another order
+    cache = AnalysisCache(str(tmp_path / "cache"), 1024 * 1024)
+    reordered = load(tmp_path, TASK_2 + TASK_1)
+    second = analyze_task_set_cached(reordered, cache)
+    assert (cache.hits, cache.misses) == (1, 0)
+
+    for t in problem.task_set:
+        assert first.results[t].to_dict() == expected.results[t].to_dict()
+    for t in reordered.task_set:
+        [same] = [u for u in problem.task_set if u.id == t.id]
+        assert second.results[t].to_dict() == expected.results[same].to_dict()
+
+
+def test_corrupted_entry_is_a_miss(tmp_path: Path):
+    cache = AnalysisCache(str(tmp_path / "cache"), 1024 * 1024)
+    problem = load(tmp_path, TASK_1 + TASK_2)
+    cache.store.write_text(problem_key(problem), RESULTS_FILE_NAME, '{"1": {"L": 1}}')
+
+    assert cache.lookup(problem) is None
+    _ = analyze_task_set_cached(problem, cache)
+    assert cache.lookup(problem) is not None
+
+
+def test_key_depends_on_the_results_format(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    problem = load(tmp_path, TASK_1 + TASK_2)
+    key = problem_key(problem)
+    monkeypatch.setattr(analysis_cache, "RESULTS_FORMAT_VERSION", 2)
+    assert problem_key(problem) != key
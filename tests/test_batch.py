@@ -0,0 +1,42 @@
+import csv
+import shutil
+from pathlib import Path
+
+import pytest
+
+from poet.batch import run_batch, workload_folder_names
+from poet.convert import run_convert
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_workloads_with_the_same_name_get_their_own_folders(tmp_path: Path) -> None:
+    for folder in ["a", "b"]:
+        (tmp_path / folder).mkdir()
+        _ = shutil.copy(ROOT / "examples" / "paper.yaml", tmp_path / folder / "x.yaml")
+    run_convert([str(tmp_path / "a" / "x.yaml")])  # writes a/x.json
+    inputs = [str(tmp_path / p) for p in ["a/x.yaml", "a/x.json", "b/x.yaml"]]
+
+    assert workload_folder_names(inputs) == ["x.yaml", "x.json", "x.yaml-2"]
+    assert workload_folder_names(inputs[1:]) == ["x.json", "x.yaml"]
+    assert workload_folder_names(inputs[:1]) == ["x"]
+
+    out = tmp_path / "out"
+    run_batch([*inputs, "-n", "-o", str(out)])
+    for name in ["x.yaml", "x.json", "x.yaml-2"]:
+        assert (out / name / "task_set.v").is_file()
+
+
+def test_unparsable_workloads_are_reported(tmp_path: Path) -> None:
+    _ = shutil.copy(ROOT / "examples" / "paper.yaml", tmp_path / "good.yaml")
+    _ = (tmp_path / "bad.yaml").write_text("scheduling policy: FP\n  bad: [")
+    _ = (tmp_path / "bad.json").write_text("{")
+    inputs = [str(tmp_path / name) for name in ["good.yaml", "bad.yaml", "bad.json"]]
+
+    out = tmp_path / "out"
+    with pytest.raises(SystemExit):
+        run_batch([*inputs, "-n", "-o", str(out)])
+    with open(out / "results.csv") as f:
+        status = {row["workload"]: row["status"] for row in csv.DictReader(f)}
+    assert status[inputs[1]] == status[inputs[2]] == "parse error"
+    assert status[inputs[0]] != "parse error"
@@ -0,0 +1,78 @@
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from poet.certificates.cache import toolchain_version
+from poet.utils.cache import DiskCache, content_hash
+
+
+def test_lookup_returns_stored_files(tmp_path: Path) -> None:
+    cache = DiskCache(str(tmp_path / "cache"), 1 << 20)
+    src = tmp_path / "certificate.vo"
+    _ = src.write_bytes(b"compiled")
+    key = content_hash("certificate", "template")
+
+    assert cache.lookup(key, "certificate.vo") is None
+    cache.store(key, "certificate.vo", str(src))
+    cached = cache.lookup(key, "certificate.vo")
+
+    assert cached is not None
+    assert Path(cached).read_bytes() == b"compiled"
+
+
+def test_content_hash_separates_parts() -> None:
+    assert content_hash("ab", "c") != content_hash("a", "bc")
+
+
+def test_evicts_least_recently_used_entries(tmp_path: Path) -> None:
+    cache = DiskCache(str(tmp_path / "cache"), 25)
+    keys = [content_hash(str(i)) for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.write_text(key, "verdict", "x" * 10)
+        os.utime(cache.entry_path(key), (i, i))
+    _ = cache.read_text(keys[0], "verdict")  # keys[0] is now the most recent
+
+    assert cache.evict() == 1
+    assert cache.read_text(keys[1], "verdict") is None
+    assert cache.read_text(keys[0], "verdict") is not None
+    assert cache.read_text(keys[2], "verdict") is not None
+
+
+def test_toolchain_version_depends_on_prosa_contents(tmp_path: Path) -> None:
+    vo = tmp_path / "prosa" / "analysis" / "rta.vo"
+    vo.parent.mkdir(parents=True)
+    _ = vo.write_bytes(b"compiled")
+    before = toolchain_version(str(tmp_path / "prosa"))
+
+    os.utime(tmp_path / "prosa", (0, 0))
+    assert toolchain_version(str(tmp_path / "prosa")) == before
+
+    _ = vo.write_bytes(b"upgraded")
+    os.utime(vo, (0, 0))
+    assert toolchain_version(str(tmp_path / "prosa")) != before
+
+
+def test_entries_evicted_concurrently_are_misses(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = DiskCache(str(tmp_path / "cache"), 1 << 20)
+    key = content_hash("verdict")
+    cache.write_text(key, "verdict", "ok\n")
+    lookup = cache.lookup
+
+    def lookup_then_evict(key: str, name: str) -> str | None:
+        path = lookup(key, name)
+        shutil.rmtree(cache.entry_path(key))  # by another process
+        return path
+
+    monkeypatch.setattr(cache, "lookup", lookup_then_evict)
+    assert cache.read_text(key, "verdict") is None
+
+    # a file that vanishes while the entries are listed
+    vanished = content_hash("vanished")
+    os.makedirs(cache.entry_path(vanished))
+    os.symlink(tmp_path / "missing", os.path.join(cache.entry_path(vanished), "tmp"))
+    assert cache.entries() == []
+    assert cache.evict() == 0
@@ -0,0 +1,49 @@
+from pathlib import Path
+
+import pytest
+
+from poet.analysis import analyze_task_set
+from poet.certificates.coq_generator import generate_proof, get_F_solutions
+from poet.model import Problem
+from poet.utils.reduction import parse_reduction
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_minimal_search_space_keeps_points_below_L() -> None:
+    problem = Problem.from_yaml_file(ROOT / "test-cases" / "FP-EDF-001.yaml")
+    results = analyze_task_set(problem)
+    task = problem.task_set[0]
+    r = results.results[task]
+    SS, Fs = r.minimal_search_space()
+
+    assert 0 < len(SS) < len(r.SS)
+    assert all(A < r.L for A in SS)
+    proof, _ = generate_proof(problem, task, r, True, True, minimal_search_space=True)
+    assert "A_in_minimal_search_space A SS" in proof
+    assert get_F_solutions(Fs) in proof
+
+
+def test_reduction_strategy_per_obligation() -> None:
+    problem = Problem.from_yaml_file(ROOT / "test-cases" / "NP-FP-010.yaml")
+    results = analyze_task_set(problem)
+    task = problem.task_set[0]
+    r = results.results[task]
+    default, default_declaration = generate_proof(problem, task, r, True, True)
+    assert "native_compute" not in default + default_declaration
+    assert "$" not in default + default_declaration
+
+    reduction = parse_reduction("native,arrival-curves=vm")
+    assert reduction == {
+        "arrival-curves": "vm",
+        "L-fixed-point": "native",
+        "R-is-maximum": "native",
+    }
+    proof, declaration = generate_proof(
+        problem, task, r, True, True, reduction=reduction
+    )
+    assert declaration == default_declaration
+    assert proof.count("native_compute") == 3
+    assert proof.replace("native_compute", "vm_compute") == default
+    with pytest.raises(ValueError):
+        _ = parse_reduction("native,R=vm")
@@ -0,0 +1,152 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from poet.analysis import analyze_task_set
+from poet.incremental import (
+    MANIFEST_FILE_NAME,
+    Manifest,
+    affected_tasks,
+    build_manifest,
+    reusable_results,
+)
+from poet.model import Problem
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Stand-ins for coqc and coqchk that log their calls; coqc writes a .vo file
+# only without -vos/-vok, as the real one does.
+FAKE_COQC = """\
+#!/bin/sh
+mode=vo
+for a in "$@"; do
+  case "$a" in
+    --version) echo "fake coqc"; exit 0;;
+    -where) echo /fake; exit 0;;
+    -vos) mode=vos;;
+    -vok) mode=vok;;
+    *.v) f="$a";;
+  esac
+done
+echo "coqc $mode $f" >> "$POET_TEST_LOG"
+case $mode in
+  vo) cksum < "$f" > "${f%.v}.vo";;
+  *) : > "${f%.v}.$mode";;
+esac
+"""
+FAKE_COQCHK = """\
+#!/bin/sh
+echo "coqchk $*" >> "$POET_TEST_LOG"
+"""
+
+PAPER = """\
+scheduling policy: {policy}
+preemption model: FP
+task set:
+- id: 1
+  worst-case execution time: 50
+  arrival curve: [220,[[1,1],[105,2]]]
+  deadline: 100
+  priority: 2
+- id: 2
+  worst-case execution time: {wcet}
+  period: 30
+  deadline: 100
+  priority: 1
+"""
+
+
+def load(tmp_path: Path, policy: str = "FP", wcet: int = 10) -> Problem:
+    path = tmp_path / f"{policy}-{wcet}.yaml"
+    _ = path.write_text(PAPER.format(policy=policy, wcet=wcet))
+    return Problem.from_yaml_file(path)
+
+
+def manifest_of(problem: Problem, tmp_path: Path) -> Manifest:
+    results = analyze_task_set(problem)
+    options: dict[str, object] = {"repeat_declaration": False}
+    manifest = build_manifest(
+        problem, results, str(tmp_path), [], options, set(), set(), False
+    )
+    manifest.save(str(tmp_path))
+    loaded = Manifest.load(str(tmp_path))
+    assert loaded is not None
+    return loaded
+
+
+def test_unchanged_input_reuses_all_results(tmp_path: Path) -> None:
+    problem = load(tmp_path)
+    manifest = manifest_of(problem, tmp_path)
+
+    assert affected_tasks(manifest, problem) == set()
+    reused = reusable_results(manifest, problem, set())
+    fresh = analyze_task_set(problem)
+    for t in problem.task_set:
+        r, f = reused[t], fresh.results[t]
+        assert (r.L, r.R, r.SS, r.Fs) == (f.L, f.R, f.SS, f.Fs)
+
+
+def test_fp_change_affects_only_lower_priority_tasks(tmp_path: Path) -> None:
+    manifest = manifest_of(load(tmp_path), tmp_path)
+
+    # task 2 has the lowest priority and does not interfere with task 1
+    assert affected_tasks(manifest, load(tmp_path, wcet=20)) == {2}
+
+
+def test_edf_change_affects_all_tasks(tmp_path: Path) -> None:
+    manifest = manifest_of(load(tmp_path, "EDF"), tmp_path)
+
+    assert affected_tasks(manifest, load(tmp_path, "EDF", wcet=20)) == {1, 2}
+    assert affected_tasks(manifest, load(tmp_path, "FP")) == {1, 2}
+
+
+def test_unreadable_manifests_are_ignored(tmp_path: Path) -> None:
+    header = "scheduling_policy: FP\npreemption_model: FP\noptions: {}\nfiles: {}\n"
+    for text in [
+        "{",
+        "[]",
+        "scheduling_policy: FP",
+        "tasks: {x: 1}\nfiles: []",
+        header + "tasks: {1: {input: {}, results: {L: 1}}}",
+    ]:
+        _ = (tmp_path / MANIFEST_FILE_NAME).write_text(text)
+        assert Manifest.load(str(tmp_path)) is None
+
+
+def test_async_run_is_not_reused_as_compiled(tmp_path: Path) -> None:
+    bin_path, out, log = tmp_path / "bin", tmp_path / "out", tmp_path / "log"
+    bin_path.mkdir()
+    for name, script in [("coqc", FAKE_COQC), ("coqchk", FAKE_COQCHK)]:
+        _ = (bin_path / name).write_text(script)
+        (bin_path / name).chmod(0o755)
+    env = dict(
+        os.environ,
+        PATH=f"{bin_path}{os.pathsep}{os.environ['PATH']}",
+        PYTHONPATH=str(ROOT / "src"),
+        POET_TEST_LOG=str(log),
+    )
+
+    def run(wcet: int, *args: str) -> list[str]:
+        _ = log.write_text("")
+        _ = subprocess.run(
+            [sys.executable, "-m", "poet", "--incremental", "-o", str(out), *args]
+            + [str(tmp_path / f"FP-{wcet}.yaml")],
+            check=True,
+            capture_output=True,
+            env=env,
+        )
+        return log.read_text().splitlines()
+
+    _ = load(tmp_path, wcet=10), load(tmp_path, wcet=11)
+    assert any(c.startswith("coqchk") for c in run(10))
+    # the async run changes the certificates but leaves the old .vo files
+    calls = run(11, "--async-proofs")
+    assert calls and all(c.startswith(("coqc vos", "coqc vok")) for c in calls)
+    manifest = Manifest.load(str(out))
+    assert manifest is not None
+    assert all(r.compiled == "" and not r.verified for r in manifest.files.values())
+    # hence the next run compiles and checks all certificates again
+    calls = run(11)
+    assert len([c for c in calls if c.startswith("coqc vo ")]) == 3
+    assert any(c.startswith("coqchk") for c in calls)
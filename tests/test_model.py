@@ -0,0 +1,89 @@
+from dataclasses import replace
+from pathlib import Path
+from typing import cast
+
+import pytest
+from pydantic import ValidationError
+from response_time_analysis import model as rta_model
+
+from poet.model import ArrivalCurve, Problem, Task, indexed_arrival_curves
+from poet.task_analysis import analyze
+
+ROOT = Path(__file__).resolve().parents[1]
+TASK = {"id": 1, "worst-case execution time": 1, "deadline": 10}
+
+
+def plain_curves(task_set: rta_model.TaskSet) -> rta_model.TaskSet:
+    # The same task set, with pyRTA's own arrival-curve prefixes
+    tasks: list[rta_model.Task] = []
+    for t in task_set.with_arrival_curves():
+        curve = cast(rta_model.ArrivalCurvePrefix, t.arrivals)
+        prefix = rta_model.ArrivalCurvePrefix(curve.horizon, curve.ac_steps)
+        tasks.append(replace(t, arrivals=prefix))
+    return rta_model.TaskSet(tuple(tasks))
+
+
+def test_max_arrivals_matches_pyrta(subtests: pytest.Subtests) -> None:
+    for name in ["FP-FP-002", "NP-FP-172"]:
+        problem = Problem.from_file(ROOT / "test-cases" / f"{name}.yaml")
+        reference = plain_curves(problem.to_rta_model())
+        for t, ref in zip(problem.task_set, reference):
+            with subtests.test(msg="max_arrivals", path=name, task=t.id):
+                horizon = cast(rta_model.ArrivalCurvePrefix, ref.arrivals).horizon
+                for delta in range(3 * horizon + 2):
+                    assert t.max_arrivals(delta) == ref.arrivals.max_arrivals(delta)
+
+
+def test_indexed_curves_yield_same_results() -> None:
+    problem = Problem.from_file(ROOT / "test-cases" / "FP-FP-002.yaml")
+    indexed = indexed_arrival_curves(problem.to_rta_model().with_arrival_curves())
+    plain = plain_curves(problem.to_rta_model())
+    for a, b in zip(indexed, plain):
+        ra = analyze(problem.scheduling_policy, indexed, a)
+        rb = analyze(problem.scheduling_policy, plain, b)
+        assert (ra.L, ra.R, ra.SS, ra.Fs) == (rb.L, rb.R, rb.SS, rb.Fs)
+
+
+def test_curve_steps_accept_the_same_values_as_before() -> None:
+    # as a list[tuple[PositiveInt, PositiveInt]] field: integral floats and
+    # strings are coerced, everything else is rejected
+    for steps in [[[1.0, 1], ["5", 3]], [(1, 1), [5, 3.0]]]:
+        curve = ArrivalCurve.model_validate({"horizon": 20, "steps": steps})
+        assert list(curve.steps) == [(1, 1), (5, 3)]
+    for steps in [[], [[1, 1.5]], [[1, "x"]], [[1, 0]], [[1, 1, 1]], "11", None]:
+        with pytest.raises(ValidationError):
+            _ = ArrivalCurve.model_validate({"horizon": 20, "steps": steps})
+    with pytest.raises(ValidationError):
+        _ = ArrivalCurve.model_validate({"horizon": 20, "steps": [[1, 2**64]]})
+
+
+def test_curve_steps_keep_input_format() -> None:
+    task = Task.model_validate({**TASK, "arrival curve": [20, [[1, 1], [5, 3]]]})
+    curve = task.arrival_curve
+    assert curve is not None
+    assert curve == ArrivalCurve.model_validate(
+        {"horizon": 20, "steps": [(1, 1), (5, 3)]}
+    )
+    assert curve.steps[-1] == (5, 3)
+    assert list(curve.steps) == [(1, 1), (5, 3)]
+    data = task.model_dump(mode="json", by_alias=True, exclude_none=True)
+    assert data["arrival curve"] == [20, [[1, 1], [5, 3]]]
+    assert task.utilization() == 3 / 20
+
+
+@pytest.mark.parametrize(
+    "steps",
+    [
+        [[1, 1], [1, 2]],
+        [[1, 2], [3, 1]],
+        [[2, 1]],
+        [[1, 1], [20, 2]],
+        [],
+        [[1, "a"]],
+        [[1, 0]],
+        [[1, 1, 1]],
+    ],
+)
+def test_invalid_curves_are_rejected(steps: object) -> None:
+    with pytest.raises(ValidationError):
+        _ = Task.model_validate({**TASK, "arrival curve": [20, steps]})
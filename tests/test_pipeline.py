@@ -0,0 +1,292 @@
+import itertools
+import json
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from poet.analysis import analyze_task_set
+from poet.certificates import pipeline
+from poet.certificates.pipeline import (
+    Job,
+    estimate_costs,
+    priorities,
+    run_pipeline,
+    shard_jobs,
+)
+from poet.model import Problem
+from poet.utils import processes, trace
+from poet.utils.statistics import Statistics
+from poet.utils.timing import Stopwatch
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_jobs_start_when_dependencies_succeed() -> None:
+    order: list[str] = []
+    lock = threading.Lock()
+
+    def job(name: str, duration: float, ok: bool = True) -> Callable[[], float]:
+        def run() -> float:
+            time.sleep(duration)
+            with lock:
+                order.append(name)
+            return duration if ok else -1
+
+        return run
+
+    jobs = [
+        Job("dec", "coq", job("dec", 0.01)),
+        Job("slow", "coq", job("slow", 0.2), ["dec"]),
+        Job("fast", "coq", job("fast", 0.01), ["dec"]),
+        Job("fast_chk", "coqchk", job("fast_chk", 0.01), ["fast"]),
+        Job("slow_chk", "coqchk", job("slow_chk", 0.01), ["slow"]),
+    ]
+
+    assert run_pipeline(jobs, 2)
+    # the fast certificate is checked while the slow one is still compiling
+    assert order.index("fast_chk") < order.index("slow")
+
+
+def test_failure_blocks_only_dependent_jobs() -> None:
+    jobs = [
+        Job("a", "coq", lambda: -1),
+        Job("a_chk", "coqchk", lambda: 1.0, ["a"]),
+        Job("b", "coq", lambda: 1.0),
+        Job("b_chk", "coqchk", lambda: 1.0, ["b", "up_to_date"]),
+    ]
+
+    assert not run_pipeline(jobs, 1)
+    assert [j.time for j in jobs] == [-1, None, 1.0, 1.0]
+
+
+def test_longest_chain_starts_first() -> None:
+    started: list[str] = []
+
+    def job(name: str) -> Callable[[], float]:
+        def run() -> float:
+            started.append(name)
+            return 1.0
+
+        return run
+
+    jobs = [
+        Job("cheap", "coq", job("cheap"), cost=1.0),
+        Job("cheap_chk", "coqchk", job("cheap_chk"), ["cheap"], cost=1.0),
+        Job("costly", "coq", job("costly"), cost=5.0),
+        Job("costly_chk", "coqchk", job("costly_chk"), ["costly"], cost=1.0),
+    ]
+
+    assert priorities(jobs) == {
+        "cheap": 2.0,
+        "cheap_chk": 1.0,
+        "costly": 6.0,
+        "costly_chk": 1.0,
+    }
+    assert run_pipeline(jobs, 1)
+    assert started[0] == "costly"
+
+
+def test_costs_prefer_recorded_times(tmp_path: Path) -> None:
+    problem = Problem.from_yaml_file(ROOT / "examples" / "paper.yaml")
+    results = analyze_task_set(problem)
+    tsk01, tsk02 = problem.task_set
+
+    # without history, tsk02 has the larger search space
+    costs = estimate_costs(problem, results, str(tmp_path))
+    assert costs[tsk02.v_name()] > costs[tsk01.v_name()]
+
+    stopwatch = Stopwatch()
+    for name in ["total_poet_time", "total_coq_time", "total_time"]:
+        stopwatch.set_time(name, 1.0)
+    stopwatch.set_time(f"{tsk01.v_name()}_coq_time", 9.0)
+    stopwatch.set_time(f"{tsk01.vo_name()}_coqchk_time", 3.0)
+    # tsk02 was restored from the cache, which took no time to speak of
+    stopwatch.set_time(f"{tsk02.v_name()}_coq_time", 0.01)
+    ran = processes.Resources(exit_status=0)
+    resources = {
+        f"{tsk01.v_name()}_coq_time": ran,
+        f"{tsk01.vo_name()}_coqchk_time": ran,
+    }
+    Statistics(problem, results, stopwatch, resources=resources).save(
+        str(tmp_path / "stats.yaml")
+    )
+
+    costs = estimate_costs(problem, results, str(tmp_path))
+    assert costs[tsk01.v_name()] == (9.0, 3.0)
+    # tsk02 is estimated at the measured time per search-space point of tsk01
+    assert 3 * 4.5 <= costs[tsk02.v_name()][0] < 4 * 4.5
+
+
+def test_shards_attribute_verdicts(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[list[str]] = []
+
+    def verify(_p: str | None, _c: str, vos: list[str], _v: bool) -> float:
+        calls.append(vos)
+        return -1 if "b.vo" in vos else 2.0 * len(vos)
+
+    monkeypatch.setattr(pipeline, "verify_certificates", verify)
+    costs = {"a.v": (1.0, 3.0), "b.v": (1.0, 1.0), "c.v": (1.0, 1.0)}
+    jobs = shard_jobs("", ["a.v", "b.v", "c.v"], None, None, False, 2, None, costs, "")
+
+    # the costly certificate gets a shard on its own
+    assert [j.cost for j in jobs] == [3.0, 2.0]
+    assert [j.dependencies for j in jobs] == [
+        ["a.v_coq_time"],
+        ["b.v_coq_time", "c.v_coq_time"],
+    ]
+    assert [j.run() for j in jobs] == [2.0, -1]
+    # the failing shard is checked again one certificate at a time
+    assert calls == [["a.vo"], ["b.vo", "c.vo"], ["b.vo"], ["c.vo"]]
+    assert jobs[0].shares == {"a.vo_coqchk_time": 2.0}
+    assert jobs[1].shares == {"b.vo_coqchk_time": -1, "c.vo_coqchk_time": 2.0}
+
+
+def test_async_proofs_wait_only_for_interfaces() -> None:
+    jobs = pipeline.certificate_jobs(
+        "", ["task_set.v", "tsk01.v"], "task_set.v", "", None, False, async_proofs=True
+    )
+
+    assert {j.name: j.dependencies for j in jobs} == {
+        "task_set.v_vos_time": [],
+        "task_set.v_vok_time": ["task_set.v_vos_time"],
+        "tsk01.v_vos_time": ["task_set.v_vos_time"],
+        "tsk01.v_vok_time": ["tsk01.v_vos_time"],
+    }
+    for job, duration in zip(jobs, [1.0, 2.0, 1.0, -1]):
+        job.time = duration
+    times = pipeline.job_times(jobs)
+    assert times["task_set.v_coq_time"] == 3.0
+    assert times["tsk01.v_coq_time"] == -1
+
+
+def test_memory_budget_limits_parallelism(tmp_path: Path) -> None:
+    running: list[str] = []
+    overlaps: list[int] = []
+    lock = threading.Lock()
+
+    def job(name: str) -> Callable[[], float]:
+        def run() -> float:
+            with lock:
+                running.append(name)
+                overlaps.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(name)
+            return 1.0
+
+        return run
+
+    problem = Problem.from_yaml_file(ROOT / "examples" / "paper.yaml")
+    tsk01, tsk02 = problem.task_set
+    stopwatch = Stopwatch()
+    for name in ["total_poet_time", "total_coq_time", "total_time"]:
+        stopwatch.set_time(name, 1.0)
+    peaks = {f"{tsk01.v_name()}_coq_time": processes.Resources(peak_memory=60.0)}
+    results = analyze_task_set(problem)
+    Statistics(problem, results, stopwatch, resources=peaks).save(
+        str(tmp_path / "stats.yaml")
+    )
+    # tsk02 and the declaration are estimated at the largest measured peak
+    estimates = pipeline.estimate_memory(problem, str(tmp_path), "task_set.v")
+    assert [
+        estimates[v][0] for v in ["task_set.v", tsk01.v_name(), tsk02.v_name()]
+    ] == [60.0] * 3
+
+    jobs = [
+        Job(v, "coq", job(v), memory=estimates[v][0])
+        for v in ["task_set.v", tsk01.v_name(), tsk02.v_name()]
+    ]
+    assert run_pipeline(jobs, 3, memory_budget=100.0)
+    assert max(overlaps) == 1
+    assert run_pipeline(jobs, 3, memory_budget=200.0)
+    assert max(overlaps) > 1
+
+
+def test_failure_cancels_all_jobs() -> None:
+    def sleep(seconds: str) -> Callable[[], float]:
+        return lambda: 1.0 if processes.call(["sleep", seconds], ".") == 0 else -1
+
+    jobs = [
+        Job("stuck", "coq", sleep("10"), cost=2.0),
+        Job("failing", "coq", sleep("not-a-number"), cost=1.0),
+        Job("queued", "coq", sleep("0")),
+    ]
+    start = time.monotonic()
+    assert not run_pipeline(jobs, 2, fail_fast=True)
+    assert time.monotonic() - start < 5
+    assert [j.status for j in jobs] == ["cancelled", "failed", "cancelled"]
+
+    jobs = [Job("stuck", "coq", sleep("10")), Job("quick", "coq", sleep("0"))]
+    assert not run_pipeline(jobs, 2, job_timeout=0.2)
+    assert [j.status for j in jobs] == ["timed out", "succeeded"]
+
+
+def test_resources_are_attributed_per_certificate() -> None:
+    def check(*vos: str) -> Callable[[], float]:
+        # a coqchk stand-in that burns some CPU time and fails on b.vo
+        script = "sum(range(3 * 10**6)); import sys; sys.exit('b.vo' in sys.argv)"
+        command = [sys.executable, "-c", script, *vos]
+        return lambda: 1.0 if processes.call(command, ".") == 0 else -1
+
+    jobs = [
+        Job("a.vo_coqchk_time", "coqchk", check("a.vo")),
+        Job("coqchk_shard_0", "coqchk", check("b.vo", "c.vo")),
+    ]
+    jobs[1].shares = {"b.vo_coqchk_time": -1, "c.vo_coqchk_time": -1}
+    assert not run_pipeline(jobs, 2)
+
+    resources = pipeline.job_resources(jobs)
+    assert [resources[f"{v}.vo_coqchk_time"].exit_status for v in "abc"] == [0, 1, 1]
+    a, b, c = (resources[f"{v}.vo_coqchk_time"] for v in "abc")
+    assert a.user_time is not None and a.user_time > 0
+    # the certificates checked together share the CPU time of the call
+    assert b.user_time == c.user_time
+    assert a.peak_memory is not None and a.peak_memory == jobs[0].calls[0].peak_memory
+
+
+def test_trace_shows_jobs_on_worker_lanes(tmp_path: Path) -> None:
+    def sleep(seconds: float) -> Callable[[], float]:
+        def run() -> float:
+            time.sleep(seconds)
+            return seconds
+
+        return run
+
+    jobs = [Job(f"job{i}", "coq", sleep(0.02 * (i % 3 + 1))) for i in range(6)]
+    jobs.append(Job("chk", "coqchk", sleep(0.01), [j.name for j in jobs]))
+    trace.start()
+    with trace.span("pipeline"):
+        assert run_pipeline(jobs, 2)
+    pipeline.trace_jobs(jobs)
+    trace.save(str(tmp_path / "trace.json"))
+    assert not trace.recording()
+
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    lanes = {e["tid"]: e["args"]["name"] for e in events if e["name"] == "thread_name"}
+    spans = [e for e in events if e["ph"] == "X"]
+    assert [lanes[e["tid"]] for e in spans if e["name"] == "pipeline"] == ["main"]
+    job_spans = [e for e in spans if e["name"] != "pipeline"]
+    assert {e["name"] for e in job_spans} == {j.name for j in jobs}
+    assert {lanes[e["tid"]] for e in job_spans} == {"worker 1", "worker 2"}
+    # the jobs on a lane do not overlap
+    for tid in {e["tid"] for e in job_spans}:
+        lane = sorted(
+            (e["ts"], e["ts"] + e["dur"]) for e in job_spans if e["tid"] == tid
+        )
+        assert all(
+            end <= next_start for (_, end), (next_start, _) in itertools.pairwise(lane)
+        )
+
+
+def test_processes_reaped_elsewhere_are_not_an_error() -> None:
+    # e.g., by Popen.poll() while a worker waits in wait4()
+    with subprocess.Popen([sys.executable, "-c", "exit(3)"]) as process:
+        _ = process.wait()
+        assert processes.wait(process, processes.Call()) == 3
+        with processes._lock:  # pyright: ignore[reportPrivateUsage]
+            processes.kill(process)
@@ -0,0 +1,95 @@
+import itertools
+import os
+import random
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from poet.analysis import analyze_task_set
+from poet.model import Problem
+from poet.priority_assignment import assign_priorities
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def with_priorities(problem: Problem, priorities: list[int]) -> Problem:
+    task_set = [
+        t.model_copy(update={"priority": p})
+        for t, p in zip(problem.task_set, priorities)
+    ]
+    return problem.model_copy(update={"task_set": task_set})
+
+
+def random_problem(rnd: random.Random, preemption: str) -> Problem:
+    # Four sporadic tasks with constrained deadlines and a high utilization
+    tasks: list[dict[str, object]] = []
+    for i in range(4):
+        mit = rnd.randint(10, 100)
+        wcet = rnd.randint(1, mit // 3)
+        deadline = rnd.randint(wcet, mit)
+        tasks.append(
+            {
+                "id": i + 1,
+                "min interarrival": mit,
+                "worst-case execution time": wcet,
+                "deadline": deadline,
+            }
+        )
+    return Problem.model_validate(
+        {
+            "scheduling policy": "FP",
+            "preemption model": preemption,
+            "task set": tasks,
+        }
+    )
+
+
+def test_assigned_priorities_are_analyzed_correctly(subtests: pytest.Subtests) -> None:
+    # The given priorities of these task sets are not schedulable.
+    for name in ["FP-FP-022", "NP-FP-052"]:
+        with subtests.test(msg="assignment", path=name):
+            problem = Problem.from_file(ROOT / "test-cases" / f"{name}.yaml")
+            assert not analyze_task_set(problem).all_deadlines_respected()
+            result = assign_priorities(problem, False)
+            assert result.problem is not None and result.analysis_results is not None
+            assert sorted(t.priority or 0 for t in result.problem.task_set) == list(
+                range(1, len(problem.task_set) + 1)
+            )
+            fresh = analyze_task_set(result.problem)
+            assert fresh.all_deadlines_respected()
+            assert all(
+                fresh.results[t].to_dict()
+                == result.analysis_results.results[t].to_dict()
+                for t in result.problem.task_set
+            )
+
+
+def test_assignment_is_optimal(subtests: pytest.Subtests) -> None:
+    # Audsley's algorithm finds a schedulable assignment iff one exists.
+    rnd = random.Random(18)
+    for preemption in ["FP", "NP"]:
+        for i in range(15):
+            problem = random_problem(rnd, preemption)
+            with subtests.test(msg="optimality", preemption=preemption, i=i):
+                exists = any(
+                    analyze_task_set(
+                        with_priorities(problem, list(priorities))
+                    ).all_deadlines_respected()
+                    for priorities in itertools.permutations(range(1, 5))
+                )
+                assert (assign_priorities(problem, False).problem is not None) == exists
+
+
+def test_schedulability_test_writes_no_files(tmp_path: Path) -> None:
+    input_path = tmp_path / "input.yaml"
+    _ = shutil.copy(ROOT / "examples" / "fp-fp.yaml", input_path)
+    env = dict(os.environ, PYTHONPATH=str(ROOT / "src"))
+    command = [sys.executable, "-m", "poet", "-t", "--assign-priorities"]
+    result = subprocess.run(
+        [*command, str(input_path)], check=True, capture_output=True, text=True, env=env
+    )
+    assert "Assigned priorities" in result.stdout
+    assert [p.name for p in tmp_path.iterdir()] == ["input.yaml"]
@@ -1,8 +1,10 @@
 from pathlib import Path
 
 import pytest
+import yaml
 
-from poet.model import Problem
+from poet.convert import dump_problem
+from poet.model import Problem, YAMLLoader
 
 ROOT = Path(__file__).resolve().parents[1]
 
@@ -14,3 +16,20 @@ def test_loads_all_test_cases(subtests: pytest.Subtests) -> None:
     for path in test_files:
         with subtests.test(msg="YAML parser", path=path):
             assert Problem.from_yaml_file(path) is not None
+
+
+def test_uses_libyaml_if_available() -> None:
+    if hasattr(yaml, "CSafeLoader"):
+        assert YAMLLoader is yaml.CSafeLoader
+
+
+def test_json_round_trip(subtests: pytest.Subtests, tmp_path: Path) -> None:
+    for path in sorted((ROOT / "examples").glob("*.yaml")):
+        with subtests.test(msg="JSON round trip", path=path):
+            problem = Problem.from_file(path)
+            json_path = tmp_path / (path.stem + ".json")
+            _ = json_path.write_text(dump_problem(problem, "json"))
+            assert Problem.from_file(json_path) == problem
+            yaml_path = tmp_path / (path.stem + ".yaml")
+            _ = yaml_path.write_text(dump_problem(problem, "yaml"))
+            assert Problem.from_file(yaml_path) == problem
@@ -0,0 +1,66 @@
+from fractions import Fraction
+from pathlib import Path
+
+import pytest
+
+from poet.analysis import AnalysisResults, analyze_task_set
+from poet.model import Problem
+from poet.sensitivity import RESOLUTION, max_sensitivity, scaled_problem
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def schedulable(problem: Problem, k: int, task_ids: set[int] | None = None) -> bool:
+    scaled = scaled_problem(problem, Fraction(k, RESOLUTION), task_ids)
+    return analyze_task_set(scaled).all_deadlines_respected()
+
+
+def same_results(a: AnalysisResults, b: AnalysisResults) -> bool:
+    return all(
+        a.results[t].to_dict() == b.results[t].to_dict() for t in a.problem.task_set
+    )
+
+
+def test_uniform_factor_is_largest_schedulable() -> None:
+    problem = Problem.from_file(ROOT / "examples" / "paper.yaml")
+    result = max_sensitivity(problem, False)
+    assert result.factor == Fraction(1240, RESOLUTION)
+    assert [t.wcet for t in result.problem.task_set] == [62, 13]
+    assert result.analysis_results is not None
+    assert result.analysis_results.all_deadlines_respected()
+    assert schedulable(problem, 1240) and not schedulable(problem, 1241)
+
+
+def test_per_task_factor_is_largest_schedulable() -> None:
+    problem = Problem.from_file(ROOT / "examples" / "paper.yaml")
+    for t in problem.task_set:
+        result = max_sensitivity(problem, False, {t.id})
+        assert result.factor is not None
+        k = int(result.factor * RESOLUTION)
+        assert schedulable(problem, k, {t.id})
+        assert not schedulable(problem, k + 1, {t.id})
+
+
+def test_unschedulable_and_bounded_tardiness() -> None:
+    problem = Problem.from_file(ROOT / "test-cases" / "FP-EDF-008.yaml")
+    assert max_sensitivity(problem, False).factor is None
+    result = max_sensitivity(problem, True)
+    assert result.factor is not None and result.analysis_results is not None
+    assert result.analysis_results.respose_time_is_bounded()
+
+
+def test_warm_start_yields_same_results(subtests: pytest.Subtests) -> None:
+    _ = pytest.importorskip("numpy")
+    for name in ["NP-EDF-020", "NP-FP-007"]:
+        with subtests.test(msg="warm start", path=name):
+            problem = Problem.from_file(ROOT / "test-cases" / f"{name}.yaml")
+            result = max_sensitivity(problem, False, backend="numpy")
+            assert result.factor is not None
+            smaller = scaled_problem(problem, result.factor / 2)
+            previous = analyze_task_set(smaller, backend="numpy")
+            warm = analyze_task_set(
+                result.problem,
+                backend="numpy",
+                warm_start={t.id: r for t, r in previous.results.items()},
+            )
+            assert same_results(warm, analyze_task_set(result.problem))
@@ -0,0 +1,90 @@
+import http.client
+import json
+import multiprocessing
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, cast
+
+import pytest
+
+from poet.analysis import analyze_task_set
+from poet.certificates import coq_generator
+from poet.model import Problem
+from poet.server import ServerArgs, make_server
+
+EXAMPLE = Path(__file__).parent.parent / "examples" / "paper.yaml"
+
+
+@pytest.fixture(scope="module")
+def port() -> Iterator[int]:
+    context = multiprocessing.get_context("forkserver")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        opts = ServerArgs()
+        opts.port = 0
+        server = make_server(opts, pool)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield cast(tuple[str, int], server.server_address)[1]
+        server.shutdown()
+        server.server_close()
+
+
+def post(
+    port: int, path: str, body: str, content_type: str = "application/yaml"
+) -> tuple[int, dict[str, Any]]:
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    connection.request("POST", path, body, {"Content-Type": content_type})
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_analyze(port: int):
+    problem = Problem.from_yaml_file(EXAMPLE)
+    expected = analyze_task_set(problem)
+    status, response = post(port, "/analyze", EXAMPLE.read_text())
+    assert status == 200
+    assert response["schedulable"]
+    assert response["tasks"] == [
+        {"id": t.id, **expected.results[t].to_dict()} for t in problem.task_set
+    ]
+
+    data = problem.model_dump(mode="json", by_alias=True, exclude_none=True)
+    status, json_response = post(port, "/analyze", json.dumps(data), "application/json")
+    assert status == 200
+    assert json_response == response
+
+
+def test_certificates(port: int):
+    problem = Problem.from_yaml_file(EXAMPLE)
+    results = analyze_task_set(problem)
+    status, response = post(port, "/analyze?certificates", EXAMPLE.read_text())
+    assert status == 200
+    task = problem.task_set[0]
+    proof, declaration = coq_generator.generate_proof(
+        problem, task, results.results[task], False, True
+    )
+    assert response["certificates"][task.v_name()] == proof
+    assert response["certificates"]["task_set.v"] == declaration
+
+
+def test_invalid_requests(port: int):
+    status, response = post(port, "/analyze", "scheduling policy: XX")
+    assert status == 400 and response["details"]
+    status, _ = post(port, "/analyze?unknown", EXAMPLE.read_text())
+    assert status == 400
+    status, _ = post(port, "/other", EXAMPLE.read_text())
+    assert status == 404
+
+
+def test_malformed_requests(port: int):
+    for length in (None, "abc", "-1"):
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        connection.putrequest("POST", "/analyze")
+        if length is not None:
+            connection.putheader("Content-Length", length)
+        connection.endheaders()
+        response = connection.getresponse()
+        assert response.status == 400
+        assert "Content-Length" in json.loads(response.read())["error"]
@@ -0,0 +1,27 @@
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+
+def imported_modules(*args: str) -> set[str]:
+    env = dict(os.environ, PYTHONPATH=str(ROOT / "src"))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "poet", *args],
+        check=True,
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=ROOT,
+    )
+    return set(re.findall(r"^import time:.*\| *(\S+)$", result.stderr, re.MULTILINE))
+
+
+def test_schedulability_test_defers_imports():
+    modules = imported_modules("-t", str(ROOT / "examples" / "paper.yaml"))
+    assert "poet.analysis" in modules
+    assert "joblib" not in modules
+    assert not {m for m in modules if m.startswith("poet.certificates")}
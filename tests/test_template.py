@@ -0,0 +1,69 @@
+from pathlib import Path
+
+import pytest
+
+from poet.certificates import templates
+from poet.utils import conditional_cut_patch, patch
+from poet.utils.template import Template
+
+BLOCKS = [
+    templates.WC_DEADLINE_IS_RESPECTED_START,
+    templates.WC_TARDINESS_IS_BOUNDED_START,
+    templates.WC_DEADLINE_IS_RESPECTED_PRINT_START,
+    templates.WC_TARDINESS_IS_BOUNDED_PRINT_START,
+    templates.WC_MINIMAL_SEARCH_SPACE_START,
+]
+VALUES: dict[str, object] = {
+    templates.WC_TASK_SET_DECLARATION: "Definition tsk01 :=\n  [TASK id: 1].\n",
+    templates.WC_TASK_SET_LIST: "[:: tsk01]",
+    templates.WC_TASK_UNDER_ANALYSIS: "tsk01",
+    templates.WC_MAX_BUSY_INTERVAL: "50%N",
+    templates.WC_RESPONSE_TIME_BOUND: "60%N",
+    templates.WC_SEARCH_SPACE_LEMMA: "A_in_search_space",
+    templates.WC_F_SOLUTIONS: "Let Fs : seq N := [:: 1; 2]%N.\n",
+    templates.WC_TARDINESS_BOUND_DECLARATION: "Definition B := 3%N\n.",
+}
+
+
+def render_with_patches(text: str, cut: bool, split: bool) -> tuple[str, str]:
+    for wildcard, value in VALUES.items():
+        text = patch(text, wildcard, value)
+    for start in BLOCKS:
+        end = start.replace("_START$", "_END$")
+        text, _ = conditional_cut_patch(text, start, end, cut)
+    return conditional_cut_patch(
+        text, templates.WC_DECLARATION_START, templates.WC_CERTIFICATE_START, split
+    )
+
+
+@pytest.mark.parametrize(
+    "path", sorted(Path(templates.TEMPLATES_CERTIFICATES_FOLDER).glob("*.v"))
+)
+def test_rendering_matches_patches(path: Path) -> None:
+    text = path.read_text()
+    template = templates.load_template(str(path))
+    for cut in [False, True]:
+        for split in [False, True]:
+            cuts = {start: cut for start in BLOCKS}
+            cuts[templates.WC_DECLARATION_START] = split
+            proof, cut_texts = template.render(VALUES, cuts)
+            declaration = cut_texts.get(templates.WC_DECLARATION_START, "")
+            assert (proof, declaration) == render_with_patches(text, cut, split)
+
+
+def test_unknown_wildcards_are_kept() -> None:
+    template = Template("a $X$ b $A_START$c $Y$ $A_END$d")
+
+    assert template.wildcards == {"$X$", "$Y$"}
+    assert template.render({"$Y$": "y"}, {"$A_START$": False}) == ("a $X$ b c y d", {})
+    assert template.render({}, {"$A_START$": True}) == (
+        "a $X$ b d",
+        {"$A_START$": "c $Y$ "},
+    )
+
+
+def test_unbalanced_blocks_are_rejected() -> None:
+    with pytest.raises(ValueError):
+        _ = Template("$A_START$ text")
+    with pytest.raises(ValueError):
+        _ = Template("text $A_END$")